@@ -0,0 +1,383 @@
+# -*- coding: utf-8 -*-
+"""
+Mô tả: Đo tốc độ AStarRobot.find_path trên engine mới so với cài đặt cũ
+
+Cài đặt cũ (sắp xếp lại open_set rồi pop(0) mỗi vòng, quét tuyến tính open_set
+để tìm lân cận, tạo Node mới cho mỗi lân cận) được giữ lại ở đây làm mốc so sánh
+và để kiểm tra engine mới cho cùng chi phí đường đi. Ngoài ra so sánh số nút A*
+mở rộng giữa heuristic cũ và heuristic admissible theo weight.
+
+Chạy: python benchmark.py [--hpa-size 1000] [--large 2000x3000] [--map-load 10000] [--histogram 1000]
+"""
+import argparse
+import math
+import os
+import random
+import sys
+import tempfile
+import time
+
+import numpy as np
+
+import map_format
+from robot_astar import (AStarRobot, Grid, HPAStar, Node, PathfindingAlgorithms, TimingHistogram,
+                         CELL_START, CELL_END, DEMO_ROOM_MAP, DEMO_START, DEMO_GOAL)
+
+
+def legacy_find_path(robot):
+    """
+    Cài đặt A* cũ của AStarRobot.find_path (O(n² log n) trên bản đồ trống)
+    
+    Args:
+        robot: AStarRobot object (dùng room_map, start, goal, directions)
+    
+    Returns:
+        Danh sách các (row, col) từ Start đến Goal, hoặc None nếu không tìm thấy
+    """
+    heuristic = robot.euclidean_distance if robot.allow_diagonal else robot.manhattan_distance
+    goal_row, goal_col = robot.goal
+    
+    start_node = Node(robot.start[0], robot.start[1])
+    start_node.g_score = 0
+    start_node.h_score = heuristic(start_node.row, start_node.col, goal_row, goal_col)
+    start_node.f_score = start_node.g_score + start_node.h_score
+    
+    open_set = [start_node]
+    closed_set = set()
+    
+    while open_set:
+        open_set.sort()
+        current = open_set.pop(0)
+        closed_set.add((current.row, current.col))
+        
+        if current.row == goal_row and current.col == goal_col:
+            path = []
+            node = current
+            while node is not None:
+                path.append((node.row, node.col))
+                node = node.parent
+            path.reverse()
+            return path
+        
+        for neighbor in robot.get_neighbors(current):
+            if (neighbor.row, neighbor.col) in closed_set:
+                continue
+            
+            tentative_g_score = current.g_score + neighbor.move_cost
+            
+            neighbor_in_open = False
+            for node in open_set:
+                if node.row == neighbor.row and node.col == neighbor.col:
+                    neighbor_in_open = True
+                    if tentative_g_score < node.g_score:
+                        node.parent = current
+                        node.g_score = tentative_g_score
+                        node.h_score = heuristic(node.row, node.col, goal_row, goal_col)
+                        node.f_score = node.g_score + node.h_score
+                    break
+            
+            if not neighbor_in_open:
+                neighbor.g_score = tentative_g_score
+                neighbor.h_score = heuristic(neighbor.row, neighbor.col, goal_row, goal_col)
+                neighbor.f_score = neighbor.g_score + neighbor.h_score
+                open_set.append(neighbor)
+    
+    return None
+
+
+def path_cost(path):
+    """Chi phí đường đi theo move_cost (thẳng = 1, chéo = √2)"""
+    cost = 0.0
+    for (r1, c1), (r2, c2) in zip(path, path[1:]):
+        cost += math.sqrt(2) if r1 != r2 and c1 != c2 else 1.0
+    return cost
+
+
+def random_room_map(size, wall_density=0.25, seed=0):
+    """
+    Tạo room_map ngẫu nhiên size x size (0 = đi được, 1 = vật cản) có Start/Goal ở 2 góc
+    
+    Returns:
+        Tuple (room_map, start, goal)
+    """
+    rng = random.Random(seed)
+    room_map = [[1 if rng.random() < wall_density else 0 for _ in range(size)] for _ in range(size)]
+    start = (0, 0)
+    goal = (size - 1, size - 1)
+    room_map[start[0]][start[1]] = 0
+    room_map[goal[0]][goal[1]] = 0
+    return room_map, start, goal
+
+
+def best_time_ms(function, repeat):
+    """Chạy function repeat lần, trả về (thời gian tốt nhất tính bằng ms, kết quả)"""
+    best = float('inf')
+    result = None
+    for _ in range(repeat):
+        start_time = time.perf_counter()
+        result = function()
+        best = min(best, (time.perf_counter() - start_time) * 1000)
+    return best, result
+
+
+def grid_path_cost(grid, path):
+    """Chi phí đường đi trên Grid (move_cost * weight của cell đi vào)"""
+    cost = 0.0
+    for (r1, c1), (r2, c2) in zip(path, path[1:]):
+        move_cost = math.sqrt(2) if r1 != r2 and c1 != c2 else 1.0
+        cost += move_cost * grid.get_node(r2, c2).weight
+    return cost
+
+
+def compare_heuristics(seeds=100):
+    """
+    So sánh số nút A* mở rộng giữa heuristic cũ (Manhattan/Euclidean không scale)
+    và heuristic tự chọn (Manhattan/Octile scale theo weight nhỏ nhất)
+    
+    Heuristic cũ đánh giá quá cao khi có ROAD (weight 0.5) nên có thể mở rộng ít nút
+    hơn nhưng trả về đường không tối ưu; cột "Không tối ưu" đếm số bản đồ như vậy
+    (so với chi phí của Dijkstra).
+    """
+    print(f"\n{'Bản đồ':<14} {'Hướng':<6} {'Heuristic':<22} {'Nút mở rộng':>12} {'Không tối ưu':>13}")
+    print("-" * 72)
+    for energy_mode in (False, True):
+        for allow_diagonal in (False, True):
+            totals = {'legacy': [0, 0], 'auto': [0, 0]}
+            for seed in range(seeds):
+                random.seed(seed)
+                grid = Grid.generate_random_map(energy_mode=energy_mode)
+                pathfinder = PathfindingAlgorithms(grid, allow_diagonal=allow_diagonal)
+                best_path, _ = pathfinder.dijkstra()
+                best_cost = grid_path_cost(grid, best_path)
+                legacy = pathfinder.euclidean_distance if allow_diagonal else pathfinder.manhattan_distance
+                for key, heuristic in (('legacy', legacy), ('auto', 'auto')):
+                    pathfinder.heuristic = heuristic
+                    path, stats = pathfinder.astar()
+                    totals[key][0] += stats['nodes_expanded']
+                    if grid_path_cost(grid, path) > best_cost + 1e-9:
+                        totals[key][1] += 1
+            
+            mode = 'Energy' if energy_mode else 'Simple'
+            directions = '8' if allow_diagonal else '4'
+            old_name = 'euclidean' if allow_diagonal else 'manhattan'
+            new_name = 'octile' if allow_diagonal else 'manhattan'
+            for key, name in (('legacy', f"{old_name} (cũ)"), ('auto', f"{new_name} × min weight")):
+                print(f"{mode:<14} {directions:<6} {name:<22} {totals[key][0]:>12} {totals[key][1]:>13}")
+
+
+def compare_hpa_star(size=1000, queries=10, cluster_size=16):
+    """
+    So sánh A* với HPA* trên bản đồ ngẫu nhiên size x size
+    
+    In thời gian dựng đồ thị trừu tượng (cạnh cụm lúc khởi tạo, cạnh trong bằng
+    build()), thời gian truy vấn góc-góc và các truy vấn ngẫu nhiên, cùng tỉ lệ chi
+    phí đường HPA* so với A* (HPA* chỉ gần tối ưu).
+    """
+    room_map, start, goal = random_room_map(size, wall_density=0.2, seed=size)
+    grid = Grid.from_room_map(room_map)
+    grid.set_cell_type(start[0], start[1], CELL_START)
+    grid.set_cell_type(goal[0], goal[1], CELL_END)
+    rng = random.Random(size)
+    pairs = []
+    while len(pairs) < queries:
+        a = (rng.randrange(size), rng.randrange(size))
+        b = (rng.randrange(size), rng.randrange(size))
+        if room_map[a[0]][a[1]] == 0 and room_map[b[0]][b[1]] == 0:
+            pairs.append((a, b))
+    
+    print(f"\nHPA* trên {size}x{size} (cụm {cluster_size}x{cluster_size})")
+    print(f"{'Hướng':<6} {'A* (ms)':>10} {'Dựng (s)':>9} {'HPA* (ms)':>10} "
+          f"{'Ngẫu nhiên TB (ms)':>19} {'Chi phí / A*':>13}")
+    print("-" * 72)
+    for allow_diagonal in (False, True):
+        pathfinder = PathfindingAlgorithms(grid, allow_diagonal=allow_diagonal)
+        astar_ms, (astar_path, _) = best_time_ms(pathfinder.astar, 1)
+        
+        build_start = time.perf_counter()
+        planner = HPAStar(grid, allow_diagonal, cluster_size)
+        planner.build()
+        build_s = time.perf_counter() - build_start
+        
+        hpa_ms, hpa_path = best_time_ms(planner.find_path, 3)
+        random_ms = sum(best_time_ms(lambda: planner.find_path(a, b), 1)[0] for a, b in pairs) / len(pairs)
+        ratio = grid_path_cost(grid, hpa_path) / grid_path_cost(grid, astar_path)
+        planner.close()
+        
+        directions = '8' if allow_diagonal else '4'
+        print(f"{directions:<6} {astar_ms:>10.1f} {build_s:>9.1f} {hpa_ms:>10.1f} "
+              f"{random_ms:>19.1f} {ratio:>13.3f}")
+
+
+def measure_large_grid(rows, cols, wall_density=0.2, seed=0):
+    """
+    Đo thời gian và bộ nhớ mỗi cell trên lưới lớn rows x cols (compact)
+    
+    In thời gian has_path / A* và số byte/cell của từng thành phần: các mảng của
+    Grid (memory_usage()), mảng của open list và heap (ước lượng theo số phần tử
+    lớn nhất của heap trong lần A*).
+    """
+    rng = np.random.default_rng(seed)
+    walls = (rng.random((rows, cols)) < wall_density).astype(np.uint8)
+    walls[0, 0] = walls[rows - 1, cols - 1] = 0
+    
+    start_time = time.perf_counter()
+    grid = Grid.from_room_map(walls)
+    grid.set_cell_type(0, 0, CELL_START)
+    grid.set_cell_type(rows - 1, cols - 1, CELL_END)
+    build_s = time.perf_counter() - start_time
+    del walls
+    
+    print(f"\nLưới {rows}x{cols} ({grid.size:,} cell), dựng trong {build_s:.2f} s")
+    pathfinder = PathfindingAlgorithms(grid)
+    has_path_s, _ = best_time_ms(grid.has_path, 1)
+    astar_s, (_, stats) = best_time_ms(pathfinder.astar, 1)
+    print(f"has_path: {has_path_s / 1000:.2f} s, A* (4 hướng): {astar_s / 1000:.2f} s, "
+          f"{stats['nodes_expanded']:,} nút mở rộng")
+    
+    print("Bộ nhớ (byte/cell):")
+    usage = grid.memory_usage()
+    open_list = pathfinder._open_lists['forward']
+    usage['open_list'] = open_list.keys.nbytes + len(open_list.queued)
+    # Mỗi phần tử heap: list slot 8 byte + tuple (float, int)
+    entry_bytes = 8 + sys.getsizeof((0.5, grid.size)) + sys.getsizeof(0.5) + sys.getsizeof(grid.size)
+    usage['heap (đỉnh)'] = open_list.peak_size * entry_bytes
+    for name, nbytes in usage.items():
+        print(f"  {name:<16} {nbytes / grid.size:>6.1f}")
+    print(f"  {'tổng':<16} {sum(usage.values()) / grid.size:>6.1f}")
+
+
+def measure_map_loading(size, wall_density=0.2, seed=0):
+    """
+    Đo thời gian ghi/nạp bản đồ .rpmap size x size (size² byte, 10000 → 100 MB)
+    
+    So sánh nạp bằng np.memmap (map_format.load_map) với đọc toàn bộ file vào bộ nhớ,
+    và thời gian lần tìm đầu tiên (có đọc trang từ file) bằng has_path.
+    """
+    rng = np.random.default_rng(seed)
+    walls = (rng.random((size, size)) < wall_density).astype(np.uint8)
+    walls[0, 0] = walls[size - 1, size - 1] = 0
+    grid = Grid.from_room_map(walls)
+    grid.set_cell_type(0, 0, CELL_START)
+    grid.set_cell_type(size - 1, size - 1, CELL_END)
+    del walls
+    
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, 'map.rpmap')
+        # Đo trực tiếp (không qua lambda) để bỏ được grid trước khi nạp lại từ file
+        start_time = time.perf_counter()
+        map_format.save_map(grid, path)
+        save_ms = (time.perf_counter() - start_time) * 1000
+        del grid
+        load_ms, loaded = best_time_ms(lambda: map_format.load_map(path), 5)
+        read_ms, _ = best_time_ms(lambda: np.fromfile(path, dtype=np.uint8), 1)
+        has_path_ms, found = best_time_ms(loaded.has_path, 1)
+        print(f"\n.rpmap {size}x{size} ({os.path.getsize(path) / 1e6:.0f} MB): ghi {save_ms:.0f} ms, "
+              f"nạp memmap {load_ms:.2f} ms, đọc hết file {read_ms:.0f} ms, "
+              f"has_path đầu tiên {has_path_ms / 1000:.1f} s ({found})")
+        del loaded
+
+
+def measure_distance_field(size, agents=200, allow_diagonal=True, seed=0):
+    """
+    So sánh agents lần A* về cùng một goal với một DistanceField (Dijkstra ngược 1 lần)
+    trên bản đồ ngẫu nhiên size x size, và đo bước kế tiếp vector hóa cho mọi robot
+    """
+    room_map, _, goal = random_room_map(size, seed=seed)
+    grid = Grid.from_room_map(room_map)
+    rng = random.Random(seed)
+    starts = [(rng.randrange(size), rng.randrange(size)) for _ in range(agents)]
+    starts = [start for start in starts if room_map[start[0]][start[1]] == 0]
+    
+    pathfinder = PathfindingAlgorithms(grid, allow_diagonal)
+    astar_ms, astar_paths = best_time_ms(
+        lambda: [pathfinder.solve_many([(start, goal)])[0][0] for start in starts], 1)
+    build_ms, field = best_time_ms(lambda: grid.distance_field(goal, allow_diagonal), 1)
+    extract_ms, field_paths = best_time_ms(lambda: [field.path_from(start) for start in starts], 3)
+    step_ms, _ = best_time_ms(lambda: field.next_positions(starts), 5)
+    
+    same_cost = all((a is None and b is None) or (a is not None and b is not None
+                    and abs(grid_path_cost(grid, a) - grid_path_cost(grid, b)) < 1e-6)
+                    for a, b in zip(astar_paths, field_paths))
+    print(f"\nDistanceField {size}x{size}, {len(starts)} robot về {goal}: A* từng robot {astar_ms:.0f} ms, "
+          f"dựng trường {build_ms:.0f} ms + lấy đường {extract_ms:.1f} ms, "
+          f"bước kế tiếp (vector hóa) {step_ms:.3f} ms - cùng chi phí: {'✓' if same_cost else '✗'}")
+
+
+def phase_histograms(runs, allow_diagonal=False):
+    """
+    Chạy BFS/DFS/Dijkstra/A*/JPS runs lần trên bản đồ demo 20x20 và in histogram
+    thời gian từng pha (µs) - các truy vấn này chỉ tốn vài trăm µs
+    """
+    grid = Grid.from_room_map(DEMO_ROOM_MAP)
+    grid.set_cell_type(DEMO_START[0], DEMO_START[1], CELL_START)
+    grid.set_cell_type(DEMO_GOAL[0], DEMO_GOAL[1], CELL_END)
+    pathfinder = PathfindingAlgorithms(grid, allow_diagonal)
+    for name, method in (('BFS', pathfinder.bfs), ('DFS', pathfinder.dfs), ('Dijkstra', pathfinder.dijkstra),
+                         ('A*', pathfinder.astar), ('JPS', pathfinder.jps)):
+        histogram = TimingHistogram()
+        for _ in range(runs):
+            histogram.add_stats(method()[1])
+        print(f"\n{name} ({'8' if allow_diagonal else '4'} hướng, {runs} lần, µs)")
+        print(histogram.format_table())
+
+
+def main():
+    """
+    Hàm main: In bảng so sánh thời gian cũ/mới trên bản đồ demo và các bản đồ lớn hơn
+    """
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--hpa-size', type=int, default=0,
+                        help='so sánh A* với HPA* trên bản đồ N x N (0 = bỏ qua)')
+    parser.add_argument('--large', metavar='ROWSxCOLS',
+                        help='đo thời gian và bộ nhớ/cell trên lưới lớn, ví dụ 2000x3000')
+    parser.add_argument('--map-load', type=int, default=0, metavar='N',
+                        help='đo ghi/nạp file .rpmap N x N (0 = bỏ qua)')
+    parser.add_argument('--flow', type=int, default=0, metavar='N',
+                        help='so sánh A* từng robot với DistanceField trên bản đồ N x N (0 = bỏ qua)')
+    parser.add_argument('--histogram', type=int, default=0, metavar='N',
+                        help='histogram thời gian từng pha qua N lần tìm trên bản đồ demo (0 = bỏ qua)')
+    args = parser.parse_args()
+    
+    cases = [('demo 20x20', DEMO_ROOM_MAP, DEMO_START, DEMO_GOAL, 5)]
+    for size in (50, 100, 200):
+        room_map, start, goal = random_room_map(size, seed=size)
+        cases.append((f"random {size}x{size}", room_map, start, goal, 5 if size <= 100 else 1))
+    
+    print(f"{'Bản đồ':<16} {'Hướng':<6} {'Cũ (ms)':>12} {'Mới (ms)':>12} {'Tăng tốc':>10}  Cùng chi phí")
+    print("-" * 76)
+    for name, room_map, start, goal, repeat in cases:
+        for allow_diagonal in (False, True):
+            robot = AStarRobot(room_map, start, goal, allow_diagonal=allow_diagonal)
+            legacy_ms, legacy_path = best_time_ms(lambda: legacy_find_path(robot), repeat)
+            new_ms, new_path = best_time_ms(robot.find_path, repeat)
+            
+            if legacy_path is None or new_path is None:
+                same_cost = legacy_path is None and new_path is None
+            else:
+                same_cost = abs(path_cost(legacy_path) - path_cost(new_path)) < 1e-9
+            
+            directions = '8' if allow_diagonal else '4'
+            print(f"{name:<16} {directions:<6} {legacy_ms:>12.2f} {new_ms:>12.2f} "
+                  f"{legacy_ms / new_ms:>9.1f}x  {'✓' if same_cost else '✗'}")
+    
+    compare_heuristics()
+    
+    if args.hpa_size:
+        compare_hpa_star(args.hpa_size)
+    
+    if args.large:
+        rows, cols = (int(value) for value in args.large.lower().split('x'))
+        measure_large_grid(rows, cols)
+    
+    if args.map_load:
+        measure_map_loading(args.map_load)
+    
+    if args.flow:
+        measure_distance_field(args.flow)
+    
+    if args.histogram:
+        phase_histograms(args.histogram)
+
+
+if __name__ == "__main__":
+    main()
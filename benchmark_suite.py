@@ -0,0 +1,303 @@
+# -*- coding: utf-8 -*-
+"""
+Mô tả: Bộ benchmark lặp lại được cho các thuật toán trên bản đồ ngẫu nhiên có seed
+
+Mỗi trường hợp là (kích thước, mật độ wall/trap/road, 4 hoặc 8 hướng, thuật toán).
+Bản đồ được tạo bằng Grid.generate_random_map() sau random.seed() với seed suy ra từ
+(seed, kích thước, mật độ), nên cùng tham số luôn cho cùng bản đồ dù chạy tập con nào.
+
+Với mỗi trường hợp ghi lại: số nút mở rộng, thời gian (tốt nhất trong repeat lần,
+perf_counter), bộ nhớ đỉnh cấp phát trong một lần tìm (tracemalloc) và chi phí đường đi.
+Kết quả ghi ra JSON; so với một file baseline, các chỉ số tăng quá tolerance được
+báo là regression (exit code 1).
+
+Chạy: python benchmark_suite.py [--sizes 50,100,200] [--output results.json]
+                                [--baseline baseline.json] [--tolerance 0.1]
+"""
+import argparse
+import json
+import math
+import platform
+import random
+import sys
+import time
+import tracemalloc
+
+import numpy as np
+
+from robot_astar import Grid, PathfindingAlgorithms
+
+# Tên thuật toán → tên phương thức của PathfindingAlgorithms
+ALGORITHMS = {
+    'BFS': 'bfs',
+    'DFS': 'dfs',
+    'Dijkstra': 'dijkstra',
+    'A*': 'astar',
+    'JPS': 'jps',
+    'Bidirectional Dijkstra': 'bidirectional_dijkstra',
+    'Bidirectional A*': 'bidirectional_astar',
+    'ARA*': 'ara_star',
+    'D* Lite': 'dstar_lite',
+    'HPA*': 'hpa_star',
+}
+DEFAULT_ALGORITHMS = ['BFS', 'DFS', 'Dijkstra', 'A*']
+
+# Tên mật độ → (wall_density, trap_density, road_density)
+DENSITIES = {
+    'open': (0.1, 0.0, 0.0),
+    'default': (0.25, 0.15, 0.1),
+    'dense': (0.35, 0.1, 0.05),
+}
+
+DEFAULT_SIZES = [50, 100, 200]
+
+# Thời gian chênh dưới mức này (ms) coi là nhiễu, không tính regression
+TIME_NOISE_MS = 0.05
+
+# Chỉ số được so với baseline theo tolerance (chi phí đường đi so chặt, xem compare_results)
+COMPARED_METRICS = ('wall_ms', 'expansions', 'peak_memory_bytes')
+
+
+def case_key(record):
+    """Khóa duy nhất của một trường hợp trong file kết quả"""
+    return f"{record['size']}/{record['density']}/{record['directions']}/{record['algorithm']}"
+
+
+def generate_map(size, density, seed):
+    """
+    Tạo bản đồ ngẫu nhiên lặp lại được
+    
+    Args:
+        size: Cạnh bản đồ
+        density: Tên trong DENSITIES
+        seed: Seed gốc của bộ benchmark
+    
+    Returns:
+        Grid object
+    """
+    wall_density, trap_density, road_density = DENSITIES[density]
+    # Seed dạng chuỗi được băm ổn định (không phụ thuộc PYTHONHASHSEED)
+    random.seed(f"{seed}/{size}/{density}")
+    return Grid.generate_random_map(size, size, wall_density, trap_density, road_density,
+                                    energy_mode=bool(trap_density or road_density))
+
+
+def path_cost(grid, path):
+    """Chi phí đường đi: tổng move_cost (1 hoặc √2) * weight của ô đi vào"""
+    weights = grid.weights
+    cols = grid.cols
+    cost = 0.0
+    for (row1, col1), (row2, col2) in zip(path, path[1:]):
+        move_cost = math.sqrt(2) if row1 != row2 and col1 != col2 else 1.0
+        cost += move_cost * float(weights[row2 * cols + col2])
+    return cost
+
+
+def measure(grid, algorithm, allow_diagonal, repeat):
+    """
+    Đo một thuật toán trên một bản đồ
+    
+    Mỗi lần chạy dùng PathfindingAlgorithms mới, nên D* Lite và HPA* luôn tính cả lần
+    tìm đầu tiên / dựng đồ thị trừu tượng. Lần chạy đầu (không đo) làm nóng bảng lân cận
+    và SearchState của Grid, để bộ nhớ đỉnh chỉ gồm phần cấp phát cho mỗi lần tìm.
+    
+    Returns:
+        Dict với found, path_length, path_cost, expansions, wall_ms, phases_ns (của lần
+        nhanh nhất, None nếu thuật toán không đo theo pha), peak_memory_bytes,
+        counters (stats['counters'], None nếu thuật toán không hỗ trợ instrument)
+    """
+    method_name = ALGORITHMS[algorithm]
+    
+    def run(instrument=False):
+        pathfinder = PathfindingAlgorithms(grid, allow_diagonal, instrument=instrument)
+        return getattr(pathfinder, method_name)()
+    
+    run()
+    
+    tracemalloc.start()
+    try:
+        path, stats = run()
+        peak_memory = tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+    
+    # Bộ đếm chi tiết (BFS/DFS/Dijkstra/A*) lấy từ một lần chạy riêng có instrument
+    counters = run(instrument=True)[1].get('counters')
+    expansions = counters['nodes_expanded'] if counters else stats.get('nodes_expanded')
+    
+    wall_ms = math.inf
+    phases_ns = None
+    for _ in range(repeat):
+        start_time = time.perf_counter()
+        timed_stats = run()[1]
+        elapsed_ms = (time.perf_counter() - start_time) * 1000
+        if elapsed_ms < wall_ms:
+            wall_ms = elapsed_ms
+            phases_ns = timed_stats.get('phases_ns')
+    
+    return {
+        'found': path is not None,
+        'path_length': len(path) - 1 if path else None,
+        'path_cost': path_cost(grid, path) if path else None,
+        'expansions': expansions,
+        'wall_ms': wall_ms,
+        'phases_ns': phases_ns,
+        'peak_memory_bytes': peak_memory,
+        'counters': counters,
+    }
+
+
+def run_suite(sizes=None, densities=None, directions=(4, 8), algorithms=None, seed=0, repeat=5,
+              progress=None):
+    """
+    Chạy toàn bộ các trường hợp
+    
+    Args:
+        sizes: List cạnh bản đồ (None = DEFAULT_SIZES)
+        densities: List tên trong DENSITIES (None = tất cả)
+        directions: Các chế độ di chuyển (4 và/hoặc 8)
+        algorithms: List tên trong ALGORITHMS (None = DEFAULT_ALGORITHMS)
+        seed: Seed gốc
+        repeat: Số lần chạy đo thời gian (lấy lần nhanh nhất)
+        progress: Hàm progress(record) được gọi sau mỗi trường hợp
+    
+    Returns:
+        Dict {'meta': ..., 'results': [record, ...]}
+    """
+    sizes = sizes or DEFAULT_SIZES
+    densities = densities or list(DENSITIES)
+    algorithms = algorithms or DEFAULT_ALGORITHMS
+    for name in densities:
+        if name not in DENSITIES:
+            raise ValueError(f"Unknown density '{name}', expected one of {list(DENSITIES)}")
+    for name in algorithms:
+        if name not in ALGORITHMS:
+            raise ValueError(f"Unknown algorithm '{name}', expected one of {list(ALGORITHMS)}")
+    for value in directions:
+        if value not in (4, 8):
+            raise ValueError(f"Directions must be 4 or 8, got {value}")
+    
+    results = []
+    for size in sizes:
+        for density in densities:
+            grid = generate_map(size, density, seed)
+            for value in directions:
+                for algorithm in algorithms:
+                    record = {'size': size, 'density': density, 'directions': value,
+                              'algorithm': algorithm}
+                    record.update(measure(grid, algorithm, value == 8, repeat))
+                    results.append(record)
+                    if progress:
+                        progress(record)
+    return {
+        'meta': {
+            'seed': seed,
+            'repeat': repeat,
+            'python': platform.python_version(),
+            'numpy': np.__version__,
+            'platform': platform.platform(),
+            'created': time.strftime('%Y-%m-%dT%H:%M:%S'),
+        },
+        'results': results,
+    }
+
+
+def compare_results(current, baseline, tolerance=0.1):
+    """
+    So kết quả với baseline
+    
+    Regression khi: wall_ms, expansions hoặc peak_memory_bytes lớn hơn baseline quá
+    tolerance (tỉ lệ; thời gian được cộng thêm TIME_NOISE_MS), chi phí đường đi tăng,
+    hoặc không còn tìm được đường. Các trường hợp chỉ có ở một bên bị bỏ qua.
+    
+    Args:
+        current: Kết quả run_suite() (hoặc dict đọc từ JSON)
+        baseline: Kết quả baseline
+        tolerance: Mức tăng cho phép (0.1 = 10%)
+    
+    Returns:
+        Tuple (regressions, improvements): list các (key, metric, baseline, current)
+    """
+    baseline_records = {case_key(record): record for record in baseline['results']}
+    regressions = []
+    improvements = []
+    for record in current['results']:
+        key = case_key(record)
+        old = baseline_records.get(key)
+        if old is None:
+            continue
+        if old['found'] and not record['found']:
+            regressions.append((key, 'found', True, False))
+            continue
+        if old['path_cost'] is not None and record['path_cost'] is not None:
+            if record['path_cost'] > old['path_cost'] + 1e-9:
+                regressions.append((key, 'path_cost', old['path_cost'], record['path_cost']))
+            elif record['path_cost'] < old['path_cost'] - 1e-9:
+                improvements.append((key, 'path_cost', old['path_cost'], record['path_cost']))
+        for metric in COMPARED_METRICS:
+            old_value, new_value = old[metric], record[metric]
+            slack = TIME_NOISE_MS if metric == 'wall_ms' else 0
+            if new_value > old_value * (1 + tolerance) + slack:
+                regressions.append((key, metric, old_value, new_value))
+            elif new_value < old_value * (1 - tolerance) - slack:
+                improvements.append((key, metric, old_value, new_value))
+    return regressions, improvements
+
+
+def print_record(record):
+    """In một dòng kết quả"""
+    cost = f"{record['path_cost']:.2f}" if record['found'] else '-'
+    print(f"{record['size']:>5} {record['density']:<8} {record['directions']:>5} "
+          f"{record['algorithm']:<24} {record['expansions']:>10} {record['wall_ms']:>10.2f} "
+          f"{record['peak_memory_bytes'] / 1024:>10.1f} {cost:>9}")
+
+
+def main():
+    """
+    Hàm main: Chạy bộ benchmark, ghi JSON và so với baseline
+    """
+    parser = argparse.ArgumentParser(description="Benchmark lặp lại được cho các thuật toán tìm đường")
+    parser.add_argument('--sizes', default=','.join(map(str, DEFAULT_SIZES)),
+                        help='các cạnh bản đồ, cách nhau bằng dấu phẩy')
+    parser.add_argument('--densities', default=','.join(DENSITIES),
+                        help=f"các mật độ trong: {', '.join(DENSITIES)}")
+    parser.add_argument('--directions', default='4,8', help='4, 8 hoặc 4,8')
+    parser.add_argument('--algorithms', default=','.join(DEFAULT_ALGORITHMS),
+                        help=f"các thuật toán trong: {', '.join(ALGORITHMS)}")
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--repeat', type=int, default=5, help='số lần đo thời gian (lấy nhanh nhất)')
+    parser.add_argument('--output', help='ghi kết quả ra file JSON')
+    parser.add_argument('--baseline', help='file JSON baseline để so sánh')
+    parser.add_argument('--tolerance', type=float, default=0.1, help='mức tăng cho phép (0.1 = 10%%)')
+    args = parser.parse_args()
+    
+    def split(value):
+        return [item.strip() for item in value.split(',') if item.strip()]
+    
+    print(f"{'Cạnh':>5} {'Mật độ':<8} {'Hướng':>5} {'Thuật toán':<24} {'Mở rộng':>10} "
+          f"{'Thời gian':>10} {'Bộ nhớ KB':>10} {'Chi phí':>9}")
+    print("-" * 88)
+    current = run_suite([int(size) for size in split(args.sizes)], split(args.densities),
+                        [int(value) for value in split(args.directions)], split(args.algorithms),
+                        args.seed, args.repeat, progress=print_record)
+    
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            json.dump(current, f, indent=2)
+        print(f"\nĐã ghi {len(current['results'])} kết quả vào {args.output}")
+    
+    if args.baseline:
+        with open(args.baseline, 'r', encoding='utf-8') as f:
+            baseline = json.load(f)
+        regressions, improvements = compare_results(current, baseline, args.tolerance)
+        print(f"\nSo với {args.baseline} (tolerance {args.tolerance:.0%}): "
+              f"{len(regressions)} regression, {len(improvements)} cải thiện")
+        for label, entries in (('REGRESSION', regressions), ('cải thiện', improvements)):
+            for key, metric, old_value, new_value in entries:
+                print(f"  {label:<10} {key:<40} {metric:<18} {old_value} → {new_value}")
+        if regressions:
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,193 @@
+# -*- coding: utf-8 -*-
+"""
+Mô tả: Định dạng bản đồ nhị phân (.rpmap) nạp bằng np.memmap, không sao chép
+
+Bố cục file (little-endian):
+    - Header HEADER_SIZE byte: magic b'RPGM', version, flags, rows, cols,
+      Start (row, col), End (row, col) (-1 nếu không có), số cell của từng loại,
+      weight nhỏ nhất của lớp weight (NaN nếu không có), phần còn lại là 0
+    - rows * cols byte uint8: loại cell (CELL_*) theo thứ tự row * cols + col
+    - (flags & FLAG_WEIGHTS) rows * cols float32: lớp weight riêng, bắt đầu ở
+      offset chia hết cho 64
+
+load_map() chỉ đọc header rồi ánh xạ các mảng bằng np.memmap vào Grid, nên mở một
+bản đồ 100 MB chỉ tốn vài ms; các trang được nạp khi thuật toán đọc tới.
+
+Chạy: python map_format.py [thư mục]  (chuyển các assets/map/<R>x<C>.py sang .rpmap)
+"""
+import argparse
+import ast
+import math
+import os
+import re
+import struct
+
+import numpy as np
+
+from robot_astar import Grid, CELL_WEIGHTS, CELL_NORMAL, CELL_WALL, CELL_START, CELL_END
+
+MAGIC = b'RPGM'
+VERSION = 1
+FLAG_WEIGHTS = 1
+
+# magic, version, flags, rows, cols, start_row, start_col, end_row, end_col,
+# số cell từng loại (len(CELL_WEIGHTS) số uint64), weight_floor
+HEADER_FORMAT = f'<4sHHIIiiii{len(CELL_WEIGHTS)}Qf'
+HEADER_SIZE = 128
+
+# Giá trị trong classroom_map (0 trống, 1 vật cản, 2 start, 3 goal) → loại cell
+CLASSROOM_CELL_TYPES = np.array([CELL_NORMAL, CELL_WALL, CELL_START, CELL_END], dtype=np.uint8)
+
+
+def _weights_offset(size):
+    """Offset của lớp weight: ngay sau mảng cell, làm tròn lên bội của 64"""
+    return -(-(HEADER_SIZE + size) // 64) * 64
+
+
+def save_map(grid, path, include_weights=False):
+    """
+    Ghi Grid ra file .rpmap
+    
+    Args:
+        grid: Grid object
+        path: Đường dẫn file
+        include_weights: True để ghi thêm lớp weight float32 (4 byte/cell)
+    """
+    start = grid.start or (-1, -1)
+    end = grid.end or (-1, -1)
+    weight_floor = math.nan
+    if include_weights:
+        # Weight nhỏ nhất thực tế của lớp weight (có thể đã bị sửa trực tiếp)
+        passable = grid.weights[grid.cell_types != CELL_WALL]
+        weight_floor = float(passable.min()) if len(passable) else 1.0
+    header = struct.pack(HEADER_FORMAT, MAGIC, VERSION, FLAG_WEIGHTS if include_weights else 0,
+                         grid.rows, grid.cols, start[0], start[1], end[0], end[1],
+                         *grid.type_counts, weight_floor)
+    with open(path, 'wb') as f:
+        f.write(header.ljust(HEADER_SIZE, b'\0'))
+        f.write(np.ascontiguousarray(grid.cell_types, dtype=np.uint8).data)
+        if include_weights:
+            f.write(b'\0' * (_weights_offset(grid.size) - HEADER_SIZE - grid.size))
+            f.write(np.ascontiguousarray(grid.weights, dtype=np.float32).data)
+
+
+def read_header(path):
+    """
+    Đọc header của file .rpmap
+    
+    Returns:
+        Dict với rows, cols, start, end (None nếu không có), type_counts,
+        has_weights, weight_floor
+    """
+    with open(path, 'rb') as f:
+        data = f.read(HEADER_SIZE)
+    if len(data) < HEADER_SIZE or data[:4] != MAGIC:
+        raise ValueError(f"{path} is not a .rpmap file")
+    fields = struct.unpack_from(HEADER_FORMAT, data)
+    _, version, flags, rows, cols, start_row, start_col, end_row, end_col = fields[:9]
+    if version != VERSION:
+        raise ValueError(f"Unsupported .rpmap version {version} in {path}")
+    return {
+        'rows': rows,
+        'cols': cols,
+        'start': (start_row, start_col) if start_row >= 0 else None,
+        'end': (end_row, end_col) if end_row >= 0 else None,
+        'type_counts': list(fields[9:-1]),
+        'has_weights': bool(flags & FLAG_WEIGHTS),
+        'weight_floor': fields[-1] if flags & FLAG_WEIGHTS else None,
+    }
+
+
+def load_map(path, mode='c'):
+    """
+    Nạp file .rpmap vào Grid (compact) bằng np.memmap, không sao chép dữ liệu
+    
+    Args:
+        path: Đường dẫn file
+        mode: Chế độ np.memmap: 'c' (mặc định) - sửa cell chỉ trong bộ nhớ,
+              'r+' - sửa cell ghi thẳng vào file, 'r' - chỉ đọc (set_cell_type báo lỗi)
+    
+    Returns:
+        Grid object
+    """
+    header = read_header(path)
+    shape = (header['rows'], header['cols'])
+    cell_types = np.memmap(path, dtype=np.uint8, mode=mode, offset=HEADER_SIZE, shape=shape)
+    weights = None
+    if header['has_weights']:
+        weights = np.memmap(path, dtype=np.float32, mode=mode,
+                            offset=_weights_offset(shape[0] * shape[1]), shape=shape)
+    return Grid.from_arrays(cell_types, weights, header['start'], header['end'],
+                            header['type_counts'], header['weight_floor'])
+
+
+def read_classroom_map(path):
+    """
+    Đọc classroom_map từ module bản đồ (assets/map/<R>x<C>.py) mà không import/chạy nó
+    
+    Module chỉ chứa literal: classroom_map = np.array([[...], ...]), nên đọc bằng ast.
+    
+    Returns:
+        Mảng uint8 2D với giá trị 0 trống, 1 vật cản, 2 start, 3 goal
+    """
+    with open(path, 'r', encoding='utf-8') as f:
+        tree = ast.parse(f.read(), filename=path)
+    for node in tree.body:
+        if (isinstance(node, ast.Assign) and len(node.targets) == 1
+                and getattr(node.targets[0], 'id', None) == 'classroom_map'):
+            value = node.value
+            if isinstance(value, ast.Call) and value.args:
+                value = value.args[0]  # np.array([...])
+            return np.array(ast.literal_eval(value), dtype=np.uint8)
+    raise ValueError(f"{path} has no classroom_map assignment")
+
+
+def classroom_map_to_grid(classroom_map):
+    """
+    Chuyển classroom_map (0 trống, 1 vật cản, 2 start, 3 goal) thành Grid (vector hóa)
+    
+    Returns:
+        Grid object (compact) với Start/End lấy từ ô 2/3 đầu tiên
+    """
+    values = np.asarray(classroom_map, dtype=np.uint8)
+    cell_types = CLASSROOM_CELL_TYPES[values]
+    start = np.argwhere(values == 2)
+    end = np.argwhere(values == 3)
+    return Grid.from_arrays(cell_types,
+                            start=tuple(start[0].tolist()) if len(start) else None,
+                            end=tuple(end[0].tolist()) if len(end) else None)
+
+
+def convert_classroom_maps(directory=os.path.join('assets', 'map'), include_weights=False):
+    """
+    Chuyển mọi module <R>x<C>.py trong thư mục sang file <R>x<C>.rpmap cùng chỗ
+    
+    Returns:
+        List đường dẫn các file .rpmap đã ghi
+    """
+    written = []
+    for name in sorted(os.listdir(directory)):
+        if not re.fullmatch(r'\d+x\d+\.py', name):
+            continue
+        grid = classroom_map_to_grid(read_classroom_map(os.path.join(directory, name)))
+        path = os.path.join(directory, name[:-3] + '.rpmap')
+        save_map(grid, path, include_weights)
+        written.append(path)
+    return written
+
+
+def main():
+    """
+    Hàm main: Chuyển các bản đồ classroom_map trong thư mục sang .rpmap
+    """
+    parser = argparse.ArgumentParser(description="Chuyển assets/map/<R>x<C>.py sang .rpmap")
+    parser.add_argument('directory', nargs='?', default=os.path.join('assets', 'map'))
+    parser.add_argument('--weights', action='store_true', help='ghi thêm lớp weight float32')
+    args = parser.parse_args()
+    for path in convert_classroom_maps(args.directory, args.weights):
+        header = read_header(path)
+        print(f"{path}: {header['rows']}x{header['cols']}, Start {header['start']}, End {header['end']}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,318 @@
+# -*- coding: utf-8 -*-
+"""
+Mô tả: Nạp bản đồ/kịch bản benchmark MovingAI (.map/.scen) và chạy các thuật toán
+
+Định dạng .map (https://movingai.com/benchmarks/formats.html):
+    type octile
+    height H
+    width W
+    map
+    <H dòng, mỗi dòng W ký tự>
+
+Ký tự địa hình → loại cell: '.', 'G' → CELL_NORMAL; '@', 'O', 'T' → CELL_WALL;
+'S' (đầm lầy), 'W' (nước) → CELL_TRAP.
+
+Định dạng .scen (version 1), mỗi dòng một truy vấn, các cột cách nhau bằng tab:
+    bucket  map  width  height  start_x  start_y  goal_x  goal_y  optimal_length
+(x là cột, y là hàng).
+
+Độ dài tối ưu trong .scen tính cho 8 hướng, chi phí chéo √2, không được đi chéo sát
+góc tường. Grid ở đây cho phép đi chéo qua góc tường, nên đường đi có thể ngắn hơn
+optimal_length; run_scenario() chỉ chấp nhận trường hợp đó khi đường đi thực sự có
+bước chéo sát góc tường. Bản đồ có ô 'S'/'W' (weight 5) không so được với độ dài
+trong file.
+
+Chạy: python movingai.py <file.scen> [--map file.map] [--algorithms A*,JPS] [--limit N] [--four]
+"""
+import argparse
+import math
+import os
+import time
+
+import numpy as np
+
+from robot_astar import Grid, PathfindingAlgorithms, CELL_NORMAL, CELL_WALL, CELL_TRAP, CELL_ROAD
+
+# Ký tự địa hình MovingAI → loại cell
+TERRAIN_CELL_TYPES = {
+    '.': CELL_NORMAL,
+    'G': CELL_NORMAL,
+    '@': CELL_WALL,
+    'O': CELL_WALL,
+    'T': CELL_WALL,
+    'S': CELL_TRAP,
+    'W': CELL_TRAP,
+}
+
+# Bảng tra theo mã byte (255 = ký tự không hợp lệ)
+_TERRAIN_TABLE = np.full(256, 255, dtype=np.uint8)
+for _char, _cell_type in TERRAIN_CELL_TYPES.items():
+    _TERRAIN_TABLE[ord(_char)] = _cell_type
+
+# Tên thuật toán → (tên phương thức của PathfindingAlgorithms, có đảm bảo chi phí tối ưu)
+ALGORITHMS = {
+    'BFS': ('bfs', False),
+    'DFS': ('dfs', False),
+    'Dijkstra': ('dijkstra', True),
+    'A*': ('astar', True),
+    'JPS': ('jps', True),
+    'Bidirectional Dijkstra': ('bidirectional_dijkstra', True),
+    'Bidirectional A*': ('bidirectional_astar', True),
+    'ARA*': ('ara_star', True),
+    'D* Lite': ('dstar_lite', True),
+    'HPA*': ('hpa_star', False),
+}
+
+# Sai số khi so chi phí với optimal_length (file ghi √2 với 8 chữ số thập phân)
+LENGTH_TOLERANCE = 1e-4
+
+PERCENTILES = (50, 90, 99)
+
+
+def load_map(path):
+    """
+    Nạp file .map MovingAI thành Grid (compact, chưa có Start/End)
+    
+    Args:
+        path: Đường dẫn file .map
+    
+    Returns:
+        Grid object
+    """
+    with open(path, 'rb') as f:
+        lines = f.read().splitlines()
+    header = {}
+    line_index = 0
+    while line_index < len(lines):
+        line = lines[line_index].decode('ascii').strip()
+        line_index += 1
+        if line == 'map':
+            break
+        if line:
+            key, _, value = line.partition(' ')
+            header[key] = value.strip()
+    else:
+        raise ValueError(f"{path} has no 'map' line")
+    if 'height' not in header or 'width' not in header:
+        raise ValueError(f"{path} is missing the height/width header")
+    rows = int(header['height'])
+    cols = int(header['width'])
+    
+    body = [line.rstrip() for line in lines[line_index:line_index + rows]]
+    if len(body) != rows or any(len(line) != cols for line in body):
+        raise ValueError(f"{path} does not contain {rows} rows of {cols} cells")
+    chars = np.frombuffer(b''.join(body), dtype=np.uint8)
+    cell_types = _TERRAIN_TABLE[chars]
+    if (cell_types == 255).any():
+        bad = chr(chars[np.argmax(cell_types == 255)])
+        raise ValueError(f"Unknown terrain character {bad!r} in {path}")
+    return Grid.from_arrays(cell_types.reshape(rows, cols))
+
+
+def load_scenario(path):
+    """
+    Đọc file .scen MovingAI
+    
+    Args:
+        path: Đường dẫn file .scen
+    
+    Returns:
+        List dict với bucket, map, width, height, start (row, col), goal (row, col),
+        optimal_length
+    """
+    queries = []
+    with open(path, 'r', encoding='utf-8') as f:
+        for line in f:
+            line = line.rstrip('\r\n')
+            if not line.strip() or line.startswith('version'):
+                continue
+            fields = line.split('\t')
+            if len(fields) != 9:
+                fields = line.split()
+            if len(fields) != 9:
+                raise ValueError(f"Malformed scenario line in {path}: {line!r}")
+            bucket, map_name, width, height, start_x, start_y, goal_x, goal_y, optimal = fields
+            queries.append({
+                'bucket': int(bucket),
+                'map': map_name,
+                'width': int(width),
+                'height': int(height),
+                'start': (int(start_y), int(start_x)),
+                'goal': (int(goal_y), int(goal_x)),
+                'optimal_length': float(optimal),
+            })
+    return queries
+
+
+def scenario_map_path(scen_path, map_name):
+    """Tìm file .map của kịch bản: cạnh file .scen, rồi theo đường dẫn ghi trong file"""
+    candidates = [
+        os.path.join(os.path.dirname(scen_path), os.path.basename(map_name)),
+        os.path.join(os.path.dirname(scen_path), map_name),
+        map_name,
+    ]
+    for candidate in candidates:
+        if os.path.exists(candidate):
+            return candidate
+    raise ValueError(f"Map file {map_name!r} for {scen_path} not found")
+
+
+def check_path(grid, path, start, goal):
+    """
+    Kiểm tra đường đi và tính chi phí theo cách tính của MovingAI
+    
+    Returns:
+        Tuple (hợp lệ, chi phí, có bước chéo sát góc tường)
+    """
+    if not path or tuple(path[0]) != start or tuple(path[-1]) != goal:
+        return False, math.inf, False
+    cell_types = grid.cell_types
+    weights = grid.weights
+    cols = grid.cols
+    cost = 0.0
+    cuts_corner = False
+    for (row1, col1), (row2, col2) in zip(path, path[1:]):
+        dr = row2 - row1
+        dc = col2 - col1
+        if max(abs(dr), abs(dc)) != 1 or cell_types[row2 * cols + col2] == CELL_WALL:
+            return False, math.inf, False
+        if dr and dc:
+            cost += math.sqrt(2) * weights[row2 * cols + col2]
+            if (cell_types[row1 * cols + col2] == CELL_WALL
+                    or cell_types[row2 * cols + col1] == CELL_WALL):
+                cuts_corner = True
+        else:
+            cost += weights[row2 * cols + col2]
+    return True, cost, cuts_corner
+
+
+def run_scenario(scen_path, map_path=None, algorithms=None, allow_diagonal=True, limit=None):
+    """
+    Chạy mọi truy vấn trong file .scen với từng thuật toán
+    
+    Args:
+        scen_path: Đường dẫn file .scen
+        map_path: Đường dẫn file .map (None = lấy theo cột map của kịch bản)
+        algorithms: List tên trong ALGORITHMS (None = tất cả)
+        allow_diagonal: True = 8 hướng (so được với optimal_length), False = 4 hướng
+        limit: Chỉ chạy limit truy vấn đầu tiên
+    
+    Returns:
+        Dict tên thuật toán → kết quả với queries, checked, exact (thuật toán tối ưu),
+        solved, invalid, optimal, shorter (ngắn hơn nhờ đi chéo sát góc), longer (dài hơn tối ưu),
+        mean_ratio (chi phí / optimal_length), total_s, throughput (truy vấn/s) và
+        buckets (bucket → dict p50/p90/p99/max ms)
+    """
+    queries = load_scenario(scen_path)[:limit]
+    if not queries:
+        raise ValueError(f"{scen_path} has no queries")
+    grid = load_map(map_path or scenario_map_path(scen_path, queries[0]['map']))
+    for query in queries:
+        if (query['height'], query['width']) != (grid.rows, grid.cols):
+            raise ValueError(f"Scenario size {query['width']}x{query['height']} does not match "
+                             f"the {grid.cols}x{grid.rows} map")
+    # Độ dài trong file chỉ đúng cho 8 hướng trên địa hình weight 1
+    checkable = (allow_diagonal and not grid.type_counts[CELL_TRAP]
+                 and not grid.type_counts[CELL_ROAD])
+    
+    results = {}
+    for name in algorithms or ALGORITHMS:
+        if name not in ALGORITHMS:
+            raise ValueError(f"Unknown algorithm '{name}', expected one of {list(ALGORITHMS)}")
+        method_name, exact = ALGORITHMS[name]
+        pathfinder = PathfindingAlgorithms(grid, allow_diagonal)
+        method = getattr(pathfinder, method_name)
+        latencies = {}
+        counts = {'solved': 0, 'invalid': 0, 'optimal': 0, 'shorter': 0, 'longer': 0}
+        ratios = []
+        total_s = 0.0
+        for query in queries:
+            # Gán Start/End trực tiếp: giữ nguyên địa hình của ô như MovingAI
+            grid.start = query['start']
+            grid.end = query['goal']
+            start_time = time.perf_counter()
+            path, _ = method()
+            elapsed = time.perf_counter() - start_time
+            total_s += elapsed
+            latencies.setdefault(query['bucket'], []).append(elapsed * 1000)
+            if path is None:
+                continue
+            counts['solved'] += 1
+            valid, cost, cuts_corner = check_path(grid, path, query['start'], query['goal'])
+            if not valid:
+                counts['invalid'] += 1
+                continue
+            if not checkable or not query['optimal_length']:
+                continue
+            ratios.append(cost / query['optimal_length'])
+            difference = cost - query['optimal_length']
+            if abs(difference) <= LENGTH_TOLERANCE * max(1.0, query['optimal_length']):
+                counts['optimal'] += 1
+            elif difference > 0:
+                counts['longer'] += 1
+            elif cuts_corner:
+                counts['shorter'] += 1
+            else:
+                # Ngắn hơn tối ưu mà không đi chéo sát góc: độ dài trong file không khớp
+                counts['invalid'] += 1
+        
+        results[name] = dict(
+            counts,
+            queries=len(queries),
+            checked=checkable,
+            exact=exact,
+            mean_ratio=float(np.mean(ratios)) if ratios else None,
+            total_s=total_s,
+            throughput=len(queries) / total_s if total_s else math.inf,
+            buckets={
+                bucket: dict(zip((f'p{p}' for p in PERCENTILES),
+                                 np.percentile(values, PERCENTILES).tolist()),
+                             max=max(values))
+                for bucket, values in sorted(latencies.items())
+            },
+        )
+        grid.start = grid.end = None
+    return results
+
+
+def print_results(results):
+    """In bảng tổng hợp và độ trễ theo bucket của run_scenario()"""
+    print(f"{'Thuật toán':<24} {'Giải':>6} {'Tối ưu':>7} {'Ngắn hơn':>9} {'Dài hơn':>8} "
+          f"{'Lỗi':>5} {'Tỉ lệ':>7} {'Truy vấn/s':>11}")
+    print("-" * 84)
+    for name, result in results.items():
+        ratio = f"{result['mean_ratio']:.4f}" if result['mean_ratio'] is not None else '-'
+        # Thuật toán tối ưu mà cho đường dài hơn optimal_length là lỗi
+        errors = result['invalid'] + (result['longer'] if result['exact'] else 0)
+        print(f"{name:<24} {result['solved']:>6} {result['optimal']:>7} {result['shorter']:>9} "
+              f"{result['longer']:>8} {errors:>5} {ratio:>7} {result['throughput']:>11.1f}")
+    
+    print("\nĐộ trễ theo bucket (ms): " + ", ".join(f"p{p}" for p in PERCENTILES) + ", max")
+    for name, result in results.items():
+        print(name)
+        for bucket, latency in result['buckets'].items():
+            values = " ".join(f"{latency[f'p{p}']:>9.2f}" for p in PERCENTILES)
+            print(f"  bucket {bucket:>4}: {values} {latency['max']:>9.2f}")
+
+
+def main():
+    """
+    Hàm main: Chạy một file .scen MovingAI với các thuật toán đã chọn
+    """
+    parser = argparse.ArgumentParser(description="Chạy kịch bản benchmark MovingAI (.scen)")
+    parser.add_argument('scenario', help='file .scen')
+    parser.add_argument('--map', help='file .map (mặc định lấy theo cột map của kịch bản)')
+    parser.add_argument('--algorithms', help=f"danh sách cách nhau bằng dấu phẩy, trong: {', '.join(ALGORITHMS)}")
+    parser.add_argument('--limit', type=int, help='chỉ chạy N truy vấn đầu tiên')
+    parser.add_argument('--four', action='store_true', help='chỉ đi 4 hướng (không so optimal_length)')
+    args = parser.parse_args()
+    
+    algorithms = [name.strip() for name in args.algorithms.split(',')] if args.algorithms else None
+    results = run_scenario(args.scenario, args.map, algorithms, not args.four, args.limit)
+    if not next(iter(results.values()))['checked']:
+        print("optimal_length không được kiểm tra (4 hướng hoặc bản đồ có ô S/W)")
+    print_results(results)
+
+
+if __name__ == "__main__":
+    main()
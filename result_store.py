@@ -0,0 +1,232 @@
+# -*- coding: utf-8 -*-
+"""
+Mô tả: Cache kết quả trên đĩa (SQLite) theo fingerprint nội dung của lưới
+
+Lưu DistanceField (cost + next_index, nén zlib) và kết quả tìm đường (path, stats
+dạng JSON) với khóa Grid.fingerprint (Zobrist hash 64-bit, O(1)) cùng kích thước lưới.
+Khởi động lại process hoặc nạp lại cùng một bản đồ (ví dụ assets/map/30x30.py) cho ra
+cùng fingerprint, nên không phải tính lại. Dữ liệu không bao giờ cũ: lưới đổi thì
+fingerprint đổi theo.
+
+Chạy: python result_store.py cache.sqlite [--clear]  (in số mục và dung lượng)
+"""
+import argparse
+import json
+import os
+import sqlite3
+import time
+import zlib
+
+import numpy as np
+
+from robot_astar import DistanceField, PathCache
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS distance_fields (
+    fingerprint TEXT NOT NULL,
+    rows INTEGER NOT NULL,
+    cols INTEGER NOT NULL,
+    goal_row INTEGER NOT NULL,
+    goal_col INTEGER NOT NULL,
+    allow_diagonal INTEGER NOT NULL,
+    cost BLOB NOT NULL,
+    next_index BLOB NOT NULL,
+    created REAL NOT NULL,
+    PRIMARY KEY (fingerprint, rows, cols, goal_row, goal_col, allow_diagonal)
+);
+CREATE TABLE IF NOT EXISTS results (
+    fingerprint TEXT NOT NULL,
+    rows INTEGER NOT NULL,
+    cols INTEGER NOT NULL,
+    query TEXT NOT NULL,
+    path TEXT,
+    stats TEXT NOT NULL,
+    created REAL NOT NULL,
+    PRIMARY KEY (fingerprint, rows, cols, query)
+);
+"""
+
+
+def _fingerprint(grid):
+    """Fingerprint dạng chuỗi hex (SQLite INTEGER chỉ chứa được số có dấu 64-bit)"""
+    return f"{grid.fingerprint:016x}"
+
+
+class ResultStore:
+    """
+    Lớp ResultStore: Cache DistanceField và kết quả tìm đường trong một file SQLite
+    
+    Thuộc tính:
+        - path: Đường dẫn file SQLite
+        - hits, misses, writes: Bộ đếm đọc/ghi (xem counters())
+    """
+    
+    def __init__(self, path):
+        """
+        Args:
+            path: Đường dẫn file SQLite (tạo mới nếu chưa có)
+        """
+        self.path = path
+        # Dùng được từ thread tìm đường của giao diện (sqlite3 tự tuần tự hóa truy cập)
+        self._connection = sqlite3.connect(path, check_same_thread=False)
+        self._connection.executescript(SCHEMA)
+        self.hits = 0
+        self.misses = 0
+        self.writes = 0
+    
+    def close(self):
+        """Đóng file SQLite"""
+        self._connection.close()
+    
+    def __enter__(self):
+        return self
+    
+    def __exit__(self, *exc_info):
+        self.close()
+    
+    def load_distance_field(self, grid, goal, allow_diagonal=False):
+        """
+        Nạp DistanceField về goal của lưới có cùng nội dung
+        
+        Returns:
+            DistanceField object, hoặc None nếu chưa có
+        """
+        row = self._connection.execute(
+            "SELECT cost, next_index FROM distance_fields WHERE fingerprint = ? AND rows = ? AND cols = ?"
+            " AND goal_row = ? AND goal_col = ? AND allow_diagonal = ?",
+            (_fingerprint(grid), grid.rows, grid.cols, goal[0], goal[1], int(allow_diagonal))).fetchone()
+        if row is None:
+            self.misses += 1
+            return None
+        self.hits += 1
+        cost = np.frombuffer(zlib.decompress(row[0]), dtype=np.float64).copy()
+        next_index = np.frombuffer(zlib.decompress(row[1]), dtype=np.int32).copy()
+        return DistanceField.from_arrays(grid.rows, grid.cols, goal, allow_diagonal, cost, next_index)
+    
+    def save_distance_field(self, grid, field):
+        """Ghi DistanceField của lưới (ghi đè nếu đã có)"""
+        with self._connection:
+            self._connection.execute(
+                "INSERT OR REPLACE INTO distance_fields VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                (_fingerprint(grid), grid.rows, grid.cols, field.goal[0], field.goal[1],
+                 int(field.allow_diagonal), zlib.compress(field.cost.tobytes(), 1),
+                 zlib.compress(field.next_index.tobytes(), 1), time.time()))
+        self.writes += 1
+    
+    def distance_field(self, grid, goal=None, allow_diagonal=False):
+        """
+        Như Grid.distance_field(), nhưng trường chưa có trong bộ nhớ thì được nạp từ đĩa
+        trước khi phải dựng (và trường mới dựng được ghi xuống đĩa)
+        
+        Returns:
+            DistanceField object (cũng được đưa vào cache của grid)
+        """
+        if goal is None:
+            goal = grid.end
+        if goal is None:
+            raise ValueError("Distance field needs a goal (grid has no End)")
+        field = grid.cached_distance_field(goal, allow_diagonal)
+        if field is not None:
+            return field
+        field = self.load_distance_field(grid, goal, allow_diagonal)
+        if field is not None:
+            grid.add_distance_field(field)
+            return field
+        field = grid.distance_field(goal, allow_diagonal)
+        self.save_distance_field(grid, field)
+        return field
+    
+    def load_result(self, grid, query):
+        """
+        Nạp kết quả tìm đường đã lưu
+        
+        Args:
+            grid: Grid object
+            query: Tuple mô tả truy vấn (PathCache.query())
+        
+        Returns:
+            Tuple (path, stats), hoặc None nếu chưa có
+        """
+        row = self._connection.execute(
+            "SELECT path, stats FROM results WHERE fingerprint = ? AND rows = ? AND cols = ? AND query = ?",
+            (_fingerprint(grid), grid.rows, grid.cols, json.dumps(query, default=str))).fetchone()
+        if row is None:
+            self.misses += 1
+            return None
+        self.hits += 1
+        path = json.loads(row[0]) if row[0] is not None else None
+        if path is not None:
+            path = [tuple(cell) for cell in path]
+        return path, json.loads(row[1])
+    
+    def save_result(self, grid, query, path, stats):
+        """Ghi kết quả tìm đường (ghi đè nếu đã có)"""
+        with self._connection:
+            self._connection.execute(
+                "INSERT OR REPLACE INTO results VALUES (?, ?, ?, ?, ?, ?, ?)",
+                (_fingerprint(grid), grid.rows, grid.cols, json.dumps(query, default=str),
+                 json.dumps(path) if path is not None else None, json.dumps(stats), time.time()))
+        self.writes += 1
+    
+    def solve(self, pathfinder, algorithm, callback=None, energy_mode=True, **options):
+        """
+        Trả kết quả đã lưu, hoặc chạy getattr(pathfinder, algorithm)(callback, **options)
+        rồi ghi xuống đĩa (không có cache trong bộ nhớ - dùng PathCache(store=...) cho việc đó)
+        
+        Returns:
+            Tuple (path, stats); stats của kết quả nạp từ đĩa có 'cached': True
+        """
+        query = PathCache.query(pathfinder, algorithm, energy_mode, options)
+        stored = self.load_result(pathfinder.grid, query)
+        if stored is not None:
+            path, stats = stored
+            stats['cached'] = True
+            return path, stats
+        path, stats = getattr(pathfinder, algorithm)(callback, **options)
+        if not stats.get('budget_exhausted'):
+            self.save_result(pathfinder.grid, query, path, stats)
+        return path, stats
+    
+    def clear(self):
+        """Xóa mọi mục đã lưu"""
+        with self._connection:
+            self._connection.execute("DELETE FROM distance_fields")
+            self._connection.execute("DELETE FROM results")
+        self._connection.execute("VACUUM")
+    
+    def counters(self):
+        """
+        Bộ đếm và số mục trên đĩa
+        
+        Returns:
+            Dict hits, misses, writes, distance_fields, results
+        """
+        distance_fields = self._connection.execute("SELECT COUNT(*) FROM distance_fields").fetchone()[0]
+        results = self._connection.execute("SELECT COUNT(*) FROM results").fetchone()[0]
+        return {
+            'hits': self.hits,
+            'misses': self.misses,
+            'writes': self.writes,
+            'distance_fields': distance_fields,
+            'results': results,
+        }
+
+
+def main():
+    """
+    Hàm main: In số mục và dung lượng của một file cache (hoặc xóa hết với --clear)
+    """
+    parser = argparse.ArgumentParser(description="Xem/xóa cache kết quả trên đĩa")
+    parser.add_argument('path', help='file SQLite')
+    parser.add_argument('--clear', action='store_true', help='xóa mọi mục đã lưu')
+    args = parser.parse_args()
+    with ResultStore(args.path) as store:
+        if args.clear:
+            store.clear()
+        counters = store.counters()
+    print(f"{args.path}: {counters['distance_fields']} distance field, {counters['results']} kết quả, "
+          f"{os.path.getsize(args.path) / 1e6:.1f} MB")
+
+
+if __name__ == "__main__":
+    main()
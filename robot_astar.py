@@ -4,6 +4,16 @@ Mô tả: Tìm đường đi ngắn nhất từ Start đến Goal trong bản đ
 """
 import sys
 import io
+import math
+import heapq
+import struct
+import time
+import weakref
+import argparse
+import collections
+import concurrent.futures
+
+import numpy as np
 
 # Thiết lập encoding UTF-8 cho console (hỗ trợ tiếng Việt)
 if sys.platform == 'win32':
@@ -18,6 +28,144 @@ CELL_END = 3         # End point
 CELL_TRAP = 4        # High cost/Trap, cost = 5
 CELL_ROAD = 5        # Low cost/Road, cost = 0.5
 
+# Weight (chi phí đi vào cell) theo từng loại cell
+CELL_WEIGHTS = {
+    CELL_NORMAL: 1.0,
+    CELL_WALL: float('inf'),
+    CELL_START: 1.0,
+    CELL_END: 1.0,
+    CELL_TRAP: 5.0,
+    CELL_ROAD: 0.5,
+}
+
+# Bảng weight theo loại cell dạng mảng (weights = WEIGHT_TABLE[cell_types])
+WEIGHT_TABLE = np.array([CELL_WEIGHTS[cell_type] for cell_type in range(len(CELL_WEIGHTS))], dtype=np.float32)
+
+
+# Zobrist hashing cho fingerprint nội dung lưới: mỗi cell đóng góp khóa 64-bit của
+# (chỉ số, weight float32) - Start/End/NORMAL cùng weight 1 nên không phân biệt (chúng
+# thuộc về truy vấn, không thuộc về chi phí). Khóa được sinh bằng splitmix64 thay vì
+# bảng ngẫu nhiên, nên không tốn bộ nhớ theo số cell; cell weight 1 có khóa 0.
+ZOBRIST_SEED = 0x9E3779B97F4A7C15
+_MASK64 = 2 ** 64 - 1
+_ONE_BITS = struct.unpack('<I', struct.pack('<f', 1.0))[0]
+
+
+def _splitmix64(value):
+    """Trộn một số nguyên 64-bit (splitmix64, bản Python int)"""
+    value = (value + ZOBRIST_SEED) & _MASK64
+    value = ((value ^ (value >> 30)) * 0xBF58476D1CE4E5B9) & _MASK64
+    value = ((value ^ (value >> 27)) * 0x94D049BB133111EB) & _MASK64
+    return value ^ (value >> 31)
+
+
+def zobrist_key(index, weight):
+    """Khóa Zobrist của cell index có weight (0 nếu weight = 1)"""
+    bits = struct.unpack('<I', struct.pack('<f', weight))[0]
+    if bits == _ONE_BITS:
+        return 0
+    return _splitmix64(index << 32 | bits)
+
+
+def zobrist_hash(indices, weights):
+    """
+    XOR các khóa Zobrist của nhiều cell (vector hóa, cùng kết quả với zobrist_key)
+    
+    Args:
+        indices: Mảng chỉ số phẳng
+        weights: Mảng weight tương ứng (float32)
+    
+    Returns:
+        Số nguyên 64-bit
+    """
+    bits = np.ascontiguousarray(weights, dtype=np.float32).view(np.uint32)
+    keep = bits != _ONE_BITS
+    value = (np.asarray(indices, dtype=np.uint64)[keep] << np.uint64(32)) | bits[keep].astype(np.uint64)
+    value += np.uint64(ZOBRIST_SEED)
+    value = (value ^ (value >> np.uint64(30))) * np.uint64(0xBF58476D1CE4E5B9)
+    value = (value ^ (value >> np.uint64(27))) * np.uint64(0x94D049BB133111EB)
+    value ^= value >> np.uint64(31)
+    return int(np.bitwise_xor.reduce(value)) if len(value) else 0
+
+# Chi phí đường chéo = √2 ≈ 1.414
+DIAGONAL_COST = math.sqrt(2)
+
+# Hướng di chuyển (dr, dc, move_cost) theo đúng thứ tự mà các thuật toán duyệt
+DIRECTIONS_4 = (
+    (-1, 0, 1.0),  # Lên
+    (1, 0, 1.0),   # Xuống
+    (0, -1, 1.0),  # Trái
+    (0, 1, 1.0),   # Phải
+)
+DIRECTIONS_8 = DIRECTIONS_4 + (
+    (-1, -1, DIAGONAL_COST),  # Lên-Trái (chéo)
+    (-1, 1, DIAGONAL_COST),   # Lên-Phải (chéo)
+    (1, -1, DIAGONAL_COST),   # Xuống-Trái (chéo)
+    (1, 1, DIAGONAL_COST),    # Xuống-Phải (chéo)
+)
+
+
+# ========== HEURISTIC ==========
+# Khoảng cách theo chi phí đơn vị (mỗi bước thẳng = 1, chéo = √2). A* nhân thêm
+# weight nhỏ nhất đang có trên lưới để heuristic luôn admissible kể cả khi có ROAD.
+
+def manhattan_distance(row1, col1, row2, col2):
+    """|Δrow| + |Δcol|: chính xác cho lưới 4 hướng không vật cản"""
+    return abs(row1 - row2) + abs(col1 - col2)
+
+
+def octile_distance(row1, col1, row2, col2):
+    """max + (√2 - 1) * min: chính xác cho lưới 8 hướng không vật cản"""
+    dr = abs(row1 - row2)
+    dc = abs(col1 - col2)
+    if dr < dc:
+        return dc + (DIAGONAL_COST - 1) * dr
+    return dr + (DIAGONAL_COST - 1) * dc
+
+
+def chebyshev_distance(row1, col1, row2, col2):
+    """max(|Δrow|, |Δcol|): admissible cho cả 4 và 8 hướng nhưng yếu hơn octile"""
+    return max(abs(row1 - row2), abs(col1 - col2))
+
+
+def euclidean_distance(row1, col1, row2, col2):
+    """√(Δrow² + Δcol²): admissible cho cả 4 và 8 hướng nhưng yếu hơn octile"""
+    return math.sqrt((row1 - row2) ** 2 + (col1 - col2) ** 2)
+
+
+# Các heuristic có thể chọn cho A* (tên → hàm)
+HEURISTICS = {
+    'manhattan': manhattan_distance,
+    'octile': octile_distance,
+    'chebyshev': chebyshev_distance,
+    'euclidean': euclidean_distance,
+}
+
+
+def select_heuristic(heuristic, allow_diagonal, grid):
+    """
+    Chọn heuristic cho một lần tìm trên grid
+    
+    Với 'auto' hoặc tên trong HEURISTICS, heuristic được nhân với weight nhỏ nhất
+    của các loại cell đi được đang có trên lưới: mỗi bước tốn ít nhất
+    move_cost * weight đó, nên h không bao giờ vượt chi phí thực (admissible).
+    
+    Args:
+        heuristic: 'auto' (Manhattan cho 4 hướng, Octile cho 8 hướng), tên trong
+                   HEURISTICS, hoặc hàm h(row1, col1, row2, col2) dùng nguyên giá trị
+        allow_diagonal: True nếu cho phép đi chéo (8 hướng)
+        grid: Grid object
+    
+    Returns:
+        Tuple (tên, hàm h(row1, col1, row2, col2), hệ số scale)
+    """
+    if callable(heuristic):
+        return getattr(heuristic, '__name__', 'custom'), heuristic, 1.0
+    name = heuristic
+    if name == 'auto':
+        name = 'octile' if allow_diagonal else 'manhattan'
+    return name, HEURISTICS[name], grid.min_traversable_weight()
+
 
 class Node:
     """
@@ -31,26 +179,55 @@ class Node:
         - g_score: Chi phí thực tế từ Start đến nút hiện tại
         - h_score: Chi phí ước tính (heuristic) từ nút hiện tại đến Goal
         - f_score: Tổng chi phí f = g + h (dùng để sắp xếp trong thuật toán A*)
+    
+    Node thuộc một Grid (grid được gán) đọc parent/g_score từ SearchState của lần tìm
+    gần nhất trên Grid đó, giống NodeView, và không cho gán hai thuộc tính này
+    (AttributeError); Node đứng riêng giữ giá trị được gán.
     """
     
-    def __init__(self, row, col, cell_type=CELL_NORMAL, parent=None):
+    def __init__(self, row, col, cell_type=CELL_NORMAL, parent=None, grid=None):
         self.row = row          # Hàng trong bản đồ
         self.col = col          # Cột trong bản đồ
         self.cell_type = cell_type  # Loại cell
-        self.parent = parent    # Nút cha (để truy vết đường đi)
-        self.g_score = 0        # Chi phí thực tế từ Start đến nút này
+        self._grid = grid       # Grid chứa nút (None nếu đứng riêng)
+        self._parent = None     # Nút cha (để truy vết đường đi)
+        self._g_score = 0       # Chi phí thực tế từ Start đến nút này
+        if parent is not None:
+            self.parent = parent
         self.h_score = 0        # Chi phí ước tính (heuristic) từ nút này đến Goal
         self.f_score = 0        # Tổng chi phí f = g + h
         
-        # Tính weight dựa trên cell_type
-        if cell_type == CELL_WALL:
-            self.weight = float('inf')  # Không thể đi qua
-        elif cell_type == CELL_TRAP:
-            self.weight = 5.0  # Chi phí cao
-        elif cell_type == CELL_ROAD:
-            self.weight = 0.5  # Chi phí thấp
-        else:  # NORMAL, START, END
-            self.weight = 1.0  # Chi phí bình thường
+        # Tính weight dựa trên cell_type (WALL = inf, TRAP = 5, ROAD = 0.5, còn lại = 1)
+        self.weight = CELL_WEIGHTS.get(cell_type, 1.0)
+    
+    @property
+    def g_score(self):
+        """g của nút trong lần tìm gần nhất trên Grid (inf nếu chưa được xét)"""
+        if self._grid is not None:
+            return self._grid.search_state.g_score(self.row * self._grid.cols + self.col)
+        return self._g_score
+    
+    @g_score.setter
+    def g_score(self, value):
+        if self._grid is not None:
+            raise AttributeError("g_score of a grid-owned Node is read from the grid's SearchState")
+        self._g_score = value
+    
+    @property
+    def parent(self):
+        """Nút cha trong lần tìm gần nhất trên Grid (None nếu không có)"""
+        if self._grid is not None:
+            parent_index = self._grid.search_state.parent_of(self.row * self._grid.cols + self.col)
+            if parent_index < 0:
+                return None
+            return self._grid.get_node(*divmod(parent_index, self._grid.cols))
+        return self._parent
+    
+    @parent.setter
+    def parent(self, value):
+        if self._grid is not None:
+            raise AttributeError("parent of a grid-owned Node is read from the grid's SearchState")
+        self._parent = value
     
     def is_passable(self):
         """Kiểm tra xem có thể đi qua cell này không"""
@@ -69,936 +246,4689 @@ class Node:
         return f"Node({self.row}, {self.col}, type={self.cell_type}, weight={self.weight}, f={self.f_score})"
 
 
-class AStarRobot:
+class NodeView:
     """
-    Lớp AStarRobot: Chứa logic tìm đường bằng thuật toán A*
+    Lớp NodeView: "Khung nhìn" nhẹ vào một cell của Grid ở chế độ compact
     
-    Thuật toán A* hoạt động:
-        1. Mở rộng nút có f_score nhỏ nhất
-        2. f_score = g_score + h_score
-           - g_score: Chi phí thực tế từ Start đến nút hiện tại
-           - h_score: Chi phí ước tính từ nút hiện tại đến Goal (Manhattan Distance)
-        3. Khi đến Goal, truy vết đường đi ngược lại qua parent
+    Không lưu dữ liệu riêng - cell_type, weight được đọc trực tiếp từ các mảng NumPy
+    của Grid, g_score/parent từ SearchState của lần tìm gần nhất. Có cùng giao diện
+    đọc với Node nên UI và callback animation dùng được như Node thông thường.
+    
+    Thuộc tính:
+        - row, col: Tọa độ của cell
+        - index: Chỉ số phẳng của cell (row * cols + col)
     """
     
-    def __init__(self, room_map, start, goal, allow_diagonal=False):
+    __slots__ = ('_grid', 'index', 'row', 'col')
+    
+    def __init__(self, grid, index):
+        self._grid = grid
+        self.index = index
+        self.row, self.col = divmod(index, grid.cols)
+    
+    @property
+    def cell_type(self):
+        return int(self._grid.cell_types[self.index])
+    
+    @property
+    def weight(self):
+        return float(self._grid.weights[self.index])
+    
+    @property
+    def g_score(self):
+        """g của cell trong lần tìm gần nhất (inf nếu chưa được xét)"""
+        return self._grid.search_state.g_score(self.index)
+    
+    @property
+    def parent(self):
+        """Nút cha trong lần tìm gần nhất (None nếu không có)"""
+        parent_index = self._grid.search_state.parent_of(self.index)
+        if parent_index < 0:
+            return None
+        return NodeView(self._grid, parent_index)
+    
+    def is_passable(self):
+        """Kiểm tra xem có thể đi qua cell này không"""
+        return self.cell_type != CELL_WALL
+    
+    def __eq__(self, other):
+        """So sánh 2 nút: bằng nhau nếu cùng tọa độ"""
+        return self.row == other.row and self.col == other.col
+    
+    def __hash__(self):
+        return hash((self.row, self.col))
+    
+    def __repr__(self):
+        return f"NodeView({self.row}, {self.col}, type={self.cell_type}, weight={self.weight})"
+
+
+class NeighborTable:
+    """
+    Lớp NeighborTable: Bảng lân cận dựng sẵn cho một Grid và một chế độ di chuyển
+    
+    Thay vì lưu danh sách lân cận riêng cho từng cell, mỗi cell chỉ lưu 1 byte
+    bitmask (bit k = 1 nếu ô theo hướng k nằm trong lưới và đi được). Bitmask là
+    chỉ số vào bảng patterns dùng chung: patterns[mask] là tuple các
+    (delta, move_cost) theo đúng thứ tự DIRECTIONS_4/DIRECTIONS_8, với
+    neighbor_index = index + delta.
+    
+    Nhờ vậy một lần mở rộng nút chỉ là: patterns[masks[index]] → duyệt tuple có sẵn,
+    không tạo list/tuple/Node mới, và bảng chỉ tốn 1 byte/cell.
+    
+    Thuộc tính:
+        - directions: DIRECTIONS_4 hoặc DIRECTIONS_8
+        - masks: Mảng uint8 (rows * cols) chứa bitmask từng cell
+        - masks_view: memoryview của masks (đọc nhanh trong vòng lặp Python)
+        - patterns: List 2^K tuple các (delta, move_cost)
+    """
+    
+    def __init__(self, grid, allow_diagonal=False):
         """
-        Khởi tạo robot với bản đồ và điểm bắt đầu/kết thúc
+        Dựng bảng lân cận cho toàn bộ Grid (vector hóa bằng NumPy)
         
         Args:
-            room_map: Ma trận 2D đại diện cho bản đồ (0=đi được, 1=vật cản)
-            start: Tuple (row, col) điểm bắt đầu
-            goal: Tuple (row, col) điểm đích
+            grid: Grid object
             allow_diagonal: True nếu cho phép đi chéo (8 hướng), False nếu chỉ 4 hướng
         """
-        self.room_map = room_map        # Bản đồ phòng
-        self.rows = len(room_map)       # Số hàng
-        self.cols = len(room_map[0])    # Số cột
-        self.start = start              # Điểm bắt đầu (row, col)
-        self.goal = goal                # Điểm đích (row, col)
-        self.allow_diagonal = allow_diagonal  # Cho phép đi chéo hay không
+        self.rows = grid.rows
+        self.cols = grid.cols
+        self.allow_diagonal = allow_diagonal
+        self.directions = DIRECTIONS_8 if allow_diagonal else DIRECTIONS_4
         
-        # 4 hướng di chuyển cơ bản: Lên, Xuống, Trái, Phải
-        self.directions_4 = [
-            (-1, 0, 1.0),  # Lên (giảm hàng), chi phí = 1
-            (1, 0, 1.0),   # Xuống (tăng hàng), chi phí = 1
-            (0, -1, 1.0),  # Trái (giảm cột), chi phí = 1
-            (0, 1, 1.0)    # Phải (tăng cột), chi phí = 1
+        # patterns[mask] = tuple (delta, move_cost) của các hướng có bit = 1
+        deltas = [(dr * self.cols + dc, move_cost) for dr, dc, move_cost in self.directions]
+        self.patterns = [
+            tuple(deltas[k] for k in range(len(deltas)) if mask >> k & 1)
+            for mask in range(1 << len(deltas))
         ]
         
-        # 8 hướng di chuyển (bao gồm cả đường chéo)
-        # Chi phí đường chéo = √2 ≈ 1.414
-        import math
-        diagonal_cost = math.sqrt(2)
-        self.directions_8 = [
-            (-1, 0, 1.0),      # Lên
-            (1, 0, 1.0),       # Xuống
-            (0, -1, 1.0),      # Trái
-            (0, 1, 1.0),       # Phải
-            (-1, -1, diagonal_cost),  # Lên-Trái (chéo)
-            (-1, 1, diagonal_cost),   # Lên-Phải (chéo)
-            (1, -1, diagonal_cost),   # Xuống-Trái (chéo)
-            (1, 1, diagonal_cost)     # Xuống-Phải (chéo)
-        ]
+        passable = (grid.cell_types != CELL_WALL).reshape(self.rows, self.cols)
+        masks = np.zeros((self.rows, self.cols), dtype=np.uint8)
+        for k, (dr, dc, _) in enumerate(self.directions):
+            # Vùng các ô (row, col) có ô đích (row + dr, col + dc) nằm trong lưới
+            src_rows = slice(max(0, -dr), self.rows - max(0, dr))
+            src_cols = slice(max(0, -dc), self.cols - max(0, dc))
+            dst_rows = slice(max(0, dr), self.rows - max(0, -dr))
+            dst_cols = slice(max(0, dc), self.cols - max(0, -dc))
+            masks[src_rows, src_cols] |= passable[dst_rows, dst_cols].astype(np.uint8) << k
         
-        # Chọn hướng di chuyển dựa trên allow_diagonal
-        self.directions = self.directions_8 if allow_diagonal else self.directions_4
+        self.masks = masks.reshape(-1)
+        self.masks_view = memoryview(self.masks)
     
-    def manhattan_distance(self, row1, col1, row2, col2):
+    def update_cell(self, index, passable):
         """
-        Tính khoảng cách Manhattan giữa 2 điểm
-        
-        Công thức: |row1 - row2| + |col1 - col2|
+        Vá bảng khi một cell đổi trạng thái đi được/không đi được
         
-        Manhattan Distance phù hợp với di chuyển 4 hướng vì:
-        - Đây là khoảng cách thực tế tối thiểu khi chỉ đi Lên/Xuống/Trái/Phải
-        - Luôn admissible (không bao giờ đánh giá quá cao) → đảm bảo tìm được đường tối ưu
-        - Tính toán nhanh hơn Euclidean (không cần căn bậc 2)
+        Chỉ các ô lân cận của cell (tối đa 8 ô) có bit trỏ tới cell bị thay đổi.
         
         Args:
-            row1, col1: Tọa độ điểm 1
-            row2, col2: Tọa độ điểm 2
+            index: Chỉ số phẳng của cell vừa thay đổi
+            passable: True nếu cell giờ đi được
+        """
+        row, col = divmod(index, self.cols)
+        masks = self.masks_view
+        for k, (dr, dc, _) in enumerate(self.directions):
+            # Ô p sao cho p + hướng k = cell vừa đổi
+            p_row = row - dr
+            p_col = col - dc
+            if 0 <= p_row < self.rows and 0 <= p_col < self.cols:
+                p = p_row * self.cols + p_col
+                if passable:
+                    masks[p] |= 1 << k
+                else:
+                    masks[p] &= ~(1 << k) & 0xFF
+    
+    def neighbors(self, index):
+        """
+        Lấy tuple (delta, move_cost) các ô lân cận đi được của cell
         
         Returns:
-            Khoảng cách Manhattan (số thực)
+            Tuple dùng chung (không được sửa); neighbor_index = index + delta
         """
-        return abs(row1 - row2) + abs(col1 - col2)
+        return self.patterns[self.masks_view[index]]
+
+
+class JumpPointMap:
+    """
+    Lớp JumpPointMap: Dữ liệu dựng sẵn cho Jump Point Search (JPS)
     
-    def euclidean_distance(self, row1, col1, row2, col2):
+    Lưu lưới có thêm 1 viền ô tường xung quanh (kích thước (rows + 2) x (cols + 2))
+    để các bước "nhảy" chỉ cần đọc mảng, không phải kiểm tra biên:
+        - walkable[p] = 1 nếu ô đi được
+        - uniform[p] = 1 nếu ô đi được, weight = 1 và mọi ô đi được trong khối 3x3
+          quanh nó cũng có weight = 1
+    
+    JPS chỉ cắt tỉa và nhảy qua các ô uniform; ô không uniform (cạnh TRAP/ROAD)
+    luôn là điểm dừng và được mở rộng đầy đủ như A* thường.
+    
+    Thuộc tính:
+        - stride: Số cột của lưới có viền (cols + 2)
+        - walkable, uniform: Mảng uint8 ((rows + 2) * (cols + 2))
+        - walkable_view, uniform_view: memoryview của 2 mảng trên
+    """
+    
+    def __init__(self, grid):
         """
-        Tính khoảng cách Euclidean giữa 2 điểm
+        Dựng dữ liệu cho toàn bộ Grid (vector hóa bằng NumPy)
         
-        Công thức: √((row1 - row2)² + (col1 - col2)²)
+        Args:
+            grid: Grid object
+        """
+        self.rows = grid.rows
+        self.cols = grid.cols
+        self.stride = self.cols + 2
+        self._grid = grid
         
-        Euclidean Distance phù hợp với di chuyển 8 hướng (có chéo) vì:
-        - Đây là khoảng cách đường thẳng thực tế
-        - Luôn admissible (không bao giờ đánh giá quá cao) → đảm bảo tìm được đường tối ưu
-        - Phản ánh chính xác chi phí khi có thể đi chéo
+        cell_types = grid.cell_types.reshape(self.rows, self.cols)
+        weights = grid.weights.reshape(self.rows, self.cols)
+        walkable = np.zeros((self.rows + 2, self.stride), dtype=np.uint8)
+        walkable[1:-1, 1:-1] = cell_types != CELL_WALL
+        heavy = np.zeros((self.rows + 2, self.stride), dtype=bool)
+        heavy[1:-1, 1:-1] = (cell_types != CELL_WALL) & (weights != 1.0)
         
-        Args:
-            row1, col1: Tọa độ điểm 1
-            row2, col2: Tọa độ điểm 2
+        # Ô có ít nhất một ô weight khác 1 trong khối 3x3 quanh nó
+        near_heavy = np.zeros((self.rows, self.cols), dtype=bool)
+        for dr in (0, 1, 2):
+            for dc in (0, 1, 2):
+                near_heavy |= heavy[dr:dr + self.rows, dc:dc + self.cols]
+        uniform = np.zeros((self.rows + 2, self.stride), dtype=np.uint8)
+        uniform[1:-1, 1:-1] = walkable[1:-1, 1:-1].astype(bool) & ~near_heavy
         
-        Returns:
-            Khoảng cách Euclidean (số thực)
-        """
-        import math
-        return math.sqrt((row1 - row2) ** 2 + (col1 - col2) ** 2)
+        self.walkable = walkable.reshape(-1)
+        self.uniform = uniform.reshape(-1)
+        self.walkable_view = memoryview(self.walkable)
+        self.uniform_view = memoryview(self.uniform)
     
-    def is_valid(self, row, col):
+    def padded_index(self, index):
+        """Chuyển chỉ số phẳng của Grid thành chỉ số trên lưới có viền"""
+        row, col = divmod(index, self.cols)
+        return (row + 1) * self.stride + col + 1
+    
+    def grid_index(self, padded):
+        """Chuyển chỉ số trên lưới có viền về chỉ số phẳng của Grid"""
+        row, col = divmod(padded, self.stride)
+        return (row - 1) * self.cols + col - 1
+    
+    def update_cell(self, index):
         """
-        Kiểm tra xem ô (row, col) có hợp lệ để đi vào không
-        
-        Điều kiện:
-            - Nằm trong phạm vi bản đồ (0 <= row < rows, 0 <= col < cols)
-            - Không phải vật cản (room_map[row][col] == 0)
+        Vá dữ liệu khi một cell đổi loại (đổi walkable và uniform của khối 3x3 quanh nó)
         
         Args:
-            row, col: Tọa độ cần kiểm tra
-        
-        Returns:
-            True nếu ô hợp lệ, False nếu không
+            index: Chỉ số phẳng của cell vừa thay đổi
         """
-        # Kiểm tra nằm trong phạm vi bản đồ
-        if row < 0 or row >= self.rows or col < 0 or col >= self.cols:
-            return False
-        
-        # Kiểm tra không phải vật cản (0 = đi được, 1 = vật cản)
-        if self.room_map[row][col] == 1:
-            return False
+        cell_types = self._grid.cell_types
+        weights = self._grid.weights
+        row, col = divmod(index, self.cols)
+        self.walkable_view[self.padded_index(index)] = int(cell_types[index] != CELL_WALL)
         
-        return True
+        for r in range(max(0, row - 1), min(self.rows, row + 2)):
+            for c in range(max(0, col - 1), min(self.cols, col + 2)):
+                uniform = cell_types[r * self.cols + c] != CELL_WALL
+                for rr in range(max(0, r - 1), min(self.rows, r + 2)):
+                    if not uniform:
+                        break
+                    for cc in range(max(0, c - 1), min(self.cols, c + 2)):
+                        i = rr * self.cols + cc
+                        if cell_types[i] != CELL_WALL and weights[i] != 1.0:
+                            uniform = False
+                            break
+                self.uniform_view[(r + 1) * self.stride + c + 1] = int(uniform)
+
+
+class DistanceField:
+    """
+    Lớp DistanceField: Trường chi phí về đích (cost-to-go) và trường hướng (flow field)
     
-    def get_neighbors(self, node):
+    Dựng bằng một lần Dijkstra ngược từ goal trên toàn lưới: cost[i] là chi phí nhỏ
+    nhất để đi từ cell i tới goal (cùng mô hình chi phí move_cost * weight của ô đích
+    như các thuật toán khác), next_index[i] là cell kế tiếp trên một đường tối ưu.
+    Nhờ đó:
+        - Mọi điểm xuất phát lấy được đường đi trong O(độ dài đường) (path_from)
+        - Nhiều robot cùng về một goal được điều khiển bằng một lần tra mảng (next_positions)
+    
+    Grid.distance_field() cache trường theo (goal, chế độ di chuyển) và bỏ trường
+    khi set_cell_type() sửa một cell tới được goal (hoặc mở ô cạnh vùng tới được).
+    
+    Thuộc tính:
+        - goal: (row, col) của goal
+        - allow_diagonal: Chế độ di chuyển dùng khi dựng
+        - directions: DIRECTIONS_4 hoặc DIRECTIONS_8
+        - cost: Mảng float64 (rows, cols), inf nếu không tới được goal
+        - next_index: Mảng int32 (rows * cols), chỉ số phẳng cell kế tiếp (-1 ở goal
+          và ở cell không tới được)
+        - flow: Mảng int8 (rows, cols), chỉ số hướng trong directions của bước kế tiếp (-1 nếu không có)
+    """
+    
+    def __init__(self, grid, goal, allow_diagonal=False):
         """
-        Lấy danh sách các nút lân cận hợp lệ của nút hiện tại
-        
-        Hỗ trợ 4 hướng hoặc 8 hướng (tùy theo allow_diagonal)
-        - 4 hướng: Lên, Xuống, Trái, Phải (chi phí = 1)
-        - 8 hướng: Bao gồm cả 4 hướng chéo (chi phí = √2)
+        Dựng trường cho toàn bộ Grid (Dijkstra ngược từ goal)
         
         Args:
-            node: Nút hiện tại
-        
-        Returns:
-            Danh sách các nút lân cận hợp lệ, mỗi nút có thông tin chi phí di chuyển
+            grid: Grid object
+            goal: (row, col) của goal
+            allow_diagonal: True nếu cho phép đi chéo (8 hướng), False nếu chỉ 4 hướng
         """
-        neighbors = []
+        self.rows = grid.rows
+        self.cols = grid.cols
+        self.goal = tuple(goal)
+        self.allow_diagonal = allow_diagonal
+        self.directions = DIRECTIONS_8 if allow_diagonal else DIRECTIONS_4
         
-        # Duyệt qua các hướng di chuyển (dr, dc, cost)
-        for dr, dc, move_cost in self.directions:
-            new_row = node.row + dr
-            new_col = node.col + dc
-            
-            # Kiểm tra bounds: đảm bảo 0 <= new_row < rows và 0 <= new_col < cols
-            if new_row < 0 or new_row >= self.rows or new_col < 0 or new_col >= self.cols:
-                continue
-            
-            # Kiểm tra không phải vật cản
-            if not self.is_valid(new_row, new_col):
+        size = grid.size
+        cost = np.full(size, np.inf, dtype=np.float64)
+        next_index = np.full(size, -1, dtype=np.int32)
+        table = grid.get_neighbor_table(allow_diagonal)
+        masks = table.masks_view
+        patterns = table.patterns
+        weights = memoryview(np.ascontiguousarray(grid.weights).reshape(-1))
+        cost_view = memoryview(cost)
+        next_view = memoryview(next_index)
+        settled = bytearray(size)
+        heappush = heapq.heappush
+        heappop = heapq.heappop
+        
+        goal_index = self.goal[0] * self.cols + self.goal[1]
+        cost_view[goal_index] = 0.0
+        heap = [(0.0, goal_index)]
+        while heap:
+            dist, current = heappop(heap)
+            if settled[current]:
                 continue
-            
-            # Tạo nút mới với thông tin chi phí di chuyển
-            neighbor = Node(new_row, new_col, parent=node)
-            neighbor.move_cost = move_cost  # Lưu chi phí di chuyển đến nút này
-            neighbors.append(neighbor)
+            settled[current] = 1
+            # Đi từ ô lân cận u vào current tốn move_cost * weight[current]
+            step_weight = weights[current]
+            for delta, move_cost in patterns[masks[current]]:
+                neighbor = current + delta
+                new_cost = dist + move_cost * step_weight
+                if new_cost < cost_view[neighbor]:
+                    cost_view[neighbor] = new_cost
+                    next_view[neighbor] = current
+                    heappush(heap, (new_cost, neighbor))
         
-        return neighbors
+        self._set_arrays(cost, next_index)
     
-    def find_path(self):
+    @classmethod
+    def from_arrays(cls, rows, cols, goal, allow_diagonal, cost, next_index):
         """
-        Tìm đường đi từ Start đến Goal bằng thuật toán A*
+        Tạo DistanceField từ mảng cost/next_index đã có (ví dụ nạp từ ResultStore)
         
-        Thuật toán A*:
-            1. Khởi tạo: Thêm Start vào open_set (danh sách nút cần xét)
-            2. Lặp:
-               a. Chọn nút có f_score nhỏ nhất từ open_set
-               b. Nếu là Goal → tìm thấy đường đi, truy vết
-               c. Thêm vào closed_set (đã xét)
-               d. Xét các nút lân cận:
-                  - Nếu chưa xét hoặc có đường đi tốt hơn → cập nhật và thêm vào open_set
-            3. Nếu open_set rỗng → không tìm thấy đường đi
+        Args:
+            rows, cols: Kích thước lưới
+            goal: (row, col) của goal
+            allow_diagonal: Chế độ di chuyển của trường
+            cost: Mảng float64 (rows * cols)
+            next_index: Mảng int32 (rows * cols)
         
         Returns:
-            Danh sách các nút từ Start đến Goal (đường đi), hoặc None nếu không tìm thấy
+            DistanceField object (flow được tính lại từ next_index)
         """
-        # Khởi tạo nút bắt đầu
-        start_node = Node(self.start[0], self.start[1])
-        start_node.g_score = 0  # Chi phí từ Start đến Start = 0
-        
-        # Chọn heuristic dựa trên allow_diagonal
-        if self.allow_diagonal:
-            start_node.h_score = self.euclidean_distance(
-                start_node.row, start_node.col, 
-                self.goal[0], self.goal[1]
-            )
-        else:
-            start_node.h_score = self.manhattan_distance(
-                start_node.row, start_node.col, 
-                self.goal[0], self.goal[1]
-            )
-        
-        start_node.f_score = start_node.g_score + start_node.h_score  # f = g + h
-        
-        # Danh sách nút cần xét (sắp xếp theo f_score)
-        open_set = [start_node]
-        
-        # Danh sách nút đã xét (để tránh xét lại)
-        closed_set = set()
+        field = cls.__new__(cls)
+        field.rows = rows
+        field.cols = cols
+        field.goal = tuple(goal)
+        field.allow_diagonal = allow_diagonal
+        field.directions = DIRECTIONS_8 if allow_diagonal else DIRECTIONS_4
+        field._set_arrays(np.ascontiguousarray(cost, dtype=np.float64).reshape(-1),
+                          np.ascontiguousarray(next_index, dtype=np.int32).reshape(-1))
+        return field
+    
+    def _set_arrays(self, cost, next_index):
+        """Gán mảng cost/next_index (phẳng) và dựng trường hướng flow từ next_index"""
+        size = self.rows * self.cols
+        self.cost = cost.reshape(self.rows, self.cols)
+        self.next_index = next_index
+        self._cost_view = memoryview(cost)
+        self._next_view = memoryview(next_index)
         
-        # Lặp cho đến khi tìm thấy Goal hoặc hết nút để xét
-        while open_set:
-            # Sắp xếp open_set theo f_score (nút có f_score nhỏ nhất ở đầu)
-            open_set.sort()
-            current = open_set.pop(0)  # Lấy nút có f_score nhỏ nhất
-            
-            # Đánh dấu đã xét
-            closed_set.add((current.row, current.col))
-            
-            # Nếu đến Goal → tìm thấy đường đi
-            if current.row == self.goal[0] and current.col == self.goal[1]:
-                # Truy vết đường đi ngược lại qua parent
-                path = []
-                node = current
-                while node is not None:
-                    path.append((node.row, node.col))
-                    node = node.parent
-                path.reverse()  # Đảo ngược để có đường đi từ Start đến Goal
-                return path
-            
-            # Xét các nút lân cận
-            for neighbor in self.get_neighbors(current):
-                neighbor_pos = (neighbor.row, neighbor.col)
-                
-                # Bỏ qua nếu đã xét
-                if neighbor_pos in closed_set:
-                    continue
-                
-                # Tính chi phí từ Start đến nút lân cận (qua nút hiện tại)
-                # Chi phí phụ thuộc vào hướng di chuyển (1.0 cho 4 hướng, √2 cho chéo)
-                move_cost = getattr(neighbor, 'move_cost', 1.0)  # Mặc định = 1.0
-                tentative_g_score = current.g_score + move_cost
-                
-                # Kiểm tra xem nút lân cận đã có trong open_set chưa
-                neighbor_in_open = False
-                for node in open_set:
-                    if node.row == neighbor.row and node.col == neighbor.col:
-                        neighbor_in_open = True
-                        # Nếu tìm thấy đường đi tốt hơn, cập nhật
-                        if tentative_g_score < node.g_score:
-                            node.parent = current
-                            node.g_score = tentative_g_score
-                            # Chọn heuristic dựa trên allow_diagonal
-                            if self.allow_diagonal:
-                                node.h_score = self.euclidean_distance(
-                                    node.row, node.col, 
-                                    self.goal[0], self.goal[1]
-                                )
-                            else:
-                                node.h_score = self.manhattan_distance(
-                                    node.row, node.col, 
-                                    self.goal[0], self.goal[1]
-                                )
-                            node.f_score = node.g_score + node.h_score  # f = g + h
-                        break
-                
-                # Nếu chưa có trong open_set, thêm vào
-                if not neighbor_in_open:
-                    neighbor.g_score = tentative_g_score
-                    # Chọn heuristic dựa trên allow_diagonal
-                    if self.allow_diagonal:
-                        neighbor.h_score = self.euclidean_distance(
-                            neighbor.row, neighbor.col, 
-                            self.goal[0], self.goal[1]
-                        )
-                    else:
-                        neighbor.h_score = self.manhattan_distance(
-                            neighbor.row, neighbor.col, 
-                            self.goal[0], self.goal[1]
-                        )
-                    neighbor.f_score = neighbor.g_score + neighbor.h_score  # f = g + h
-                    open_set.append(neighbor)
-        
-        # Không tìm thấy đường đi
-        return None
-
-
-class Grid:
-    """
-    Lớp Grid: Quản lý lưới 2D các Node
+        # Hướng của bước kế tiếp: (dr, dc) → chỉ số trong directions
+        flow = np.full(size, -1, dtype=np.int8)
+        has_next = np.flatnonzero(next_index >= 0)
+        rows, cols = np.divmod(has_next, self.cols)
+        next_rows, next_cols = np.divmod(next_index[has_next], self.cols)
+        lookup = np.full((3, 3), -1, dtype=np.int8)
+        for k, (dr, dc, _) in enumerate(self.directions):
+            lookup[dr + 1, dc + 1] = k
+        flow[has_next] = lookup[next_rows - rows + 1, next_cols - cols + 1]
+        self.flow = flow.reshape(self.rows, self.cols)
     
-    Thuộc tính:
-        - rows, cols: Kích thước lưới
-        - grid: Ma trận 2D các Node
-        - start: Vị trí Start
-        - end: Vị trí End
-    """
+    def cost_to_go(self, start):
+        """Chi phí nhỏ nhất từ start (row, col) tới goal (inf nếu không tới được)"""
+        return self._cost_view[start[0] * self.cols + start[1]]
     
-    def __init__(self, rows=20, cols=20):
+    def path_from(self, start):
         """
-        Khởi tạo Grid
+        Lấy đường đi tối ưu từ start tới goal bằng cách lần theo next_index
         
         Args:
-            rows: Số hàng (10-30)
-            cols: Số cột (10-30)
-        """
-        self.rows = max(10, min(30, rows))
-        self.cols = max(10, min(30, cols))
-        self.grid = []
-        self.start = None
-        self.end = None
+            start: (row, col) điểm xuất phát
         
-        # Khởi tạo grid với các Node NORMAL
-        for row in range(self.rows):
-            grid_row = []
-            for col in range(self.cols):
-                grid_row.append(Node(row, col, CELL_NORMAL))
-            self.grid.append(grid_row)
+        Returns:
+            List các (row, col) từ start đến goal, hoặc None nếu không tới được
+        """
+        index = start[0] * self.cols + start[1]
+        if self._cost_view[index] == math.inf:
+            return None
+        next_view = self._next_view
+        cols = self.cols
+        path = [(start[0], start[1])]
+        index = next_view[index]
+        while index != -1:
+            path.append(divmod(index, cols))
+            index = next_view[index]
+        return path
     
-    def get_node(self, row, col):
-        """Lấy Node tại vị trí (row, col)"""
-        if 0 <= row < self.rows and 0 <= col < self.cols:
-            return self.grid[row][col]
+    def next_positions(self, positions):
+        """
+        Bước kế tiếp của nhiều robot cùng lúc (một lần tra mảng, vector hóa)
+        
+        Args:
+            positions: Mảng (N, 2) các (row, col)
+        
+        Returns:
+            Mảng int64 (N, 2) vị trí kế tiếp; robot đã ở goal hoặc không tới được
+            goal giữ nguyên vị trí
+        """
+        positions = np.asarray(positions, dtype=np.int64).reshape(-1, 2)
+        indices = positions[:, 0] * self.cols + positions[:, 1]
+        next_index = self.next_index[indices].astype(np.int64)
+        next_index = np.where(next_index >= 0, next_index, indices)
+        return np.stack(np.divmod(next_index, self.cols), axis=1)
+    
+    def affected_by(self, indices, passable):
+        """
+        Kiểm tra việc sửa các cell có thể làm trường sai không
+        
+        Trường sai nếu một cell bị sửa đang tới được goal, hoặc cell trở thành đi được
+        và nằm cạnh một cell tới được goal (có thể mở ra đường mới).
+        
+        Args:
+            indices: Mảng chỉ số phẳng các cell bị sửa
+            passable: True nếu các cell giờ đi được
+        """
+        indices = np.asarray(indices, dtype=np.int64).reshape(-1)
+        cost = self.cost.reshape(-1)
+        if np.isfinite(cost[indices]).any():
+            return True
+        if not passable:
+            return False
+        rows, cols = np.divmod(indices, self.cols)
+        for dr, dc, _ in self.directions:
+            r = rows + dr
+            c = cols + dc
+            inside = (r >= 0) & (r < self.rows) & (c >= 0) & (c < self.cols)
+            if np.isfinite(cost[r[inside] * self.cols + c[inside]]).any():
+                return True
+        return False
+
+
+class SearchState:
+    """
+    Lớp SearchState: Vùng nhớ trạng thái tìm đường dùng lại giữa các lần tìm
+    
+    Gồm các mảng phẳng (một phần tử cho mỗi cell):
+        - g: float64, chi phí từ Start
+        - parent: int32, chỉ số cell cha (-1 nếu không có)
+        - seen: uint32, "tem thế hệ" - cell đã được sinh ra trong lần tìm hiện tại
+        - closed: uint32, "tem thế hệ" - cell đã được mở rộng (đóng) trong lần tìm hiện tại
+    
+    Mỗi lần tìm đường gọi begin() để tăng generation. g/parent của một cell chỉ có
+    nghĩa khi seen[cell] == generation, nên reset là O(1) thay vì quét toàn bộ lưới:
+    một truy vấn chỉ tốn chi phí cho những cell mà nó thực sự chạm tới.
+    """
+    
+    # Khi bộ đếm sắp tràn uint32 thì xóa các mảng tem và đếm lại từ 1
+    MAX_GENERATION = 2 ** 32 - 1
+    
+    def __init__(self, size):
+        """
+        Args:
+            size: Số cell của lưới (rows * cols)
+        """
+        self.size = size
+        self.g = np.zeros(size, dtype=np.float64)
+        self.parent = np.full(size, -1, dtype=np.int32)
+        self.seen = np.zeros(size, dtype=np.uint32)
+        self.closed = np.zeros(size, dtype=np.uint32)
+        self.g_view = memoryview(self.g)
+        self.parent_view = memoryview(self.parent)
+        self.seen_view = memoryview(self.seen)
+        self.closed_view = memoryview(self.closed)
+        self.generation = 0
+    
+    def begin(self):
+        """
+        Bắt đầu một lần tìm mới (O(1)) và trả về generation hiện tại
+        
+        Returns:
+            Số nguyên generation dùng để so sánh với seen/closed
+        """
+        self.generation += 1
+        if self.generation >= self.MAX_GENERATION:
+            self.seen.fill(0)
+            self.closed.fill(0)
+            self.generation = 1
+        return self.generation
+    
+    def reset(self):
+        """Vô hiệu hóa toàn bộ dữ liệu của lần tìm trước (O(1))"""
+        self.begin()
+    
+    def g_score(self, index):
+        """g của cell trong lần tìm hiện tại (inf nếu chưa được sinh ra)"""
+        if self.seen_view[index] != self.generation:
+            return float('inf')
+        return self.g_view[index]
+    
+    def parent_of(self, index):
+        """Chỉ số cell cha trong lần tìm hiện tại (-1 nếu không có)"""
+        if self.seen_view[index] != self.generation:
+            return -1
+        return self.parent_view[index]
+    
+    def is_closed(self, index):
+        """True nếu cell đã được mở rộng trong lần tìm hiện tại"""
+        return self.closed_view[index] == self.generation
+    
+    def reconstruct(self, goal, cols):
+        """
+        Truy vết đường đi từ goal ngược về Start qua mảng parent
+        
+        Returns:
+            List các (row, col) từ Start đến goal
+        """
+        parents = self.parent_view
+        path = []
+        index = goal
+        while index >= 0:
+            path.append(divmod(index, cols))
+            index = parents[index]
+        path.reverse()
+        return path
+
+
+class HeapqOpenList:
+    """
+    Lớp HeapqOpenList: Open list dùng heapq với "xóa lười" (lazy deletion)
+    
+    Giảm khóa bằng cách đẩy thêm bản ghi (key, index) mới; bản ghi cũ vẫn nằm trong
+    heap và bị bỏ qua khi pop (stale pop). Đơn giản và nhanh vì heapq viết bằng C,
+    nhưng heap có thể phình to trên bản đồ nhiều TRAP.
+    
+    Thuộc tính (bộ đếm, reset mỗi lần clear()):
+        - pushes: Số bản ghi được đẩy vào heap
+        - pops: Số cell được lấy ra (không tính bản ghi cũ)
+        - stale_pops: Số bản ghi cũ bị bỏ qua khi pop
+        - decrease_keys: Số lần giảm khóa của một cell đang nằm trong open list
+        - peak_size: Kích thước heap lớn nhất (kể cả bản ghi cũ)
+    """
+    
+    name = 'heapq'
+    
+    def __init__(self, size):
+        """
+        Args:
+            size: Số cell của lưới (rows * cols)
+        """
+        self.size = size
+        self.heap = []
+        self.keys = np.full(size, np.inf, dtype=np.float64)
+        self.keys_view = memoryview(self.keys)
+        self.queued = bytearray(size)
+        self.live = 0
+        self.reset_counters()
+    
+    def reset_counters(self):
+        """Đưa các bộ đếm về 0"""
+        self.pushes = 0
+        self.pops = 0
+        self.stale_pops = 0
+        self.decrease_keys = 0
+        self.peak_size = 0
+    
+    def clear(self):
+        """Làm rỗng open list (chỉ tốn chi phí cho các bản ghi còn lại) và reset bộ đếm"""
+        queued = self.queued
+        for key, index in self.heap:
+            queued[index] = 0
+        self.heap = []
+        self.live = 0
+        self.reset_counters()
+    
+    def drain(self):
+        """
+        Lấy hết các cell còn trong open list (không tính vào bộ đếm pops)
+        
+        Returns:
+            List chỉ số phẳng của các cell, theo thứ tự khóa tăng dần
+        """
+        indices = []
+        while self:
+            indices.append(self.pop()[1])
+            self.pops -= 1
+        return indices
+    
+    def __len__(self):
+        """Số cell đang thực sự nằm trong open list"""
+        return self.live
+    
+    def push(self, index, key):
+        """
+        Thêm cell vào open list, hoặc giảm khóa nếu cell đã có với khóa lớn hơn
+        
+        Args:
+            index: Chỉ số phẳng của cell
+            key: Độ ưu tiên (g với Dijkstra, f với A*)
+        """
+        keys = self.keys_view
+        if self.queued[index]:
+            if key >= keys[index]:
+                return
+            self.decrease_keys += 1
+        else:
+            self.queued[index] = 1
+            self.live += 1
+        keys[index] = key
+        heapq.heappush(self.heap, (key, index))
+        self.pushes += 1
+        if len(self.heap) > self.peak_size:
+            self.peak_size = len(self.heap)
+    
+    def pop(self):
+        """
+        Lấy cell có khóa nhỏ nhất (hòa thì chỉ số nhỏ hơn trước)
+        
+        Returns:
+            Tuple (key, index)
+        """
+        heap = self.heap
+        queued = self.queued
+        keys = self.keys_view
+        while heap:
+            key, index = heapq.heappop(heap)
+            if queued[index] and key == keys[index]:
+                queued[index] = 0
+                self.live -= 1
+                self.pops += 1
+                return key, index
+            self.stale_pops += 1
+        raise IndexError('pop from empty open list')
+    
+    def peek_key(self):
+        """
+        Khóa nhỏ nhất hiện có (bỏ các bản ghi cũ ở đỉnh heap)
+        
+        Returns:
+            Khóa nhỏ nhất, hoặc inf nếu open list rỗng
+        """
+        heap = self.heap
+        queued = self.queued
+        keys = self.keys_view
+        while heap:
+            key, index = heap[0]
+            if queued[index] and key == keys[index]:
+                return key
+            heapq.heappop(heap)
+            self.stale_pops += 1
+        return float('inf')
+    
+    def stats(self):
+        """Trả về dict các bộ đếm"""
+        return {
+            'backend': self.name,
+            'pushes': self.pushes,
+            'pops': self.pops,
+            'stale_pops': self.stale_pops,
+            'decrease_keys': self.decrease_keys,
+            'peak_size': self.peak_size,
+        }
+
+
+class IndexedHeap(HeapqOpenList):
+    """
+    Lớp IndexedHeap: Binary heap có bảng vị trí, hỗ trợ decrease-key thật sự
+    
+    Mỗi cell xuất hiện trong heap nhiều nhất một lần; pos[index] cho biết vị trí của
+    cell trong heap (-1 nếu không có) để giảm khóa tại chỗ bằng sift-up. Vì vậy heap
+    luôn bị chặn bởi số cell trên biên tìm kiếm và không bao giờ có stale pop.
+    Thứ tự lấy ra giống hệt HeapqOpenList: so sánh theo (key, index).
+    """
+    
+    name = 'indexed'
+    
+    def __init__(self, size):
+        """
+        Args:
+            size: Số cell của lưới (rows * cols)
+        """
+        self.size = size
+        self.heap = []
+        self.pos = np.full(size, -1, dtype=np.int32)
+        self.pos_view = memoryview(self.pos)
+        self.reset_counters()
+    
+    def clear(self):
+        """Làm rỗng heap (chỉ tốn chi phí cho các cell còn lại) và reset bộ đếm"""
+        pos = self.pos_view
+        for key, index in self.heap:
+            pos[index] = -1
+        self.heap = []
+        self.reset_counters()
+    
+    def __len__(self):
+        return len(self.heap)
+    
+    def push(self, index, key):
+        """
+        Thêm cell vào heap, hoặc giảm khóa tại chỗ nếu cell đã có với khóa lớn hơn
+        
+        Args:
+            index: Chỉ số phẳng của cell
+            key: Độ ưu tiên (g với Dijkstra, f với A*)
+        """
+        heap = self.heap
+        position = self.pos_view[index]
+        if position >= 0:
+            if key >= heap[position][0]:
+                return
+            self.decrease_keys += 1
+        else:
+            position = len(heap)
+            heap.append(None)
+            if len(heap) > self.peak_size:
+                self.peak_size = len(heap)
+        self.pushes += 1
+        self._sift_up(position, (key, index))
+    
+    def pop(self):
+        """
+        Lấy cell có khóa nhỏ nhất (hòa thì chỉ số nhỏ hơn trước)
+        
+        Returns:
+            Tuple (key, index)
+        """
+        heap = self.heap
+        if not heap:
+            raise IndexError('pop from empty open list')
+        top = heap[0]
+        last = heap.pop()
+        self.pos_view[top[1]] = -1
+        if heap:
+            self._sift_down(0, last)
+        self.pops += 1
+        return top
+    
+    def peek_key(self):
+        """Khóa nhỏ nhất hiện có, hoặc inf nếu heap rỗng"""
+        return self.heap[0][0] if self.heap else float('inf')
+    
+    def _sift_up(self, position, entry):
+        """Đặt entry vào vị trí position rồi đẩy lên cho đến khi cha nhỏ hơn"""
+        heap = self.heap
+        pos = self.pos_view
+        while position > 0:
+            parent = (position - 1) >> 1
+            parent_entry = heap[parent]
+            if entry < parent_entry:
+                heap[position] = parent_entry
+                pos[parent_entry[1]] = position
+                position = parent
+            else:
+                break
+        heap[position] = entry
+        pos[entry[1]] = position
+    
+    def _sift_down(self, position, entry):
+        """Đặt entry vào vị trí position rồi đẩy xuống cho đến khi các con lớn hơn"""
+        heap = self.heap
+        pos = self.pos_view
+        size = len(heap)
+        child = 2 * position + 1
+        while child < size:
+            right = child + 1
+            if right < size and heap[right] < heap[child]:
+                child = right
+            child_entry = heap[child]
+            if child_entry < entry:
+                heap[position] = child_entry
+                pos[child_entry[1]] = position
+                position = child
+                child = 2 * position + 1
+            else:
+                break
+        heap[position] = entry
+        pos[entry[1]] = position
+
+
+class BucketQueue(HeapqOpenList):
+    """
+    Lớp BucketQueue: Hàng đợi thùng (thuật toán Dial) cho khóa là bội số của 0.5
+    
+    Ở chế độ 4 hướng mọi chi phí bước là 1 * weight (0.5, 1 hoặc 5) nên g, và f của
+    A* với Manhattan * weight nhỏ nhất, đều là bội số chính xác của 0.5. Mỗi khóa
+    ứng với một thùng (slot = key / 0.5); con trỏ chỉ tiến lên khi các khóa lấy ra
+    không giảm, nên push/pop là O(1) khấu hao thay vì O(log n).
+    
+    Giảm khóa bằng cách thêm bản ghi mới (bản ghi cũ bị bỏ qua khi pop) như
+    HeapqOpenList. Các cell cùng khóa được lấy theo thứ tự vào sau ra trước.
+    Khóa không phải bội số của 0.5 (ví dụ chi phí chéo √2) gây ValueError. Vì vậy chỉ
+    dùng với Dijkstra, A*, JPS và Dijkstra hai chiều; ARA* (khóa nhân epsilon) và A* hai
+    chiều (thế năng trung bình, bội số của 0.25) từ chối open list này ngay từ đầu.
+    """
+    
+    name = 'bucket'
+    RESOLUTION = 0.5
+    
+    def __init__(self, size):
+        """
+        Args:
+            size: Số cell của lưới (rows * cols)
+        """
+        self.size = size
+        self.buckets = {}
+        self.cursor = 0
+        self.count = 0
+        self.keys = np.full(size, np.inf, dtype=np.float64)
+        self.keys_view = memoryview(self.keys)
+        self.queued = bytearray(size)
+        self.live = 0
+        self.reset_counters()
+    
+    def clear(self):
+        """Làm rỗng hàng đợi (chỉ tốn chi phí cho các bản ghi còn lại) và reset bộ đếm"""
+        queued = self.queued
+        for bucket in self.buckets.values():
+            for index in bucket:
+                queued[index] = 0
+        self.buckets = {}
+        self.cursor = 0
+        self.count = 0
+        self.live = 0
+        self.reset_counters()
+    
+    def push(self, index, key):
+        """
+        Thêm cell vào thùng của khóa, hoặc giảm khóa nếu cell đã có với khóa lớn hơn
+        
+        Args:
+            index: Chỉ số phẳng của cell
+            key: Độ ưu tiên, phải là bội số của 0.5
+        """
+        units = key / self.RESOLUTION
+        slot = int(units)
+        if slot != units:
+            raise ValueError(f"BucketQueue requires keys that are multiples of {self.RESOLUTION}, got {key}")
+        keys = self.keys_view
+        if self.queued[index]:
+            if key >= keys[index]:
+                return
+            self.decrease_keys += 1
+        else:
+            self.queued[index] = 1
+            self.live += 1
+        keys[index] = key
+        bucket = self.buckets.get(slot)
+        if bucket is None:
+            self.buckets[slot] = [index]
+        else:
+            bucket.append(index)
+        if slot < self.cursor:
+            self.cursor = slot
+        self.count += 1
+        self.pushes += 1
+        if self.count > self.peak_size:
+            self.peak_size = self.count
+    
+    def _advance(self):
+        """
+        Đưa con trỏ tới thùng đầu tiên có bản ghi còn hiệu lực (bỏ các bản ghi cũ)
+        
+        Returns:
+            Thùng (list) ở con trỏ, hoặc None nếu hàng đợi rỗng
+        """
+        buckets = self.buckets
+        queued = self.queued
+        keys = self.keys_view
+        while self.count:
+            bucket = buckets.get(self.cursor)
+            if not bucket:
+                buckets.pop(self.cursor, None)
+                self.cursor += 1
+                continue
+            index = bucket[-1]
+            if queued[index] and keys[index] == self.cursor * self.RESOLUTION:
+                return bucket
+            bucket.pop()
+            self.count -= 1
+            self.stale_pops += 1
         return None
     
-    def set_cell_type(self, row, col, cell_type):
-        """Đặt loại cell tại vị trí (row, col)"""
-        node = self.get_node(row, col)
-        if node:
-            # Nếu đặt Start hoặc End, xóa Start/End cũ
-            if cell_type == CELL_START:
-                if self.start:
-                    old_node = self.get_node(self.start[0], self.start[1])
-                    if old_node:
-                        old_node.cell_type = CELL_NORMAL
-                self.start = (row, col)
-            elif cell_type == CELL_END:
-                if self.end:
-                    old_node = self.get_node(self.end[0], self.end[1])
-                    if old_node:
-                        old_node.cell_type = CELL_NORMAL
-                self.end = (row, col)
+    def pop(self):
+        """
+        Lấy một cell có khóa nhỏ nhất
+        
+        Returns:
+            Tuple (key, index)
+        """
+        bucket = self._advance()
+        if bucket is None:
+            raise IndexError('pop from empty open list')
+        index = bucket.pop()
+        self.count -= 1
+        self.queued[index] = 0
+        self.live -= 1
+        self.pops += 1
+        return self.cursor * self.RESOLUTION, index
+    
+    def peek_key(self):
+        """Khóa nhỏ nhất hiện có, hoặc inf nếu hàng đợi rỗng"""
+        if self._advance() is None:
+            return float('inf')
+        return self.cursor * self.RESOLUTION
+
+
+class RadixHeap(HeapqOpenList):
+    """
+    Lớp RadixHeap: Radix heap cho khóa số thực không giảm (Dijkstra, A* nhất quán)
+    
+    Khóa được đổi sang số nguyên 64 bit giữ nguyên thứ tự. Bản ghi nằm ở thùng i
+    nếu bit cao nhất khác nhau giữa khóa và khóa vừa lấy ra (last) là bit i - 1
+    (thùng 0: bằng last). Khi thùng 0 rỗng, thùng khác rỗng đầu tiên được chia lại
+    xuống các thùng thấp hơn quanh khóa nhỏ nhất của nó; mỗi bản ghi chỉ đi xuống
+    tối đa 64 lần nên chi phí khấu hao là O(1) mỗi thao tác với khóa 64 bit.
+    
+    Giảm khóa bằng cách thêm bản ghi mới như HeapqOpenList. Khóa nhỏ hơn last (sai
+    số làm tròn của heuristic, hoặc ARA* sắp lại khóa) làm heap được chia lại quanh
+    last = 0, tốn O(số bản ghi) nhưng vẫn đúng thứ tự.
+    """
+    
+    name = 'radix'
+    BUCKET_COUNT = 65
+    
+    def __init__(self, size):
+        """
+        Args:
+            size: Số cell của lưới (rows * cols)
+        """
+        self.size = size
+        self.buckets = [[] for _ in range(self.BUCKET_COUNT)]
+        self.last = 0
+        self.count = 0
+        self.keys = np.full(size, np.inf, dtype=np.float64)
+        self.keys_view = memoryview(self.keys)
+        self.queued = bytearray(size)
+        self.live = 0
+        self.reset_counters()
+    
+    @staticmethod
+    def _ordered_bits(key):
+        """Đổi số thực thành số nguyên không dấu 64 bit có cùng thứ tự"""
+        bits = struct.unpack('<Q', struct.pack('<d', key))[0]
+        if bits >> 63:
+            return bits ^ 0xFFFFFFFFFFFFFFFF
+        return bits | 0x8000000000000000
+    
+    def clear(self):
+        """Làm rỗng heap (chỉ tốn chi phí cho các bản ghi còn lại) và reset bộ đếm"""
+        queued = self.queued
+        for bucket in self.buckets:
+            for bits, key, index in bucket:
+                queued[index] = 0
+            bucket.clear()
+        self.last = 0
+        self.count = 0
+        self.live = 0
+        self.reset_counters()
+    
+    def push(self, index, key):
+        """
+        Thêm cell vào heap, hoặc giảm khóa nếu cell đã có với khóa lớn hơn
+        
+        Args:
+            index: Chỉ số phẳng của cell
+            key: Độ ưu tiên (không nhỏ hơn khóa vừa lấy ra)
+        """
+        keys = self.keys_view
+        if self.queued[index]:
+            if key >= keys[index]:
+                return
+            self.decrease_keys += 1
+        else:
+            self.queued[index] = 1
+            self.live += 1
+        keys[index] = key
+        bits = self._ordered_bits(key)
+        if bits < self.last:
+            self._rebase()
+        self.buckets[(bits ^ self.last).bit_length()].append((bits, key, index))
+        self.count += 1
+        self.pushes += 1
+        if self.count > self.peak_size:
+            self.peak_size = self.count
+    
+    def _rebase(self):
+        """Chia lại mọi bản ghi với last = 0 (mọi khóa đều >= last)"""
+        entries = []
+        for bucket in self.buckets:
+            entries.extend(bucket)
+            bucket.clear()
+        self.last = 0
+        for entry in entries:
+            self.buckets[entry[0].bit_length()].append(entry)
+    
+    def _refill(self):
+        """
+        Đảm bảo thùng 0 có bản ghi còn hiệu lực, chia lại thùng khác nếu cần
+        
+        Returns:
+            True nếu heap còn cell, False nếu rỗng
+        """
+        buckets = self.buckets
+        queued = self.queued
+        keys = self.keys_view
+        while True:
+            first = buckets[0]
+            while first:
+                bits, key, index = first[-1]
+                if queued[index] and keys[index] == key:
+                    return True
+                first.pop()
+                self.count -= 1
+                self.stale_pops += 1
+            
+            for i in range(1, self.BUCKET_COUNT):
+                if buckets[i]:
+                    break
+            else:
+                return False
+            
+            entries = buckets[i]
+            buckets[i] = []
+            live = []
+            for entry in entries:
+                if queued[entry[2]] and keys[entry[2]] == entry[1]:
+                    live.append(entry)
+                else:
+                    self.count -= 1
+                    self.stale_pops += 1
+            if not live:
+                continue
+            
+            last = min(live)[0]
+            self.last = last
+            for entry in live:
+                buckets[(entry[0] ^ last).bit_length()].append(entry)
+    
+    def pop(self):
+        """
+        Lấy một cell có khóa nhỏ nhất
+        
+        Returns:
+            Tuple (key, index)
+        """
+        if not self._refill():
+            raise IndexError('pop from empty open list')
+        bits, key, index = self.buckets[0].pop()
+        self.count -= 1
+        self.queued[index] = 0
+        self.live -= 1
+        self.pops += 1
+        return key, index
+    
+    def peek_key(self):
+        """Khóa nhỏ nhất hiện có, hoặc inf nếu heap rỗng"""
+        if not self._refill():
+            return float('inf')
+        return self.buckets[0][-1][1]
+
+
+# Các open list có thể chọn cho Dijkstra/A* (tên → lớp)
+OPEN_LISTS = {
+    HeapqOpenList.name: HeapqOpenList,
+    IndexedHeap.name: IndexedHeap,
+    BucketQueue.name: BucketQueue,
+    RadixHeap.name: RadixHeap,
+}
+
+
+class CountingDeque(collections.deque):
+    """
+    Lớp CountingDeque: deque đếm push/pop và kích thước lớn nhất (hàng đợi BFS)
+    
+    Chỉ được dùng khi PathfindingAlgorithms bật instrument; khi tắt, BFS dùng deque
+    thường nên vòng lặp không tốn thêm gì.
+    """
+    
+    def __init__(self, iterable=()):
+        super().__init__(iterable)
+        self.pushes = len(self)
+        self.pops = 0
+        self.peak_size = len(self)
+    
+    def append(self, item):
+        super().append(item)
+        self.pushes += 1
+        if len(self) > self.peak_size:
+            self.peak_size = len(self)
+    
+    def popleft(self):
+        self.pops += 1
+        return super().popleft()
+
+
+class CountingStack(list):
+    """Lớp CountingStack: list đếm push/pop và kích thước lớn nhất (ngăn xếp DFS)"""
+    
+    def __init__(self, iterable=()):
+        super().__init__(iterable)
+        self.pushes = len(self)
+        self.pops = 0
+        self.peak_size = len(self)
+    
+    def append(self, item):
+        super().append(item)
+        self.pushes += 1
+        if len(self) > self.peak_size:
+            self.peak_size = len(self)
+    
+    def pop(self):
+        self.pops += 1
+        return super().pop()
+
+
+class CountingPatterns(list):
+    """Lớp CountingPatterns: bản sao NeighborTable.patterns đếm số lần tra lân cận"""
+    
+    def __init__(self, patterns):
+        super().__init__(patterns)
+        self.calls = 0
+    
+    def __getitem__(self, mask):
+        self.calls += 1
+        return list.__getitem__(self, mask)
+
+
+# Bộ đếm của PathfindingAlgorithms(instrument=True) → nhãn hiển thị (UI, CLI)
+SEARCH_COUNTERS = {
+    'nodes_expanded': 'Expanded',
+    'nodes_generated': 'Generated',
+    'pushes': 'Pushes',
+    'pops': 'Pops',
+    'stale_pops': 'Stale pops',
+    'reopenings': 'Re-openings',
+    'peak_open_size': 'Peak open',
+    'peak_closed_size': 'Peak closed',
+    'neighbor_calls': 'Neighbor calls',
+}
+
+
+class CancellationToken:
+    """
+    Lớp CancellationToken: Cờ hủy dùng chung giữa bên gọi và lần tìm đang chạy
+    
+    cancel() chỉ gán một thuộc tính nên gọi được từ thread khác (vòng điều khiển,
+    giao diện); thuật toán đọc cờ mỗi SearchBudget.check_interval lần mở rộng.
+    Không có tác dụng qua process (solve_many với workers, SearchProcess) - dùng
+    deadline/max_expansions hoặc SearchProcess.cancel() cho trường hợp đó.
+    """
+    
+    def __init__(self):
+        self.cancelled = False
+    
+    def cancel(self):
+        """Yêu cầu dừng lần tìm đang dùng token này"""
+        self.cancelled = True
+    
+    def reset(self):
+        """Xóa cờ hủy để dùng lại token"""
+        self.cancelled = False
+
+
+class SearchBudget:
+    """
+    Lớp SearchBudget: Giới hạn một lần tìm theo token hủy, thời điểm và số lần mở rộng
+    
+    Truyền qua tham số budget của các thuật toán trong PathfindingAlgorithms. Hết ngân
+    sách thì thuật toán trả về ngay với stats['budget_exhausted'] = True và
+    stats['exhausted_by'] ('cancelled', 'deadline' hoặc 'max_expansions'); riêng A*
+    trả thêm đường đi dở dang tới ô đã đóng gần End nhất (stats['partial'] = True).
+    Token và đồng hồ được kiểm tra ở lần mở rộng đầu tiên rồi mỗi check_interval lần
+    (perf_counter() đắt hơn một lần mở rộng), max_expansions được kiểm tra mỗi lần.
+    
+    Mỗi lần tìm gọi begin() nên cùng một SearchBudget dùng lại được cho nhiều lần tìm
+    nối tiếp (ví dụ solve_many): max_expansions và time_limit tính cho từng lần.
+    
+    Thuộc tính:
+        - token: CancellationToken (hoặc None)
+        - deadline: Mốc time.perf_counter() (giây) phải dừng trước đó (hoặc None)
+        - time_limit: Thời gian tối đa (giây) của mỗi lần tìm, tính từ begin() (hoặc None)
+        - max_expansions: Số lần mở rộng tối đa của mỗi lần tìm (hoặc None)
+        - expansions: Số lần mở rộng của lần tìm gần nhất
+        - exhausted_by: Lý do dừng của lần tìm gần nhất (None nếu chưa hết ngân sách)
+    """
+    
+    CHECK_INTERVAL = 64
+    
+    def __init__(self, token=None, deadline=None, time_limit=None, max_expansions=None,
+                 check_interval=CHECK_INTERVAL):
+        """
+        Args:
+            token: CancellationToken
+            deadline: Mốc time.perf_counter() tuyệt đối (giây)
+            time_limit: Giây cho mỗi lần tìm (dùng mốc sớm hơn nếu có cả deadline)
+            max_expansions: Số lần mở rộng tối đa (>= 0)
+            check_interval: Số lần mở rộng giữa hai lần kiểm tra token/đồng hồ (>= 1)
+        """
+        if max_expansions is not None and max_expansions < 0:
+            raise ValueError("max_expansions must be non-negative")
+        if time_limit is not None and time_limit < 0:
+            raise ValueError("time_limit must be non-negative")
+        if check_interval < 1:
+            raise ValueError("check_interval must be at least 1")
+        self.token = token
+        self.deadline = deadline
+        self.time_limit = time_limit
+        self.max_expansions = max_expansions
+        self.check_interval = check_interval
+        self.expansions = 0
+        self.exhausted_by = None
+        self._deadline = deadline
+    
+    def begin(self):
+        """Bắt đầu một lần tìm: đặt lại bộ đếm và tính mốc dừng"""
+        self.expansions = 0
+        self.exhausted_by = None
+        deadline = self.deadline
+        if self.time_limit is not None:
+            limit = time.perf_counter() + self.time_limit
+            deadline = limit if deadline is None else min(deadline, limit)
+        self._deadline = deadline
+        return self
+    
+    def check(self):
+        """
+        Kiểm tra token và đồng hồ ngay (không tính là một lần mở rộng)
+        
+        Returns:
+            True nếu phải dừng
+        """
+        if self.token is not None and self.token.cancelled:
+            self.exhausted_by = 'cancelled'
+            return True
+        if self._deadline is not None and time.perf_counter() >= self._deadline:
+            self.exhausted_by = 'deadline'
+            return True
+        return False
+    
+    def spend(self):
+        """
+        Gọi trước mỗi lần mở rộng
+        
+        Returns:
+            True nếu hết ngân sách (không được mở rộng nữa), False nếu đã tính thêm một lần
+        """
+        if self.max_expansions is not None and self.expansions >= self.max_expansions:
+            self.exhausted_by = 'max_expansions'
+            return True
+        if self.expansions % self.check_interval == 0 and self.check():
+            return True
+        self.expansions += 1
+        return False
+    
+    def annotate(self, stats):
+        """Thêm budget_exhausted (và exhausted_by nếu hết ngân sách) vào stats"""
+        stats['budget_exhausted'] = self.exhausted_by is not None
+        if self.exhausted_by is not None:
+            stats['exhausted_by'] = self.exhausted_by
+        return stats
+
+
+class TimingHistogram:
+    """
+    Lớp TimingHistogram: Gom thời gian (ns) của nhiều lần tìm vào histogram log
+    
+    Mỗi chuỗi (series) - 'total' và từng pha trong stats['phases_ns'] - có các thùng
+    rộng 2^(1/BUCKETS_PER_OCTAVE) lần (~19%), nên truy vấn dưới 1 ms trên bản đồ nhỏ
+    vẫn phân biệt được thay vì đều hiện 0.0 ms. Phân vị được ước lượng bằng cận trên
+    của thùng chứa nó (không vượt quá max thực).
+    
+    Thuộc tính:
+        - buckets: Dict series → dict chỉ số thùng → số lần
+        - count, total_ns, min_ns, max_ns: Dict series → giá trị
+    """
+    
+    BUCKETS_PER_OCTAVE = 4
+    
+    def __init__(self):
+        self.buckets = {}
+        self.count = {}
+        self.total_ns = {}
+        self.min_ns = {}
+        self.max_ns = {}
+    
+    def add(self, series, ns):
+        """Thêm một mẫu ns vào chuỗi series"""
+        ns = max(int(ns), 1)
+        bucket = int(math.log2(ns) * self.BUCKETS_PER_OCTAVE)
+        buckets = self.buckets.setdefault(series, {})
+        buckets[bucket] = buckets.get(bucket, 0) + 1
+        self.count[series] = self.count.get(series, 0) + 1
+        self.total_ns[series] = self.total_ns.get(series, 0) + ns
+        self.min_ns[series] = min(self.min_ns.get(series, ns), ns)
+        self.max_ns[series] = max(self.max_ns.get(series, ns), ns)
+    
+    def add_stats(self, stats):
+        """Thêm time_taken ('total') và các pha trong phases_ns của một dict stats"""
+        if 'time_taken' in stats:
+            self.add('total', stats['time_taken'] * 1e6)
+        for phase, ns in stats.get('phases_ns', {}).items():
+            self.add(phase, ns)
+    
+    def percentile(self, series, p):
+        """Phân vị p (0-100) của chuỗi series, tính bằng ns"""
+        rank = p / 100 * self.count[series]
+        seen = 0
+        for bucket in sorted(self.buckets[series]):
+            seen += self.buckets[series][bucket]
+            if seen >= rank:
+                upper = 2 ** ((bucket + 1) / self.BUCKETS_PER_OCTAVE)
+                return min(max(upper, self.min_ns[series]), self.max_ns[series])
+        return self.max_ns[series]
+    
+    def summary(self, percentiles=(50, 90, 99)):
+        """
+        Returns:
+            Dict series → dict count, mean, min, p50/p90/p99, max (µs)
+        """
+        result = {}
+        for series in self.count:
+            row = {'count': self.count[series],
+                   'mean': self.total_ns[series] / self.count[series] / 1000,
+                   'min': self.min_ns[series] / 1000}
+            for p in percentiles:
+                row[f'p{p}'] = self.percentile(series, p) / 1000
+            row['max'] = self.max_ns[series] / 1000
+            result[series] = row
+        return result
+    
+    def format_table(self, percentiles=(50, 90, 99)):
+        """Bảng văn bản của summary() (µs), mỗi chuỗi một dòng"""
+        columns = ['mean', 'min'] + [f'p{p}' for p in percentiles] + ['max']
+        lines = [f"{'Pha':<12} {'Số lần':>7}" + "".join(f"{column:>10}" for column in columns)]
+        for series, row in self.summary(percentiles).items():
+            lines.append(f"{series:<12} {row['count']:>7}" + "".join(f"{row[column]:>10.1f}" for column in columns))
+        return "\n".join(lines)
+
+
+class AStarRobot:
+    """
+    Lớp AStarRobot: Chứa logic tìm đường bằng thuật toán A*
+    
+    Thuật toán A* hoạt động:
+        1. Mở rộng nút có f_score nhỏ nhất
+        2. f_score = g_score + h_score
+           - g_score: Chi phí thực tế từ Start đến nút hiện tại
+           - h_score: Chi phí ước tính từ nút hiện tại đến Goal (Manhattan Distance)
+        3. Khi đến Goal, truy vết đường đi ngược lại qua parent
+    """
+    
+    def __init__(self, room_map, start, goal, allow_diagonal=False):
+        """
+        Khởi tạo robot với bản đồ và điểm bắt đầu/kết thúc
+        
+        Args:
+            room_map: Ma trận 2D đại diện cho bản đồ (0=đi được, 1=vật cản)
+            start: Tuple (row, col) điểm bắt đầu
+            goal: Tuple (row, col) điểm đích
+            allow_diagonal: True nếu cho phép đi chéo (8 hướng), False nếu chỉ 4 hướng
+        """
+        self.room_map = room_map        # Bản đồ phòng
+        self.rows = len(room_map)       # Số hàng
+        self.cols = len(room_map[0])    # Số cột
+        self.start = start              # Điểm bắt đầu (row, col)
+        self.goal = goal                # Điểm đích (row, col)
+        self.allow_diagonal = allow_diagonal  # Cho phép đi chéo hay không
+        
+        # 4 hướng di chuyển cơ bản: Lên, Xuống, Trái, Phải
+        self.directions_4 = [
+            (-1, 0, 1.0),  # Lên (giảm hàng), chi phí = 1
+            (1, 0, 1.0),   # Xuống (tăng hàng), chi phí = 1
+            (0, -1, 1.0),  # Trái (giảm cột), chi phí = 1
+            (0, 1, 1.0)    # Phải (tăng cột), chi phí = 1
+        ]
+        
+        # 8 hướng di chuyển (bao gồm cả đường chéo)
+        # Chi phí đường chéo = √2 ≈ 1.414
+        import math
+        diagonal_cost = math.sqrt(2)
+        self.directions_8 = [
+            (-1, 0, 1.0),      # Lên
+            (1, 0, 1.0),       # Xuống
+            (0, -1, 1.0),      # Trái
+            (0, 1, 1.0),       # Phải
+            (-1, -1, diagonal_cost),  # Lên-Trái (chéo)
+            (-1, 1, diagonal_cost),   # Lên-Phải (chéo)
+            (1, -1, diagonal_cost),   # Xuống-Trái (chéo)
+            (1, 1, diagonal_cost)     # Xuống-Phải (chéo)
+        ]
+        
+        # Chọn hướng di chuyển dựa trên allow_diagonal
+        self.directions = self.directions_8 if allow_diagonal else self.directions_4
+        
+        # Thống kê của lần find_path() gần nhất (dict như PathfindingAlgorithms)
+        self.stats = {}
+    
+    def manhattan_distance(self, row1, col1, row2, col2):
+        """
+        Tính khoảng cách Manhattan giữa 2 điểm
+        
+        Công thức: |row1 - row2| + |col1 - col2|
+        
+        Manhattan Distance phù hợp với di chuyển 4 hướng vì:
+        - Đây là khoảng cách thực tế tối thiểu khi chỉ đi Lên/Xuống/Trái/Phải
+        - Luôn admissible (không bao giờ đánh giá quá cao) → đảm bảo tìm được đường tối ưu
+        - Tính toán nhanh hơn Euclidean (không cần căn bậc 2)
+        
+        Args:
+            row1, col1: Tọa độ điểm 1
+            row2, col2: Tọa độ điểm 2
+        
+        Returns:
+            Khoảng cách Manhattan (số thực)
+        """
+        return abs(row1 - row2) + abs(col1 - col2)
+    
+    def euclidean_distance(self, row1, col1, row2, col2):
+        """
+        Tính khoảng cách Euclidean giữa 2 điểm
+        
+        Công thức: √((row1 - row2)² + (col1 - col2)²)
+        
+        Euclidean Distance phù hợp với di chuyển 8 hướng (có chéo) vì:
+        - Đây là khoảng cách đường thẳng thực tế
+        - Luôn admissible (không bao giờ đánh giá quá cao) → đảm bảo tìm được đường tối ưu
+        - Phản ánh chính xác chi phí khi có thể đi chéo
+        
+        Args:
+            row1, col1: Tọa độ điểm 1
+            row2, col2: Tọa độ điểm 2
+        
+        Returns:
+            Khoảng cách Euclidean (số thực)
+        """
+        import math
+        return math.sqrt((row1 - row2) ** 2 + (col1 - col2) ** 2)
+    
+    def is_valid(self, row, col):
+        """
+        Kiểm tra xem ô (row, col) có hợp lệ để đi vào không
+        
+        Điều kiện:
+            - Nằm trong phạm vi bản đồ (0 <= row < rows, 0 <= col < cols)
+            - Không phải vật cản (room_map[row][col] == 0)
+        
+        Args:
+            row, col: Tọa độ cần kiểm tra
+        
+        Returns:
+            True nếu ô hợp lệ, False nếu không
+        """
+        # Kiểm tra nằm trong phạm vi bản đồ
+        if row < 0 or row >= self.rows or col < 0 or col >= self.cols:
+            return False
+        
+        # Kiểm tra không phải vật cản (0 = đi được, 1 = vật cản)
+        if self.room_map[row][col] == 1:
+            return False
+        
+        return True
+    
+    def get_neighbors(self, node):
+        """
+        Lấy danh sách các nút lân cận hợp lệ của nút hiện tại
+        
+        Hỗ trợ 4 hướng hoặc 8 hướng (tùy theo allow_diagonal)
+        - 4 hướng: Lên, Xuống, Trái, Phải (chi phí = 1)
+        - 8 hướng: Bao gồm cả 4 hướng chéo (chi phí = √2)
+        
+        Args:
+            node: Nút hiện tại
+        
+        Returns:
+            Danh sách các nút lân cận hợp lệ, mỗi nút có thông tin chi phí di chuyển
+        """
+        neighbors = []
+        
+        # Duyệt qua các hướng di chuyển (dr, dc, cost)
+        for dr, dc, move_cost in self.directions:
+            new_row = node.row + dr
+            new_col = node.col + dc
+            
+            # Kiểm tra bounds: đảm bảo 0 <= new_row < rows và 0 <= new_col < cols
+            if new_row < 0 or new_row >= self.rows or new_col < 0 or new_col >= self.cols:
+                continue
+            
+            # Kiểm tra không phải vật cản
+            if not self.is_valid(new_row, new_col):
+                continue
+            
+            # Tạo nút mới với thông tin chi phí di chuyển
+            neighbor = Node(new_row, new_col, parent=node)
+            neighbor.move_cost = move_cost  # Lưu chi phí di chuyển đến nút này
+            neighbors.append(neighbor)
+        
+        return neighbors
+    
+    def find_path(self, budget=None):
+        """
+        Tìm đường đi từ Start đến Goal bằng thuật toán A*
+        
+        Chạy trên cùng engine với PathfindingAlgorithms.astar: room_map được chuyển
+        thành Grid compact (mảng NumPy + bảng lân cận), open_set là heap theo
+        (f_score, chỉ số cell) và g_score/parent nằm trong SearchState, nên mỗi
+        bước chỉ tốn O(log n) thay vì sắp xếp lại và quét tuyến tính open_set.
+        Chi phí và số bước của đường đi giống cài đặt cũ; khi có nhiều đường tối ưu,
+        các nút hòa f_score được lấy theo chỉ số cell thay vì theo thứ tự thêm vào.
+        
+        Thuật toán A*:
+            1. Khởi tạo: Thêm Start vào open_set (danh sách nút cần xét)
+            2. Lặp:
+               a. Chọn nút có f_score nhỏ nhất từ open_set
+               b. Nếu là Goal → tìm thấy đường đi, truy vết
+               c. Thêm vào closed_set (đã xét)
+               d. Xét các nút lân cận:
+                  - Nếu chưa xét hoặc có đường đi tốt hơn → cập nhật và thêm vào open_set
+            3. Nếu open_set rỗng → không tìm thấy đường đi
+        
+        Args:
+            budget: SearchBudget giới hạn lần tìm (xem PathfindingAlgorithms.astar)
+        
+        Returns:
+            Danh sách các nút từ Start đến Goal (đường đi), hoặc None nếu không tìm thấy;
+            hết ngân sách thì là đường dở dang và self.stats['partial'] = True
+        """
+        # Dựng lại Grid mỗi lần tìm để luôn phản ánh room_map hiện tại
+        grid = Grid.from_room_map(self.room_map, compact=True)
+        grid.start = tuple(self.start)
+        grid.end = tuple(self.goal)
+        
+        # Mọi cell đi được có weight = 1 nên chi phí bước chỉ còn move_cost (1 hoặc √2)
+        # Giữ đúng heuristic của AStarRobot (Manhattan cho 4 hướng, Euclidean cho 8 hướng)
+        heuristic = self.euclidean_distance if self.allow_diagonal else self.manhattan_distance
+        pathfinder = PathfindingAlgorithms(grid, allow_diagonal=self.allow_diagonal, heuristic=heuristic)
+        path, self.stats = pathfinder.astar(budget=budget)
+        return path
+
+
+class Grid:
+    """
+    Lớp Grid: Quản lý lưới 2D các Node
+    
+    Dữ liệu của lưới được lưu trong các mảng NumPy phẳng (chỉ số = row * cols + col):
+        - cell_types: uint8, loại cell
+        - weights: float32, chi phí đi vào cell (inf cho WALL)
+        - search_state: SearchState chứa g/parent/closed (float64/int32/tem uint32)
+          dùng lại giữa các lần tìm, tạo khi tìm đường lần đầu
+    
+    Có 2 chế độ:
+        - compact=False: giữ thêm ma trận 2D các Node (self.grid) đồng bộ với các mảng
+        - compact=True: không tạo Node nào, get_node() trả về NodeView nhẹ
+        - Mặc định (compact=None): có Node nếu lưới không quá NODE_LIMIT cell
+    
+    Kích thước lưới không bị giới hạn (UI tự giới hạn 10-30). Bộ nhớ mỗi cell
+    (xem memory_usage()):
+        - cell_types 1 byte + weights 4 byte: luôn có
+        - SearchState 20 byte (g 8, parent 4, seen 4, closed 4): từ lần tìm đầu tiên
+        - NeighborTable 1 byte cho mỗi chế độ di chuyển đã dùng
+        - JumpPointMap 2 byte (lưới có viền) nếu đã chạy JPS
+        - Open list của PathfindingAlgorithms: 9 byte (heapq/bucket/radix) hoặc
+          13 byte (indexed), cộng phần tử heap cho các cell thực sự được đẩy vào
+        - Node đầy đủ: thêm ~217 byte/cell ở chế độ không compact
+    Lưu trữ: 5 byte/cell (compact) hoặc ~222 byte/cell (có Node). Sau một lần A* 4 hướng:
+    26 byte/cell (compact) hoặc ~243 byte/cell (có Node). Tính cả open list thì lưới
+    compact tốn 35 byte/cell cố định (60 triệu cell ≈ 2.1 GB), cộng phần tử heap
+    (~3.6 byte/cell ở đỉnh trong benchmark.py --large 5000x5000).
+    
+    Thuộc tính:
+        - rows, cols: Kích thước lưới
+        - grid: Ma trận 2D các Node (None ở chế độ compact)
+        - start: Vị trí Start
+        - end: Vị trí End
+    """
+    
+    # Số cell tối đa để tự tạo Node khi compact=None (~217 MB với Node đầy đủ)
+    NODE_LIMIT = 1_000_000
+    
+    def __init__(self, rows=20, cols=20, compact=None):
+        """
+        Khởi tạo Grid
+        
+        Args:
+            rows: Số hàng (>= 1)
+            cols: Số cột (>= 1)
+            compact: True để chỉ lưu mảng NumPy, False để tạo cả các Node,
+                     None để tự chọn theo NODE_LIMIT
+        """
+        if rows < 1 or cols < 1:
+            raise ValueError(f"Grid size must be at least 1x1, got {rows}x{cols}")
+        if compact is None:
+            compact = rows * cols > self.NODE_LIMIT
+        self._init_storage(rows, cols, compact)
+    
+    def _init_storage(self, rows, cols, compact, cell_types=None, weights=None):
+        """
+        Cấp phát các mảng lưu trữ cho lưới rows x cols
+        
+        cell_types/weights cho trước (ví dụ np.memmap) được dùng trực tiếp, không sao chép;
+        weights = None thì được suy ra từ cell_types khi cần lần đầu.
+        """
+        self.rows = rows
+        self.cols = cols
+        self.size = self.rows * self.cols
+        self.compact = compact
+        self.start = None
+        self.end = None
+        
+        # Lưu trữ phẳng dạng mảng NumPy liên tục
+        fresh = cell_types is None and weights is None
+        if cell_types is None:
+            cell_types = np.full(self.size, CELL_NORMAL, dtype=np.uint8)
+            weights = np.ones(self.size, dtype=np.float32)
+        self.cell_types = cell_types
+        self._weights = weights
+        self._search_state = None
+        
+        # Zobrist hash của lớp weight (lưới mới toàn NORMAL = 0; mảng cho trước thì tính khi cần)
+        self._zobrist = 0 if fresh else None
+        
+        # Weight nhỏ nhất của lớp weight riêng (None nếu weight chỉ theo loại cell)
+        self.weight_floor = None
+        
+        # Số cell của từng loại (cập nhật khi ghi cell) để biết các weight đang dùng
+        self.type_counts = [0] * len(CELL_WEIGHTS)
+        self.type_counts[CELL_NORMAL] = self.size
+        
+        # Bảng lân cận theo chế độ di chuyển (allow_diagonal → NeighborTable), dựng khi cần
+        self._neighbor_tables = {}
+        self._jump_point_map = None
+        
+        # Tăng sau mỗi lần ghi cell (khóa của PathCache)
+        self.revision = 0
+        
+        # Trường chi phí về đích ((goal_index, allow_diagonal) → DistanceField), dựng khi cần
+        self._distance_fields = {}
+        
+        # Các hàm được gọi sau mỗi lần ghi cell (xem add_change_listener)
+        self._change_listeners = []
+        
+        # Khởi tạo grid với các Node NORMAL (chỉ ở chế độ thường)
+        self.grid = None
+        if not compact:
+            self.grid = []
+            for row in range(self.rows):
+                grid_row = []
+                for col in range(self.cols):
+                    grid_row.append(Node(row, col, CELL_NORMAL, grid=self))
+                self.grid.append(grid_row)
+    
+    @classmethod
+    def from_room_map(cls, room_map, compact=True):
+        """
+        Tạo Grid từ ma trận 0/1 (0 = đi được, 1 = vật cản) như room_map của AStarRobot
+        
+        Args:
+            room_map: List 2D hoặc mảng NumPy
+            compact: True để chỉ lưu mảng NumPy, không tạo các Node
+        
+        Returns:
+            Grid object (chưa đặt Start/End)
+        """
+        walls = np.asarray(room_map) == 1
+        rows, cols = walls.shape
+        grid = cls.__new__(cls)
+        grid._init_storage(rows, cols, compact)
+        wall_indices = np.flatnonzero(walls)
+        grid.cell_types[wall_indices] = CELL_WALL
+        grid.weights[wall_indices] = CELL_WEIGHTS[CELL_WALL]
+        grid.type_counts[CELL_NORMAL] -= len(wall_indices)
+        grid.type_counts[CELL_WALL] += len(wall_indices)
+        if grid.grid is not None:
+            for index in wall_indices.tolist():
+                node = grid.grid[index // cols][index % cols]
+                node.cell_type = CELL_WALL
+                node.weight = CELL_WEIGHTS[CELL_WALL]
+        return grid
+    
+    @classmethod
+    def from_arrays(cls, cell_types, weights=None, start=None, end=None, type_counts=None, weight_floor=None):
+        """
+        Tạo Grid (compact) dùng trực tiếp các mảng cho trước, không sao chép
+        
+        Dùng để nạp bản đồ từ np.memmap: chỉ các trang được đọc tới mới được nạp.
+        
+        Args:
+            cell_types: Mảng uint8 2D (rows, cols) chứa loại cell
+            weights: Mảng float32 cùng shape (lớp weight riêng) hoặc None (theo loại cell)
+            start, end: (row, col) của Start/End (cell tương ứng phải là START/END)
+            type_counts: Số cell của từng loại nếu đã biết (None = đếm bằng bincount)
+            weight_floor: Weight nhỏ nhất của các cell đi được trong lớp weight
+                          (None = tính từ weights)
+        
+        Returns:
+            Grid object
+        """
+        rows, cols = cell_types.shape
+        grid = cls.__new__(cls)
+        flat_weights = None if weights is None else weights.reshape(-1)
+        grid._init_storage(rows, cols, True, cell_types.reshape(-1), flat_weights)
+        if type_counts is None:
+            type_counts = np.bincount(grid.cell_types, minlength=len(CELL_WEIGHTS)).tolist()
+        grid.type_counts = list(type_counts)
+        if flat_weights is not None:
+            if weight_floor is None:
+                passable = flat_weights[grid.cell_types != CELL_WALL]
+                weight_floor = float(passable.min()) if len(passable) else 1.0
+            grid.weight_floor = weight_floor
+        grid.start = tuple(start) if start else None
+        grid.end = tuple(end) if end else None
+        return grid
+    
+    def snapshot(self):
+        """
+        Bản sao compact chỉ gồm dữ liệu lưới (cell_types, lớp weight riêng nếu có, Start/End)
+        
+        Dùng khi gửi lưới sang process khác: bản sao không đổi theo khi lưới gốc bị sửa,
+        và không mang theo Node, bảng lân cận hay planner.
+        
+        Returns:
+            Grid object (compact)
+        """
+        weights = None
+        if self.weight_floor is not None:
+            weights = np.array(self.weights).reshape(self.rows, self.cols)
+        copy = Grid.from_arrays(np.array(self.cell_types).reshape(self.rows, self.cols), weights,
+                                self.start, self.end, self.type_counts, self.weight_floor)
+        copy._zobrist = self._zobrist
+        return copy
+    
+    @property
+    def weights(self):
+        """Mảng float32 weight của từng cell (suy ra từ cell_types lần đầu nếu chưa có)"""
+        if self._weights is None:
+            self._weights = WEIGHT_TABLE[self.cell_types]
+        return self._weights
+    
+    @property
+    def fingerprint(self):
+        """
+        Fingerprint 64-bit của nội dung lưới (kích thước + weight từng cell), O(1)
+        
+        Zobrist hash được cập nhật tăng dần trong set_cell_type()/set_cell_types(); chỉ
+        lưới dựng từ mảng có sẵn mới quét toàn bộ một lần ở lần đọc đầu tiên. Start/End
+        không tính vào (chúng có weight như NORMAL). Sửa trực tiếp mảng weights (không
+        qua set_cell_type) thì fingerprint không đổi theo.
+        """
+        if self._zobrist is None:
+            # Quét theo từng khối để không cấp phát mảng tạm cỡ cả lưới
+            value = 0
+            weights = self.weights
+            for begin in range(0, self.size, 1 << 20):
+                end = min(self.size, begin + (1 << 20))
+                value ^= zobrist_hash(np.arange(begin, end), weights[begin:end])
+            self._zobrist = value
+        return self._zobrist ^ _splitmix64(self.rows << 32 | self.cols)
+    
+    @property
+    def search_state(self):
+        """SearchState dùng chung cho các lần tìm trên lưới này (tạo khi cần)"""
+        if self._search_state is None:
+            self._search_state = SearchState(self.size)
+        return self._search_state
+    
+    def index(self, row, col):
+        """Chuyển (row, col) thành chỉ số phẳng"""
+        return row * self.cols + col
+    
+    def position(self, index):
+        """Chuyển chỉ số phẳng thành (row, col)"""
+        return divmod(index, self.cols)
+    
+    def get_node(self, row, col):
+        """Lấy Node tại vị trí (row, col) (NodeView ở chế độ compact)"""
+        if 0 <= row < self.rows and 0 <= col < self.cols:
+            if self.grid is None:
+                return NodeView(self, row * self.cols + col)
+            return self.grid[row][col]
+        return None
+    
+    def _write_cell(self, row, col, cell_type):
+        """Ghi loại cell và weight vào mảng (và vào Node nếu có)"""
+        index = row * self.cols + col
+        weight = CELL_WEIGHTS.get(cell_type, 1.0)
+        old_type = self.cell_types[index]
+        # Weight đang lưu (có thể từ lớp weight riêng), không suy từ loại cell cũ
+        old_weight = float(self._weights[index]) if self._weights is not None else CELL_WEIGHTS[old_type]
+        was_passable = old_type != CELL_WALL
+        self.revision += 1
+        if self._zobrist is not None:
+            self._zobrist ^= zobrist_key(index, old_weight) ^ zobrist_key(index, weight)
+        self.type_counts[old_type] -= 1
+        self.type_counts[cell_type] += 1
+        self.cell_types[index] = cell_type
+        self.weights[index] = weight
+        # Vá cục bộ các bảng lân cận đã dựng nếu trạng thái đi được thay đổi
+        passable = cell_type != CELL_WALL
+        if passable != was_passable:
+            for table in self._neighbor_tables.values():
+                table.update_cell(index, passable)
+        if self._jump_point_map is not None:
+            self._jump_point_map.update_cell(index)
+        if self._distance_fields and weight != old_weight:
+            self._invalidate_distance_fields([index], passable)
+        if self.grid is not None:
+            node = self.grid[row][col]
+            node.cell_type = cell_type
+            node.weight = weight
+        if self._change_listeners:
+            self._notify_change(index, old_weight, weight)
+    
+    def add_change_listener(self, listener):
+        """
+        Đăng ký hàm listener(index, old_weight, new_weight) được gọi sau mỗi lần ghi cell
+        
+        Dùng cho các planner giữ trạng thái giữa các lần tìm (D* Lite) để chỉ sửa
+        lại phần bị ảnh hưởng. Bound method được giữ bằng tham chiếu yếu nên planner
+        bị bỏ đi sẽ tự hủy đăng ký.
+        """
+        if hasattr(listener, '__self__'):
+            ref = weakref.WeakMethod(listener)
+        else:
+            ref = lambda: listener
+        self._change_listeners.append(ref)
+    
+    def remove_change_listener(self, listener):
+        """Hủy đăng ký listener đã thêm bằng add_change_listener()"""
+        self._change_listeners = [ref for ref in self._change_listeners
+                                  if ref() is not None and ref() != listener]
+    
+    def _notify_change(self, index, old_weight, new_weight):
+        """Gọi các listener còn sống, bỏ các listener đã bị thu hồi"""
+        alive = []
+        for ref in self._change_listeners:
+            listener = ref()
+            if listener is not None:
+                listener(index, float(old_weight), float(new_weight))
+                alive.append(ref)
+        self._change_listeners = alive
+    
+    def set_cell_type(self, row, col, cell_type):
+        """Đặt loại cell tại vị trí (row, col)"""
+        if 0 <= row < self.rows and 0 <= col < self.cols:
+            # Nếu đặt Start hoặc End, xóa Start/End cũ
+            if cell_type == CELL_START:
+                if self.start:
+                    self._write_cell(self.start[0], self.start[1], CELL_NORMAL)
+                self.start = (row, col)
+            elif cell_type == CELL_END:
+                if self.end:
+                    self._write_cell(self.end[0], self.end[1], CELL_NORMAL)
+                self.end = (row, col)
+            
+            self._write_cell(row, col, cell_type)
+    
+    def set_cell_types(self, indices, cell_type):
+        """
+        Ghi cùng một loại cell cho nhiều cell một lúc (vector hóa, cho lưới lớn)
+        
+        Không dùng cho START/END (dùng set_cell_type), và không ghi đè lên ô Start/End.
+        Chỉ số lặp lại chỉ được tính một lần. Các bảng lân cận và JumpPointMap đã dựng
+        bị bỏ và sẽ được dựng lại khi cần; DistanceField chỉ bị bỏ nếu các cell đổi
+        weight chạm tới vùng tới được goal.
+        
+        Args:
+            indices: Mảng/list chỉ số phẳng của các cell
+            cell_type: Loại cell (không phải CELL_START/CELL_END)
+        """
+        if cell_type in (CELL_START, CELL_END):
+            raise ValueError("Use set_cell_type() to place Start/End")
+        # Bỏ chỉ số trùng: type_counts và Zobrist hash (XOR) chỉ đúng khi mỗi cell đổi một lần
+        indices = np.unique(np.asarray(indices, dtype=np.int64))
+        old_types = self.cell_types[indices]
+        if np.any((old_types == CELL_START) | (old_types == CELL_END)):
+            raise ValueError("Cannot overwrite Start/End with set_cell_types(); move them with set_cell_type() first")
+        # Weight đang lưu của các cell, đọc trước khi ghi
+        old_weights = self._weights[indices] if self._weights is not None else WEIGHT_TABLE[old_types]
+        self.revision += 1
+        if self._zobrist is not None:
+            self._zobrist ^= (zobrist_hash(indices, old_weights)
+                              ^ zobrist_hash(indices, np.full(len(indices), CELL_WEIGHTS[cell_type], dtype=np.float32)))
+        for old_type, count in enumerate(np.bincount(old_types, minlength=len(CELL_WEIGHTS)).tolist()):
+            self.type_counts[old_type] -= count
+        self.type_counts[cell_type] += len(indices)
+        self.cell_types[indices] = cell_type
+        self.weights[indices] = CELL_WEIGHTS[cell_type]
+        self._neighbor_tables = {}
+        self._jump_point_map = None
+        if self._distance_fields:
+            changed = indices[old_weights != CELL_WEIGHTS[cell_type]]
+            if len(changed):
+                self._invalidate_distance_fields(changed, cell_type != CELL_WALL)
+        if self.grid is not None:
+            for index in indices.tolist():
+                node = self.grid[index // self.cols][index % self.cols]
+                node.cell_type = cell_type
+                node.weight = CELL_WEIGHTS[cell_type]
+        if self._change_listeners:
+            for index, old_weight in zip(indices.tolist(), old_weights.tolist()):
+                self._notify_change(index, old_weight, CELL_WEIGHTS[cell_type])
+    
+    def __getstate__(self):
+        """
+        Trạng thái khi pickle (ví dụ gửi sang process con của solve_many)
+        
+        Bỏ các phần dựng lại được khi cần (SearchState, bảng lân cận, JumpPointMap,
+        DistanceField) và
+        các change listener (tham chiếu yếu tới planner của process hiện tại).
+        """
+        state = self.__dict__.copy()
+        state['_search_state'] = None
+        state['_neighbor_tables'] = {}
+        state['_jump_point_map'] = None
+        state['_distance_fields'] = {}
+        state['_change_listeners'] = []
+        return state
+    
+    def memory_usage(self):
+        """
+        Số byte đang dùng theo từng thành phần của lưới
+        
+        Returns:
+            Dict tên thành phần → số byte ('nodes' là ước lượng, 0 ở chế độ compact;
+            mảng np.memmap được tính theo kích thước, dù chỉ phần đã đọc nằm trong RAM)
+        """
+        usage = {
+            'cell_types': self.cell_types.nbytes,
+            'weights': self._weights.nbytes if self._weights is not None else 0,
+            'search_state': 0,
+            'neighbor_tables': sum(table.masks.nbytes for table in self._neighbor_tables.values()),
+            'jump_point_map': 0,
+            'distance_fields': sum(field.cost.nbytes + field.next_index.nbytes + field.flow.nbytes
+                                   for field in self._distance_fields.values()),
+            'nodes': 0,
+        }
+        if self._search_state is not None:
+            state = self._search_state
+            usage['search_state'] = state.g.nbytes + state.parent.nbytes + state.seen.nbytes + state.closed.nbytes
+        if self._jump_point_map is not None:
+            usage['jump_point_map'] = self._jump_point_map.walkable.nbytes + self._jump_point_map.uniform.nbytes
+        if self.grid is not None:
+            node = self.grid[0][0]
+            per_node = sys.getsizeof(node) + sys.getsizeof(node.__dict__) + 8
+            usage['nodes'] = per_node * self.size + sum(sys.getsizeof(row) for row in self.grid)
+        return usage
+    
+    def min_traversable_weight(self):
+        """
+        Weight nhỏ nhất trong các loại cell đi được đang có trên lưới
+        
+        Dùng để scale heuristic cho admissible: mỗi bước tốn ít nhất
+        move_cost * min_traversable_weight (O(số loại cell), không quét lưới).
+        
+        Returns:
+            Weight nhỏ nhất (1.0 nếu lưới toàn vật cản); không vượt weight_floor
+            nếu lưới có lớp weight riêng
+        """
+        weights = [CELL_WEIGHTS[cell_type] for cell_type, count in enumerate(self.type_counts)
+                   if count > 0 and cell_type != CELL_WALL]
+        if self.weight_floor is not None:
+            weights.append(self.weight_floor)
+        return min(weights) if weights else 1.0
+    
+    def get_neighbor_table(self, allow_diagonal=False):
+        """
+        Lấy bảng lân cận (NeighborTable) cho chế độ di chuyển, dựng 1 lần rồi dùng lại
+        
+        Bảng được set_cell_type() vá cục bộ nên luôn đồng bộ với lưới.
+        """
+        table = self._neighbor_tables.get(allow_diagonal)
+        if table is None:
+            table = NeighborTable(self, allow_diagonal)
+            self._neighbor_tables[allow_diagonal] = table
+        return table
+    
+    def get_jump_point_map(self):
+        """Lấy JumpPointMap của lưới (dựng lần đầu, sau đó được vá khi ghi cell)"""
+        if self._jump_point_map is None:
+            self._jump_point_map = JumpPointMap(self)
+        return self._jump_point_map
+    
+    def distance_field(self, goal=None, allow_diagonal=False):
+        """
+        Lấy DistanceField (trường chi phí + trường hướng) về goal, dựng 1 lần rồi dùng lại
+        
+        Trường được cache theo (goal, allow_diagonal) và tự bị bỏ khi set_cell_type()
+        sửa một cell ảnh hưởng tới nó, nên nhiều robot về cùng một goal chỉ tốn một
+        lần Dijkstra ngược.
+        
+        Args:
+            goal: (row, col) của goal (None = End của lưới)
+            allow_diagonal: True nếu cho phép đi chéo (8 hướng), False nếu chỉ 4 hướng
+        
+        Returns:
+            DistanceField object
+        """
+        if goal is None:
+            goal = self.end
+        if goal is None:
+            raise ValueError("Distance field needs a goal (grid has no End)")
+        if not (0 <= goal[0] < self.rows and 0 <= goal[1] < self.cols):
+            raise ValueError(f"Goal {goal} is outside the {self.rows}x{self.cols} grid")
+        key = (goal[0] * self.cols + goal[1], allow_diagonal)
+        field = self._distance_fields.get(key)
+        if field is None:
+            field = DistanceField(self, goal, allow_diagonal)
+            self._distance_fields[key] = field
+        return field
+    
+    def cached_distance_field(self, goal, allow_diagonal=False):
+        """DistanceField về goal đang có trong cache (None nếu chưa dựng hoặc đã bị bỏ)"""
+        return self._distance_fields.get((goal[0] * self.cols + goal[1], allow_diagonal))
+    
+    def add_distance_field(self, field):
+        """Đưa DistanceField dựng sẵn (ví dụ nạp từ ResultStore) vào cache của lưới"""
+        if (field.rows, field.cols) != (self.rows, self.cols):
+            raise ValueError(f"Distance field is {field.rows}x{field.cols}, grid is {self.rows}x{self.cols}")
+        self._distance_fields[(field.goal[0] * self.cols + field.goal[1], field.allow_diagonal)] = field
+    
+    def clear_distance_fields(self):
+        """Bỏ mọi DistanceField đã cache (ví dụ sau khi sửa trực tiếp mảng weights)"""
+        self._distance_fields = {}
+    
+    def _invalidate_distance_fields(self, indices, passable):
+        """Bỏ các DistanceField bị ảnh hưởng khi các cell đổi weight"""
+        self._distance_fields = {key: field for key, field in self._distance_fields.items()
+                                 if not field.affected_by(indices, passable)}
+    
+    def neighbor_indices(self, index, allow_diagonal=False):
+        """
+        Lấy danh sách chỉ số các cell lân cận đi được
+        
+        Args:
+            index: Chỉ số phẳng của cell hiện tại
+            allow_diagonal: True nếu cho phép đi chéo (8 hướng), False nếu chỉ 4 hướng
+        
+        Returns:
+            List các tuple (neighbor_index, move_cost)
+        """
+        return [(index + delta, move_cost)
+                for delta, move_cost in self.get_neighbor_table(allow_diagonal).neighbors(index)]
+    
+    def get_neighbors(self, node, allow_diagonal=False):
+        """
+        Lấy danh sách các nút lân cận hợp lệ
+        
+        Args:
+            node: Nút hiện tại
+            allow_diagonal: True nếu cho phép đi chéo (8 hướng), False nếu chỉ 4 hướng
+        
+        Returns:
+            List các tuple (neighbor_node, move_cost) với:
+            - neighbor_node: Node lân cận
+            - move_cost: Chi phí di chuyển (1.0 cho 4 hướng, √2 cho chéo)
+        """
+        neighbors = []
+        for neighbor, move_cost in self.neighbor_indices(self.index(node.row, node.col), allow_diagonal):
+            row, col = divmod(neighbor, self.cols)
+            neighbors.append((self.get_node(row, col), move_cost))
+        return neighbors
+    
+    def reset_pathfinding_data(self):
+        """
+        Reset dữ liệu pathfinding (g_score, parent, closed) của lần tìm trước
+        
+        Chỉ tăng bộ đếm thế hệ của SearchState nên chi phí là O(1), không quét lưới.
+        """
+        if self._search_state is not None:
+            self._search_state.reset()
+    
+    def has_path(self):
+        """
+        Kiểm tra xem có đường đi từ Start đến End không (sử dụng BFS đơn giản)
+        
+        Returns:
+            True nếu có đường đi, False nếu không
+        """
+        if not self.start or not self.end:
+            return False
+        
+        start = self.index(self.start[0], self.start[1])
+        end = self.index(self.end[0], self.end[1])
+        
+        table = self.get_neighbor_table(allow_diagonal=False)
+        masks = table.masks_view
+        patterns = table.patterns
+        
+        # Đánh dấu đã thăm bằng tem thế hệ của SearchState (không cần set, O(1) reset)
+        state = self.search_state
+        generation = state.begin()
+        visited = state.seen_view
+        
+        queue = collections.deque([start])
+        visited[start] = generation
+        
+        while queue:
+            current = queue.popleft()
+            
+            if current == end:
+                return True
+            
+            # move_cost không cần thiết cho has_path() (chỉ kiểm tra có đường đi hay không)
+            for delta, _ in patterns[masks[current]]:
+                neighbor = current + delta
+                if visited[neighbor] != generation:
+                    visited[neighbor] = generation
+                    queue.append(neighbor)
+        
+        return False
+    
+    @staticmethod
+    def generate_random_map(min_size=10, max_size=30, wall_density=0.25, trap_density=0.15, road_density=0.1, max_attempts=10, energy_mode=True):
+        """
+        Tạo random map với đầy đủ cell types và đảm bảo có đường đi
+        
+        Thuật toán:
+        1. Tạo kích thước ngẫu nhiên (min_size-max_size)
+        2. Đặt Start và End ở 2 góc đối diện
+        3. Tạo một đường đi guaranteed (L-shaped) để đảm bảo có đáp án
+        4. Thêm walls, traps, roads ngẫu nhiên nhưng không chặn đường đi guaranteed
+        5. Kiểm tra lại bằng BFS để đảm bảo có đường đi
+        
+        Args:
+            min_size: Kích thước tối thiểu (mặc định 10, không giới hạn)
+            max_size: Kích thước tối đa (mặc định 30, không giới hạn)
+            wall_density: Mật độ walls (0.0-1.0, mặc định 0.25)
+            trap_density: Mật độ traps (0.0-1.0, mặc định 0.15)
+            road_density: Mật độ roads (0.0-1.0, mặc định 0.1)
+            max_attempts: Số lần thử tối đa nếu không tìm được đường đi
+        
+        Returns:
+            Grid object với map đã được tạo và đảm bảo có đường đi
+        """
+        import random
+        
+        for attempt in range(max_attempts):
+            # Tạo kích thước ngẫu nhiên
+            size = random.randint(min_size, max_size)
+            grid = Grid(size, size)
+            
+            # Đặt Start và End ở 2 góc đối diện (tăng khoảng cách để test tốt hơn)
+            # Có thể chọn: (0,0) -> (size-1, size-1) hoặc (0, size-1) -> (size-1, 0)
+            corner_choice = random.random()
+            if corner_choice < 0.5:
+                start_pos = (0, 0)
+                end_pos = (size - 1, size - 1)
+            else:
+                start_pos = (0, size - 1)
+                end_pos = (size - 1, 0)
+            
+            # Đảm bảo Start và End không trùng nhau
+            if start_pos == end_pos and size > 1:
+                end_pos = (size - 1, size - 1)
+            
+            # Tạo đường đi cơ bản từ Start đến End (đảm bảo có đáp án)
+            # Sử dụng L-shaped path: đi xuống rồi sang phải, hoặc sang phải rồi đi xuống
+            # (đánh dấu bằng mảng NumPy để không tạo list tuple cho lưới lớn)
+            protected = np.zeros((size, size), dtype=bool)
+            col_lo, col_hi = min(start_pos[1], end_pos[1]), max(start_pos[1], end_pos[1])
+            
+            # Chọn một trong hai đường đi L-shaped
+            if random.random() < 0.5:
+                # Đi xuống trước, rồi sang phải
+                protected[start_pos[0]:end_pos[0] + 1, start_pos[1]] = True
+                protected[end_pos[0], col_lo:col_hi + 1] = True
+            else:
+                # Sang phải trước, rồi đi xuống
+                protected[start_pos[0], col_lo:col_hi + 1] = True
+                protected[start_pos[0]:end_pos[0] + 1, end_pos[1]] = True
+            
+            # Đặt Start và End
+            grid.set_cell_type(start_pos[0], start_pos[1], CELL_START)
+            grid.set_cell_type(end_pos[0], end_pos[1], CELL_END)
+            
+            # Đảm bảo đường đi guaranteed không bị chặn
+            protected[start_pos] = True
+            protected[end_pos] = True
+            
+            # Tất cả các cells (trừ protected cells) theo thứ tự ngẫu nhiên
+            # (bộ sinh NumPy lấy seed từ random nên random.seed() vẫn cho cùng bản đồ)
+            rng = np.random.default_rng(random.getrandbits(64))
+            all_cells = rng.permutation(np.flatnonzero(~protected.reshape(-1)))
+            
+            # Tính số lượng cells cho mỗi loại
+            total_cells = len(all_cells)
+            num_walls = max(1, int(total_cells * wall_density))  # Đảm bảo có ít nhất 1 wall
+            
+            # Đặt walls
+            grid.set_cell_types(all_cells[:num_walls], CELL_WALL)
+            
+            # Chỉ tạo traps và roads nếu energy_mode = True
+            if energy_mode:
+                num_traps = max(1, int(total_cells * trap_density))  # Đảm bảo có ít nhất 1 trap
+                num_roads = max(1, int(total_cells * road_density))  # Đảm bảo có ít nhất 1 road
+                
+                # Đặt traps (sau walls) - đảm bảo có traps để test Energy vs Steps
+                trap_start = num_walls
+                grid.set_cell_types(all_cells[trap_start:trap_start + num_traps], CELL_TRAP)
+                
+                # Đặt roads (sau traps) - đảm bảo có roads để test Energy optimization
+                road_start = trap_start + num_traps
+                grid.set_cell_types(all_cells[road_start:road_start + num_roads], CELL_ROAD)
+            
+            # Các cells còn lại là NORMAL (đã được set mặc định)
+            
+            # Kiểm tra lại bằng BFS để đảm bảo có đường đi
+            if grid.has_path():
+                return grid
+            
+            # Nếu không có đường đi, giảm wall_density và thử lại
+            wall_density *= 0.8
+        
+        # Nếu sau max_attempts vẫn không được, tạo map đơn giản nhưng vẫn có đủ cell types
+        size = random.randint(min_size, max_size)
+        grid = Grid(size, size)
+        grid.set_cell_type(0, 0, CELL_START)
+        grid.set_cell_type(size - 1, size - 1, CELL_END)
+        
+        # Thêm ít nhất một vài cells của mỗi loại để test
+        if size > 2:
+            # Thêm 1 wall
+            grid.set_cell_type(size // 2, size // 2, CELL_WALL)
+            # Chỉ thêm trap và road nếu energy_mode = True
+            if energy_mode:
+                # Thêm 1 trap
+                if size > 3:
+                    grid.set_cell_type(size // 3, size // 3, CELL_TRAP)
+                # Thêm 1 road
+                if size > 4:
+                    grid.set_cell_type(size // 4, size // 4, CELL_ROAD)
+        
+        return grid
+
+
+class PathfindingAlgorithms:
+    """
+    Lớp chứa các thuật toán tìm đường: BFS, DFS, Dijkstra, A*, JPS, D* Lite, HPA*
+    
+    Các thuật toán chạy trên chỉ số phẳng của cell (row * cols + col), đọc lân cận
+    từ NeighborTable và ghi g/parent vào SearchState của Grid (reset O(1) nhờ tem
+    thế hệ). Node (hoặc NodeView) chỉ được tạo khi cần gọi callback animation.
+    """
+    
+    def __init__(self, grid, allow_diagonal=False, open_list='heapq', heuristic='auto', instrument=False):
+        """
+        Khởi tạo với Grid
+        
+        Args:
+            grid: Grid object
+            allow_diagonal: True nếu cho phép đi chéo (8 hướng), False nếu chỉ 4 hướng
+            open_list: Tên open list cho Dijkstra/A* trong OPEN_LISTS
+                       ('heapq' - xóa lười, 'indexed' - binary heap có decrease-key,
+                       'bucket' - hàng đợi thùng, chỉ cho 4 hướng và Dijkstra/A*/JPS/
+                       Dijkstra hai chiều, 'radix' - radix heap)
+            heuristic: Heuristic cho A*: 'auto' (Manhattan cho 4 hướng, Octile cho 8 hướng),
+                       một tên trong HEURISTICS (đều được scale theo weight nhỏ nhất),
+                       hoặc hàm h(row1, col1, row2, col2) dùng nguyên giá trị (không scale)
+            instrument: True để BFS/DFS/Dijkstra/A* thêm stats['counters'] (các khóa trong
+                        SEARCH_COUNTERS); có thể đổi giữa các lần tìm. Khi tắt, vòng lặp
+                        tìm kiếm không đếm gì thêm.
+        """
+        if open_list not in OPEN_LISTS:
+            raise ValueError(f"Unknown open list '{open_list}', expected one of {sorted(OPEN_LISTS)}")
+        if not callable(heuristic) and heuristic != 'auto' and heuristic not in HEURISTICS:
+            raise ValueError(f"Unknown heuristic '{heuristic}', expected 'auto', a callable or one of {sorted(HEURISTICS)}")
+        self.grid = grid
+        self.allow_diagonal = allow_diagonal
+        self.open_list_name = open_list
+        self.heuristic = heuristic
+        self.instrument = instrument
+        self._open_lists = {}
+        self._backward_state = None
+        self._dstar_lite = None
+        self._hpa_star = None
+        # (start, goal) của truy vấn hiện tại trong solve_many(); None = Start/End của Grid
+        self._query = None
+    
+    def manhattan_distance(self, row1, col1, row2, col2):
+        """
+        Tính khoảng cách Manhattan
+        
+        Công thức: |row1 - row2| + |col1 - col2|
+        Phù hợp với di chuyển 4 hướng (không chéo)
+        """
+        return abs(row1 - row2) + abs(col1 - col2)
+    
+    def euclidean_distance(self, row1, col1, row2, col2):
+        """
+        Tính khoảng cách Euclidean
+        
+        Công thức: √((row1 - row2)² + (col1 - col2)²)
+        Phù hợp với di chuyển 8 hướng (có chéo)
+        """
+        return math.sqrt((row1 - row2) ** 2 + (col1 - col2) ** 2)
+    
+    def _select_heuristic(self):
+        """
+        Chọn heuristic cho A* (xem select_heuristic)
+        
+        Returns:
+            Tuple (tên, hàm h(row1, col1, row2, col2), hệ số scale)
+        """
+        return select_heuristic(self.heuristic, self.allow_diagonal, self.grid)
+    
+    def _endpoints(self):
+        """
+        Điểm đầu/cuối của lần tìm: truy vấn hiện tại của solve_many() nếu có,
+        ngược lại Start/End của Grid
+        
+        Returns:
+            Tuple (start, goal), mỗi phần tử là (row, col) hoặc None
+        """
+        if self._query is not None:
+            return self._query
+        return self.grid.start, self.grid.end
+    
+    def _node(self, index):
+        """Lấy Node (hoặc NodeView) ứng với chỉ số phẳng - chỉ dùng cho callback"""
+        row, col = divmod(index, self.grid.cols)
+        return self.grid.get_node(row, col)
+    
+    def _get_open_list(self, side='forward'):
+        """
+        Lấy open list (tạo khi cần, dùng lại giữa các lần tìm) ở trạng thái rỗng
+        
+        Args:
+            side: 'forward' hoặc 'backward' (tìm kiếm hai chiều cần 2 open list)
+        """
+        open_list = self._open_lists.get(side)
+        if open_list is None or open_list.size != self.grid.size:
+            open_list = OPEN_LISTS[self.open_list_name](self.grid.size)
+            self._open_lists[side] = open_list
+        else:
+            open_list.clear()
+        return open_list
+    
+    def _get_backward_state(self):
+        """SearchState cho chiều ngược (từ End) của tìm kiếm hai chiều (tạo khi cần)"""
+        if self._backward_state is None or self._backward_state.size != self.grid.size:
+            self._backward_state = SearchState(self.grid.size)
+        return self._backward_state
+    
+    def _path_cost(self, path):
+        """Chi phí đường đi: tổng move_cost (1 hoặc √2) * weight của ô đi vào"""
+        weights = memoryview(self.grid.weights)
+        cols = self.grid.cols
+        cost = 0.0
+        for (row1, col1), (row2, col2) in zip(path, path[1:]):
+            move_cost = DIAGONAL_COST if row1 != row2 and col1 != col2 else 1.0
+            cost += move_cost * weights[row2 * cols + col2]
+        return cost
+    
+    @staticmethod
+    def _search_counters(state, generation, frontier, patterns, closed_size):
+        """
+        Gom bộ đếm của một lần tìm (chỉ gọi khi bật instrument)
+        
+        Args:
+            state: SearchState vừa dùng
+            generation: Thế hệ của lần tìm
+            frontier: Open list, CountingDeque hoặc CountingStack
+            patterns: CountingPatterns đã dùng để tra lân cận
+            closed_size: Số cell đã đóng (tập đóng chỉ tăng nên cũng là kích thước lớn nhất)
+        
+        Returns:
+            Dict theo các khóa của SEARCH_COUNTERS; reopenings là số lần một cell đã sinh
+            được g tốt hơn và đẩy lại (cell đã đóng không bao giờ được mở lại)
+        """
+        return {
+            'nodes_expanded': frontier.pops,
+            'nodes_generated': int(np.count_nonzero(state.seen == generation)),
+            'pushes': frontier.pushes,
+            'pops': frontier.pops,
+            'stale_pops': getattr(frontier, 'stale_pops', 0),
+            'reopenings': getattr(frontier, 'decrease_keys', 0),
+            'peak_open_size': frontier.peak_size,
+            'peak_closed_size': int(closed_size),
+            'neighbor_calls': patterns.calls,
+        }
+    
+    @staticmethod
+    def _phases_ns(start_time, search_start, search_end, reconstructed=None, finished=None):
+        """
+        Thời gian từng pha của một lần tìm (ns, perf_counter_ns)
+        
+        setup: reset SearchState, lấy bảng lân cận/open list, đưa Start vào;
+        search: vòng lặp chính; reconstruct: dựng lại đường đi;
+        metrics: tính path_length/total_energy. Không tìm thấy đường thì hai pha sau = 0.
+        """
+        reconstructed = reconstructed or search_end
+        finished = finished or reconstructed
+        return {
+            'setup': search_start - start_time,
+            'search': search_end - search_start,
+            'reconstruct': reconstructed - search_end,
+            'metrics': finished - reconstructed,
+        }
+    
+    def _build_stats(self, algorithm, path, start_time, search_start=None, search_end=None):
+        """
+        Tạo dict thống kê cho đường đi tìm được
+        
+        start_time là time.perf_counter_ns() lúc bắt đầu; time_taken (ms) tính cả
+        phần tính thống kê. Nếu có search_start/search_end (mốc perf_counter_ns quanh
+        vòng lặp chính) thì thêm phases_ns theo _phases_ns().
+        """
+        reconstructed = time.perf_counter_ns()
+        weights = memoryview(self.grid.weights)
+        cols = self.grid.cols
+        path_length = len(path) - 1
+        total_energy = sum(weights[r * cols + c] for r, c in path)
+        finished = time.perf_counter_ns()
+        stats = {
+            'algorithm': algorithm,
+            'path_length': path_length,
+            'total_energy': total_energy,
+            'time_taken': (finished - start_time) / 1e6
+        }
+        if search_start is not None:
+            stats['phases_ns'] = self._phases_ns(start_time, search_start, search_end, reconstructed, finished)
+        return stats
+    
+    def bfs(self, callback=None, budget=None):
+        """
+        Breadth-First Search: Tìm đường ngắn nhất về số bước, bỏ qua weights
+        
+        Args:
+            callback: Hàm callback được gọi mỗi khi xét một node (để animation)
+                      callback(node, state) với state = 'open' hoặc 'closed'
+            budget: SearchBudget giới hạn lần tìm (None = không giới hạn)
+        
+        Returns:
+            Tuple (path, stats) với path là list các (row, col) và stats là dict
+        """
+        start_time = time.perf_counter_ns()
+        
+        start_pos, goal_pos = self._endpoints()
+        if not start_pos or not goal_pos:
+            return None, {}
+        
+        grid = self.grid
+        start = grid.index(start_pos[0], start_pos[1])
+        goal = grid.index(goal_pos[0], goal_pos[1])
+        table = grid.get_neighbor_table(self.allow_diagonal)
+        masks = table.masks_view
+        instrument = self.instrument
+        patterns = CountingPatterns(table.patterns) if instrument else table.patterns
+        state = grid.search_state
+        generation = state.begin()
+        parents = state.parent_view
+        seen = state.seen_view
+        
+        seen[start] = generation
+        parents[start] = -1
+        queue = (CountingDeque if instrument else collections.deque)([start])
+        
+        if callback:
+            callback(self._node(start), 'open')
+        
+        if budget is not None:
+            budget.begin()
+        search_start = time.perf_counter_ns()
+        while queue:
+            if budget is not None and budget.spend():
+                break
+            current = queue.popleft()
+            
+            if callback:
+                callback(self._node(current), 'closed')
+            
+            if current == goal:
+                search_end = time.perf_counter_ns()
+                path = state.reconstruct(goal, grid.cols)
+                stats = self._build_stats('BFS', path, start_time, search_start, search_end)
+                if instrument:
+                    stats['counters'] = self._search_counters(state, generation, queue, patterns, queue.pops)
+                if budget is not None:
+                    budget.annotate(stats)
+                return path, stats
+            
+            for delta, move_cost in patterns[masks[current]]:
+                neighbor = current + delta
+                if seen[neighbor] != generation:
+                    seen[neighbor] = generation
+                    parents[neighbor] = current
+                    queue.append(neighbor)
+                    if callback:
+                        callback(self._node(neighbor), 'open')
+        
+        search_end = time.perf_counter_ns()
+        elapsed_time = (search_end - start_time) / 1e6
+        stats = {'algorithm': 'BFS', 'time_taken': elapsed_time, 'path_found': False}
+        stats['phases_ns'] = self._phases_ns(start_time, search_start, search_end)
+        if instrument:
+            stats['counters'] = self._search_counters(state, generation, queue, patterns, queue.pops)
+        if budget is not None:
+            budget.annotate(stats)
+        return None, stats
+    
+    def dfs(self, callback=None, budget=None):
+        """
+        Depth-First Search: Không đảm bảo đường ngắn nhất, bỏ qua weights
+        
+        Args:
+            callback: Hàm callback được gọi mỗi khi xét một node
+            budget: SearchBudget giới hạn lần tìm (None = không giới hạn)
+        
+        Returns:
+            Tuple (path, stats)
+        """
+        start_time = time.perf_counter_ns()
+        
+        start_pos, goal_pos = self._endpoints()
+        if not start_pos or not goal_pos:
+            return None, {}
+        
+        grid = self.grid
+        start = grid.index(start_pos[0], start_pos[1])
+        goal = grid.index(goal_pos[0], goal_pos[1])
+        table = grid.get_neighbor_table(self.allow_diagonal)
+        masks = table.masks_view
+        instrument = self.instrument
+        patterns = CountingPatterns(table.patterns) if instrument else table.patterns
+        state = grid.search_state
+        generation = state.begin()
+        parents = state.parent_view
+        seen = state.seen_view
+        
+        seen[start] = generation
+        parents[start] = -1
+        stack = CountingStack([start]) if instrument else [start]
+        
+        if callback:
+            callback(self._node(start), 'open')
+        
+        if budget is not None:
+            budget.begin()
+        search_start = time.perf_counter_ns()
+        while stack:
+            if budget is not None and budget.spend():
+                break
+            current = stack.pop()
+            
+            if callback:
+                callback(self._node(current), 'closed')
+            
+            if current == goal:
+                search_end = time.perf_counter_ns()
+                path = state.reconstruct(goal, grid.cols)
+                stats = self._build_stats('DFS', path, start_time, search_start, search_end)
+                if instrument:
+                    stats['counters'] = self._search_counters(state, generation, stack, patterns, stack.pops)
+                if budget is not None:
+                    budget.annotate(stats)
+                return path, stats
+            
+            for delta, move_cost in patterns[masks[current]]:
+                neighbor = current + delta
+                if seen[neighbor] != generation:
+                    seen[neighbor] = generation
+                    parents[neighbor] = current
+                    stack.append(neighbor)
+                    if callback:
+                        callback(self._node(neighbor), 'open')
+        
+        search_end = time.perf_counter_ns()
+        elapsed_time = (search_end - start_time) / 1e6
+        stats = {'algorithm': 'DFS', 'time_taken': elapsed_time, 'path_found': False}
+        stats['phases_ns'] = self._phases_ns(start_time, search_start, search_end)
+        if instrument:
+            stats['counters'] = self._search_counters(state, generation, stack, patterns, stack.pops)
+        if budget is not None:
+            budget.annotate(stats)
+        return None, stats
+    
+    def dijkstra(self, callback=None, budget=None):
+        """
+        Dijkstra: Tìm đường với chi phí thấp nhất (tôn trọng weights)
+        
+        Args:
+            callback: Hàm callback được gọi mỗi khi xét một node
+            budget: SearchBudget giới hạn lần tìm (None = không giới hạn)
+        
+        Returns:
+            Tuple (path, stats)
+        """
+        start_time = time.perf_counter_ns()
+        
+        start_pos, goal_pos = self._endpoints()
+        if not start_pos or not goal_pos:
+            return None, {}
+        
+        grid = self.grid
+        start = grid.index(start_pos[0], start_pos[1])
+        goal = grid.index(goal_pos[0], goal_pos[1])
+        weights = memoryview(grid.weights)
+        table = grid.get_neighbor_table(self.allow_diagonal)
+        masks = table.masks_view
+        instrument = self.instrument
+        patterns = CountingPatterns(table.patterns) if instrument else table.patterns
+        state = grid.search_state
+        generation = state.begin()
+        g_scores = state.g_view
+        parents = state.parent_view
+        seen = state.seen_view
+        closed = state.closed_view
+        
+        seen[start] = generation
+        g_scores[start] = 0.0
+        parents[start] = -1
+        open_set = self._get_open_list()
+        push = open_set.push
+        pop = open_set.pop
+        push(start, 0.0)
+        
+        if callback:
+            callback(self._node(start), 'open')
+        
+        if budget is not None:
+            budget.begin()
+        search_start = time.perf_counter_ns()
+        while open_set:
+            if budget is not None and budget.spend():
+                break
+            current_g, current = pop()
+            closed[current] = generation
+            
+            if callback:
+                callback(self._node(current), 'closed')
+            
+            if current == goal:
+                search_end = time.perf_counter_ns()
+                path = state.reconstruct(goal, grid.cols)
+                stats = self._build_stats('Dijkstra', path, start_time, search_start, search_end)
+                stats['nodes_expanded'] = open_set.pops
+                stats['open_list'] = open_set.stats()
+                if instrument:
+                    stats['counters'] = self._search_counters(
+                        state, generation, open_set, patterns, np.count_nonzero(state.closed == generation))
+                if budget is not None:
+                    budget.annotate(stats)
+                return path, stats
+            
+            for delta, move_cost in patterns[masks[current]]:
+                neighbor = current + delta
+                if closed[neighbor] == generation:
+                    continue
+                
+                # Chi phí = move_cost (1.0 hoặc √2) * weight của neighbor
+                tentative_g = current_g + move_cost * weights[neighbor]
+                
+                if seen[neighbor] != generation or tentative_g < g_scores[neighbor]:
+                    seen[neighbor] = generation
+                    g_scores[neighbor] = tentative_g
+                    parents[neighbor] = current
+                    push(neighbor, tentative_g)
+                    if callback:
+                        callback(self._node(neighbor), 'open')
+        
+        search_end = time.perf_counter_ns()
+        elapsed_time = (search_end - start_time) / 1e6
+        stats = {'algorithm': 'Dijkstra', 'time_taken': elapsed_time, 'path_found': False,
+                 'nodes_expanded': open_set.pops, 'open_list': open_set.stats()}
+        stats['phases_ns'] = self._phases_ns(start_time, search_start, search_end)
+        if instrument:
+            stats['counters'] = self._search_counters(
+                state, generation, open_set, patterns, np.count_nonzero(state.closed == generation))
+        if budget is not None:
+            budget.annotate(stats)
+        return None, stats
+    
+    def astar(self, callback=None, budget=None):
+        """
+        A*: Sử dụng heuristic + cost, tối ưu cho Energy/Cost
+        
+        Args:
+            callback: Hàm callback được gọi mỗi khi xét một node
+            budget: SearchBudget giới hạn lần tìm (None = không giới hạn)
+        
+        Returns:
+            Tuple (path, stats); hết ngân sách thì path là đường dở dang từ Start tới ô
+            đã đóng có h nhỏ nhất (gần End nhất) và stats có partial = True
+        """
+        start_time = time.perf_counter_ns()
+        
+        start_pos, goal_pos = self._endpoints()
+        if not start_pos or not goal_pos:
+            return None, {}
+        
+        grid = self.grid
+        cols = grid.cols
+        start = grid.index(start_pos[0], start_pos[1])
+        goal = grid.index(goal_pos[0], goal_pos[1])
+        goal_row, goal_col = goal_pos
+        weights = memoryview(grid.weights)
+        table = grid.get_neighbor_table(self.allow_diagonal)
+        masks = table.masks_view
+        instrument = self.instrument
+        patterns = CountingPatterns(table.patterns) if instrument else table.patterns
+        state = grid.search_state
+        generation = state.begin()
+        g_scores = state.g_view
+        parents = state.parent_view
+        seen = state.seen_view
+        closed = state.closed_view
+        
+        # Chọn heuristic dựa trên allow_diagonal và các weight đang có trên lưới
+        heuristic_name, heuristic, h_scale = self._select_heuristic()
+        
+        seen[start] = generation
+        g_scores[start] = 0.0
+        parents[start] = -1
+        start_f = h_scale * heuristic(start_pos[0], start_pos[1], goal_row, goal_col)
+        open_set = self._get_open_list()
+        push = open_set.push
+        pop = open_set.pop
+        push(start, start_f)
+        # Ô đã đóng gần End nhất (chỉ theo dõi khi có budget)
+        best, best_h = start, start_f
+        
+        if callback:
+            callback(self._node(start), 'open')
+        
+        if budget is not None:
+            budget.begin()
+        search_start = time.perf_counter_ns()
+        while open_set:
+            if budget is not None:
+                if budget.spend():
+                    break
+                current_f, current = pop()
+                current_h = current_f - g_scores[current]
+                if current_h < best_h:
+                    best, best_h = current, current_h
+            else:
+                current_f, current = pop()
+            closed[current] = generation
+            
+            if callback:
+                callback(self._node(current), 'closed')
+            
+            if current == goal:
+                search_end = time.perf_counter_ns()
+                path = state.reconstruct(goal, cols)
+                stats = self._build_stats('A*', path, start_time, search_start, search_end)
+                stats['heuristic'] = heuristic_name
+                stats['nodes_expanded'] = open_set.pops
+                stats['open_list'] = open_set.stats()
+                if instrument:
+                    stats['counters'] = self._search_counters(
+                        state, generation, open_set, patterns, np.count_nonzero(state.closed == generation))
+                if budget is not None:
+                    budget.annotate(stats)
+                return path, stats
+            
+            current_g = g_scores[current]
+            for delta, move_cost in patterns[masks[current]]:
+                neighbor = current + delta
+                if closed[neighbor] == generation:
+                    continue
+                
+                # Chi phí = move_cost (1.0 hoặc √2) * weight của neighbor
+                tentative_g = current_g + move_cost * weights[neighbor]
+                
+                if seen[neighbor] != generation or tentative_g < g_scores[neighbor]:
+                    seen[neighbor] = generation
+                    g_scores[neighbor] = tentative_g
+                    parents[neighbor] = current
+                    row, col = divmod(neighbor, cols)
+                    f_score = tentative_g + h_scale * heuristic(row, col, goal_row, goal_col)
+                    push(neighbor, f_score)
+                    if callback:
+                        callback(self._node(neighbor), 'open')
+        
+        search_end = time.perf_counter_ns()
+        if budget is not None and budget.exhausted_by is not None:
+            path = state.reconstruct(best, cols)
+            stats = self._build_stats('A*', path, start_time, search_start, search_end)
+            stats['path_found'] = False
+            stats['partial'] = True
+            stats['heuristic'] = heuristic_name
+            stats['nodes_expanded'] = open_set.pops
+            stats['open_list'] = open_set.stats()
+            if instrument:
+                stats['counters'] = self._search_counters(
+                    state, generation, open_set, patterns, np.count_nonzero(state.closed == generation))
+            return path, budget.annotate(stats)
+        
+        elapsed_time = (search_end - start_time) / 1e6
+        stats = {'algorithm': 'A*', 'time_taken': elapsed_time, 'path_found': False,
+                 'heuristic': heuristic_name, 'nodes_expanded': open_set.pops,
+                 'open_list': open_set.stats()}
+        stats['phases_ns'] = self._phases_ns(start_time, search_start, search_end)
+        if instrument:
+            stats['counters'] = self._search_counters(
+                state, generation, open_set, patterns, np.count_nonzero(state.closed == generation))
+        if budget is not None:
+            budget.annotate(stats)
+        return None, stats
+    
+    def ara_star(self, callback=None, epsilon=1.5, epsilon_decrement=0.2, on_solution=None, budget=None):
+        """
+        ARA* (Anytime Repairing A*): có ngay đường đi trong phạm vi epsilon lần tối ưu,
+        sau đó cải thiện dần tới tối ưu
+        
+        Args:
+            callback: Hàm callback được gọi mỗi khi xét một node
+            epsilon: Hệ số phóng đại heuristic ban đầu (>= 1)
+            epsilon_decrement: Lượng giảm epsilon sau mỗi lời giải (> 0)
+            on_solution: Hàm on_solution(path, stats) được gọi với mỗi lời giải mới
+            budget: SearchBudget giới hạn cả lần tìm (số lần mở rộng cộng dồn qua các vòng)
+        
+        Returns:
+            Tuple (path, stats) của lời giải cuối cùng (tối ưu nếu chạy hết); hết ngân
+            sách thì là lời giải tốt nhất đã có, với suboptimality_bound của nó
+        """
+        start_time = time.perf_counter_ns()
+        path, stats = None, None
+        for path, stats in self.ara_star_iter(callback, epsilon, epsilon_decrement, budget):
+            if on_solution:
+                on_solution(path, stats)
+        
+        if stats is None:
+            elapsed_time = (time.perf_counter_ns() - start_time) / 1e6
+            stats = {'algorithm': 'ARA*', 'time_taken': elapsed_time, 'path_found': False}
+            path = None
+        if budget is not None:
+            stats = budget.annotate(dict(stats))
+        return path, stats
+    
+    def ara_star_iter(self, callback=None, epsilon=1.5, epsilon_decrement=0.2, budget=None):
+        """
+        Generator của ARA*: yield (path, stats) sau mỗi lần cải thiện
+        
+        Mỗi vòng chạy weighted A* với f = g + epsilon * h, nhưng g/parent được giữ lại
+        giữa các vòng: nút đã đóng mà g giảm được đưa vào INCONS thay vì mở lại ngay,
+        và khi giảm epsilon chỉ OPEN ∪ INCONS được sắp lại khóa, nên mỗi vòng chỉ sửa
+        phần bị ảnh hưởng chứ không tìm lại từ đầu.
+        
+        stats của mỗi lời giải có:
+            - epsilon: Hệ số phóng đại của vòng vừa chạy
+            - suboptimality_bound: Cận đã chứng minh, chi phí <= bound * tối ưu
+              (= min(epsilon, g(End) / min của g + h trên OPEN ∪ INCONS))
+            - path_cost: Chi phí đường đi (không tăng giữa các lần yield)
+            - iteration, nodes_expanded (cộng dồn qua các vòng)
+        
+        Generator dừng khi bound = 1 (đã tối ưu). Người dùng có thể dừng sớm bất cứ
+        lúc nào; không chạy thuật toán khác trên cùng Grid giữa hai lần yield vì các
+        vòng dùng chung SearchState. Hết ngân sách (budget) thì generator dừng, kể cả
+        giữa một vòng (budget.exhausted_by cho biết lý do).
+        
+        Args:
+            callback: Hàm callback được gọi mỗi khi xét một node
+            epsilon: Hệ số phóng đại heuristic ban đầu (>= 1)
+            epsilon_decrement: Lượng giảm epsilon sau mỗi lời giải (> 0)
+            budget: SearchBudget giới hạn lần tìm (None = không giới hạn)
+        """
+        if epsilon_decrement <= 0:
+            raise ValueError("epsilon_decrement must be positive")
+        if self.open_list_name == BucketQueue.name:
+            # Khóa g + epsilon * h không phải bội số của 0.5
+            raise ValueError("open_list='bucket' cannot be used with ARA* (inflated keys are not "
+                             "multiples of 0.5); use it with Dijkstra, A*, JPS or bidirectional Dijkstra")
+        start_time = time.perf_counter_ns()
+        
+        start_pos, goal_pos = self._endpoints()
+        if not start_pos or not goal_pos:
+            return
+        
+        grid = self.grid
+        cols = grid.cols
+        start = grid.index(start_pos[0], start_pos[1])
+        goal = grid.index(goal_pos[0], goal_pos[1])
+        goal_row, goal_col = goal_pos
+        weights = memoryview(grid.weights)
+        table = grid.get_neighbor_table(self.allow_diagonal)
+        masks = table.masks_view
+        patterns = table.patterns
+        state = grid.search_state
+        generation = state.begin()
+        g_scores = state.g_view
+        parents = state.parent_view
+        seen = state.seen_view
+        closed = state.closed_view
+        
+        heuristic_name, heuristic, h_scale = self._select_heuristic()
+        
+        def h(index):
+            row, col = divmod(index, cols)
+            return h_scale * heuristic(row, col, goal_row, goal_col)
+        
+        epsilon = max(1.0, epsilon)
+        seen[start] = generation
+        g_scores[start] = 0.0
+        parents[start] = -1
+        open_set = self._get_open_list()
+        push = open_set.push
+        pop = open_set.pop
+        push(start, epsilon * h(start))
+        incons = set()
+        closed_cells = []
+        expanded = 0
+        iteration = 0
+        best_path, best_cost = None, float('inf')
+        
+        if callback:
+            callback(self._node(start), 'open')
+        if budget is not None:
+            budget.begin()
+        
+        while True:
+            # ImprovePath: mở rộng cho tới khi f của End không lớn hơn khóa nhỏ nhất
+            while True:
+                goal_g = g_scores[goal] if seen[goal] == generation else float('inf')
+                if goal_g <= open_set.peek_key():
+                    break
+                if budget is not None and budget.spend():
+                    return
+                
+                current_f, current = pop()
+                closed[current] = generation
+                closed_cells.append(current)
+                expanded += 1
+                
+                if callback:
+                    callback(self._node(current), 'closed')
+                
+                current_g = g_scores[current]
+                for delta, move_cost in patterns[masks[current]]:
+                    neighbor = current + delta
+                    tentative_g = current_g + move_cost * weights[neighbor]
+                    
+                    if seen[neighbor] != generation or tentative_g < g_scores[neighbor]:
+                        seen[neighbor] = generation
+                        g_scores[neighbor] = tentative_g
+                        parents[neighbor] = current
+                        if closed[neighbor] == generation:
+                            incons.add(neighbor)
+                        else:
+                            push(neighbor, tentative_g + epsilon * h(neighbor))
+                            if callback:
+                                callback(self._node(neighbor), 'open')
+            
+            if seen[goal] != generation:
+                return
+            
+            # Đường theo parent có thể rẻ hơn g(End) (nút trong INCONS đã có g nhỏ hơn),
+            # giữ đường rẻ nhất từng thấy; chi phí của nó <= g(End) <= epsilon * tối ưu
+            iteration += 1
+            path = state.reconstruct(goal, cols)
+            path_cost = self._path_cost(path)
+            if path_cost < best_cost:
+                best_path, best_cost = path, path_cost
+            
+            # Cận dưới của chi phí tối ưu: min g + h trên OPEN ∪ INCONS
+            members = open_set.drain()
+            members.extend(incons)
+            lower = min((g_scores[index] + h(index) for index in members), default=float('inf'))
+            if best_cost == 0 or not members:
+                bound = 1.0
+            else:
+                bound = max(1.0, min(epsilon, best_cost / lower))
+            
+            stats = self._build_stats('ARA*', best_path, start_time)
+            stats['epsilon'] = epsilon
+            stats['suboptimality_bound'] = bound
+            stats['path_cost'] = best_cost
+            stats['iteration'] = iteration
+            stats['heuristic'] = heuristic_name
+            stats['nodes_expanded'] = expanded
+            if budget is not None:
+                budget.annotate(stats)
+            yield best_path, stats
+            
+            if bound <= 1.0:
+                return
             
-            node.cell_type = cell_type
-            # Cập nhật weight
-            if cell_type == CELL_WALL:
-                node.weight = float('inf')
-            elif cell_type == CELL_TRAP:
-                node.weight = 5.0
-            elif cell_type == CELL_ROAD:
-                node.weight = 0.5
-            else:
-                node.weight = 1.0
+            # Giảm epsilon, đưa OPEN ∪ INCONS vào lại với khóa mới và xóa CLOSED
+            epsilon = max(1.0, round(epsilon - epsilon_decrement, 9))
+            for index in closed_cells:
+                closed[index] = 0
+            closed_cells = []
+            incons.clear()
+            for index in members:
+                push(index, g_scores[index] + epsilon * h(index))
     
-    def get_neighbors(self, node, allow_diagonal=False):
+    def bidirectional_dijkstra(self, callback=None, budget=None):
         """
-        Lấy danh sách các nút lân cận hợp lệ
+        Dijkstra hai chiều: tìm đồng thời từ Start và từ End, dừng khi hai phía gặp nhau
         
         Args:
-            node: Nút hiện tại
-            allow_diagonal: True nếu cho phép đi chéo (8 hướng), False nếu chỉ 4 hướng
+            callback: Hàm callback được gọi mỗi khi xét một node (cả hai phía)
+            budget: SearchBudget giới hạn lần tìm (None = không giới hạn)
         
         Returns:
-            List các tuple (neighbor_node, move_cost) với:
-            - neighbor_node: Node lân cận
-            - move_cost: Chi phí di chuyển (1.0 cho 4 hướng, √2 cho chéo)
+            Tuple (path, stats) - stats có thêm số nút mở rộng của từng phía
         """
-        import math
-        neighbors = []
+        return self._bidirectional_search('Bidirectional Dijkstra', False, callback, budget)
+    
+    def bidirectional_astar(self, callback=None, budget=None):
+        """
+        A* hai chiều với heuristic trung bình của hai phía
         
-        # 4 hướng cơ bản: Lên, Xuống, Trái, Phải (chi phí = 1.0)
-        directions_4 = [
-            (-1, 0, 1.0),  # Lên
-            (1, 0, 1.0),   # Xuống
-            (0, -1, 1.0),  # Trái
-            (0, 1, 1.0)    # Phải
-        ]
+        Args:
+            callback: Hàm callback được gọi mỗi khi xét một node (cả hai phía)
+            budget: SearchBudget giới hạn lần tìm (None = không giới hạn)
         
-        # 8 hướng (bao gồm cả đường chéo)
-        diagonal_cost = math.sqrt(2)  # Chi phí đường chéo = √2 ≈ 1.414
-        directions_8 = directions_4 + [
-            (-1, -1, diagonal_cost),  # Lên-Trái (chéo)
-            (-1, 1, diagonal_cost),   # Lên-Phải (chéo)
-            (1, -1, diagonal_cost),   # Xuống-Trái (chéo)
-            (1, 1, diagonal_cost)    # Xuống-Phải (chéo)
-        ]
+        Returns:
+            Tuple (path, stats) - stats có thêm số nút mở rộng của từng phía
+        """
+        return self._bidirectional_search('Bidirectional A*', True, callback, budget)
+    
+    def _bidirectional_search(self, algorithm, use_heuristic, callback, budget=None):
+        """
+        Tìm kiếm hai chiều dùng chung cho Dijkstra và A*
         
-        # Chọn hướng di chuyển dựa trên allow_diagonal
-        directions = directions_8 if allow_diagonal else directions_4
+        Chiều ngược đi trên cạnh đảo: từ ô v sang lân cận u tốn move_cost * weight[v]
+        (chi phí bước u → v), nên g_forward(x) + g_backward(x) là chi phí đường đi qua x.
+        mu là chi phí đường tốt nhất đã thấy khi một ô có nhãn ở cả hai phía.
         
-        for dr, dc, move_cost in directions:
-            new_row = node.row + dr
-            new_col = node.col + dc
-            neighbor = self.get_node(new_row, new_col)
-            if neighbor and neighbor.is_passable():
-                # Trả về tuple (neighbor, move_cost) để thuật toán tính toán chính xác
-                neighbors.append((neighbor, move_cost))
+        Với A*, hai phía dùng thế năng p(x) = (h_end(x) - h_start(x)) / 2 và -p(x)
+        (heuristic trung bình) để chi phí rút gọn không âm ở cả hai chiều. Khóa của
+        hai phía là g_forward + p và g_backward - p, và điều kiện dừng đúng cho cả hai
+        thuật toán là: khóa nhỏ nhất phía thuận + khóa nhỏ nhất phía ngược >= mu.
+        Mỗi vòng mở rộng phía có open list nhỏ hơn. Hết ngân sách thì không trả đường
+        đi nào (đường qua điểm gặp nhau chưa chắc tối ưu).
+        """
+        if use_heuristic and self.open_list_name == BucketQueue.name:
+            # Thế năng trung bình (h_end - h_start) / 2 cho khóa là bội số của 0.25
+            raise ValueError("open_list='bucket' cannot be used with bidirectional A* (averaged potentials "
+                             "are not multiples of 0.5); use it with Dijkstra, A*, JPS or bidirectional Dijkstra")
+        start_time = time.perf_counter_ns()
         
-        return neighbors
-    
-    def reset_pathfinding_data(self):
-        """Reset tất cả dữ liệu pathfinding (g_score, h_score, f_score, parent)"""
-        for row in self.grid:
-            for node in row:
-                node.g_score = 0
-                node.h_score = 0
-                node.f_score = 0
-                node.parent = None
+        start_pos, goal_pos = self._endpoints()
+        if not start_pos or not goal_pos:
+            return None, {}
+        
+        grid = self.grid
+        cols = grid.cols
+        start = grid.index(start_pos[0], start_pos[1])
+        goal = grid.index(goal_pos[0], goal_pos[1])
+        start_row, start_col = start_pos
+        goal_row, goal_col = goal_pos
+        weights = memoryview(grid.weights)
+        table = grid.get_neighbor_table(self.allow_diagonal)
+        masks = table.masks_view
+        patterns = table.patterns
+        
+        heuristic_name = None
+        if use_heuristic:
+            heuristic_name, heuristic, h_scale = self._select_heuristic()
+            h_scale *= 0.5
+        
+        # Mỗi phía: (state, generation, g, parents, seen, closed, open list)
+        forward_state = grid.search_state
+        backward_state = self._get_backward_state()
+        sides = []
+        for state, origin, side in ((forward_state, start, 'forward'), (backward_state, goal, 'backward')):
+            generation = state.begin()
+            state.seen_view[origin] = generation
+            state.g_view[origin] = 0.0
+            state.parent_view[origin] = -1
+            sides.append((state, generation, state.g_view, state.parent_view,
+                          state.seen_view, state.closed_view, self._get_open_list(side)))
+        
+        def potential(index):
+            """p(x) của phía thuận (phía ngược dùng -p(x))"""
+            if not use_heuristic:
+                return 0.0
+            row, col = divmod(index, cols)
+            return h_scale * (heuristic(row, col, goal_row, goal_col) -
+                              heuristic(row, col, start_row, start_col))
+        
+        sides[0][6].push(start, potential(start))
+        sides[1][6].push(goal, -potential(goal))
+        expanded = [0, 0]
+        best_cost = 0.0 if start == goal else float('inf')
+        meeting = start if start == goal else -1
+        
+        if callback:
+            callback(self._node(start), 'open')
+            callback(self._node(goal), 'open')
+        if budget is not None:
+            budget.begin()
+        
+        while True:
+            forward_open = sides[0][6]
+            backward_open = sides[1][6]
+            if forward_open.peek_key() + backward_open.peek_key() >= best_cost:
+                break
+            if budget is not None and budget.spend():
+                meeting = -1
+                break
+            
+            # Mở rộng phía có open list nhỏ hơn (phía rỗng có khóa inf nên không tới đây)
+            if forward_open and (len(forward_open) <= len(backward_open) or not backward_open):
+                side = 0
+            else:
+                side = 1
+            state, generation, g_scores, parents, seen, closed, open_set = sides[side]
+            other_generation, other_g, other_seen = sides[1 - side][1], sides[1 - side][2], sides[1 - side][4]
+            sign = 1.0 if side == 0 else -1.0
+            
+            current_key, current = open_set.pop()
+            closed[current] = generation
+            expanded[side] += 1
+            
+            if callback:
+                callback(self._node(current), 'closed')
+            
+            current_g = g_scores[current]
+            # Chiều thuận: bước vào neighbor tốn weight của neighbor;
+            # chiều ngược: bước (neighbor → current) tốn weight của current
+            current_weight = weights[current]
+            for delta, move_cost in patterns[masks[current]]:
+                neighbor = current + delta
+                if closed[neighbor] == generation:
+                    continue
+                
+                if side == 0:
+                    tentative_g = current_g + move_cost * weights[neighbor]
+                else:
+                    tentative_g = current_g + move_cost * current_weight
+                
+                if seen[neighbor] != generation or tentative_g < g_scores[neighbor]:
+                    seen[neighbor] = generation
+                    g_scores[neighbor] = tentative_g
+                    parents[neighbor] = current
+                    open_set.push(neighbor, tentative_g + sign * potential(neighbor))
+                    if callback:
+                        callback(self._node(neighbor), 'open')
+                    
+                    # Hai phía gặp nhau tại neighbor
+                    if other_seen[neighbor] == other_generation:
+                        total = tentative_g + other_g[neighbor]
+                        if total < best_cost:
+                            best_cost = total
+                            meeting = neighbor
+        
+        elapsed_time = (time.perf_counter_ns() - start_time) / 1e6
+        counters = {
+            'nodes_expanded': expanded[0] + expanded[1],
+            'nodes_expanded_forward': expanded[0],
+            'nodes_expanded_backward': expanded[1],
+        }
+        if heuristic_name:
+            counters['heuristic'] = heuristic_name
+        
+        if meeting < 0:
+            result = {'algorithm': algorithm, 'time_taken': elapsed_time, 'path_found': False}
+            result.update(counters)
+            if budget is not None:
+                budget.annotate(result)
+            return None, result
+        
+        # Nửa đầu: Start → meeting qua parent phía thuận; nửa sau: meeting → End qua phía ngược
+        path = forward_state.reconstruct(meeting, cols)
+        backward_parents = backward_state.parent_view
+        index = backward_parents[meeting]
+        while index >= 0:
+            path.append(divmod(index, cols))
+            index = backward_parents[index]
+        stats = self._build_stats(algorithm, path, start_time)
+        stats.update(counters)
+        if budget is not None:
+            budget.annotate(stats)
+        return path, stats
     
-    def has_path(self):
+    def dstar_lite(self, callback=None, start=None, budget=None):
         """
-        Kiểm tra xem có đường đi từ Start đến End không (sử dụng BFS đơn giản)
+        D* Lite: Tìm lại đường đi tăng dần sau khi lưới bị sửa hoặc robot di chuyển
+        
+        Planner DStarLite được giữ lại giữa các lần gọi trên cùng PathfindingAlgorithms,
+        nên sau khi vẽ thêm vài bức tường, lần gọi sau chỉ sửa phần bị ảnh hưởng.
+        
+        Args:
+            callback: Hàm callback được gọi mỗi khi xét một node
+            start: (row, col) vị trí hiện tại của robot; None = Start của Grid
+            budget: SearchBudget giới hạn lần tìm; hết ngân sách thì path = None nhưng
+                    planner giữ nguyên hàng đợi, lần gọi sau tìm tiếp từ chỗ dừng
         
         Returns:
-            True nếu có đường đi, False nếu không
+            Tuple (path, stats); stats có thêm nodes_expanded, cells_updated,
+            replans và incremental (False nếu phải tìm lại từ đầu)
         """
-        if not self.start or not self.end:
-            return False
+        start_time = time.perf_counter_ns()
         
-        import collections
+        start_pos, goal_pos = self._endpoints()
+        if not start_pos or not goal_pos:
+            return None, {}
         
-        start_node = self.get_node(self.start[0], self.start[1])
-        end_node = self.get_node(self.end[0], self.end[1])
+        planner = self._dstar_lite
+        if (planner is None or planner.grid is not self.grid
+                or planner.allow_diagonal != self.allow_diagonal or planner.heuristic != self.heuristic):
+            if planner is not None:
+                planner.close()
+            planner = DStarLite(self.grid, self.allow_diagonal, self.heuristic)
+            self._dstar_lite = planner
         
-        if not start_node or not end_node:
-            return False
+        path = planner.plan(start or start_pos, callback, goal_pos, budget)
+        if path is None:
+            stats = {'algorithm': 'D* Lite', 'time_taken': (time.perf_counter_ns() - start_time) / 1e6,
+                     'path_found': False}
+        else:
+            stats = self._build_stats('D* Lite', path, start_time)
+        stats['heuristic'] = planner.heuristic_name
+        stats['nodes_expanded'] = planner.nodes_expanded
+        stats['cells_updated'] = planner.cells_updated
+        stats['replans'] = planner.replans
+        stats['incremental'] = not planner.reinitialized
+        if budget is not None:
+            budget.annotate(stats)
+        return path, stats
+    
+    def hpa_star(self, callback=None, cluster_size=16, budget=None):
+        """
+        HPA*: A* trên đồ thị trừu tượng các cụm rồi tìm chi tiết từng đoạn (gần tối ưu)
         
-        queue = collections.deque([start_node])
-        visited = set()
-        visited.add((start_node.row, start_node.col))
+        Planner HPAStar được giữ lại giữa các lần gọi nên chi phí dựng đồ thị trừu tượng
+        chỉ trả một lần; sửa lưới chỉ làm tính lại các cụm bị ảnh hưởng.
         
-        while queue:
-            current = queue.popleft()
-            
-            if current.row == end_node.row and current.col == end_node.col:
-                return True
-            
-            # get_neighbors() trả về tuple (neighbor, move_cost)
-            # move_cost không cần thiết cho has_path() (chỉ kiểm tra có đường đi hay không)
-            for neighbor, _ in self.get_neighbors(current, allow_diagonal=False):
-                pos = (neighbor.row, neighbor.col)
-                if pos not in visited:
-                    visited.add(pos)
-                    queue.append(neighbor)
+        Args:
+            callback: Hàm callback được gọi cho các nút trừu tượng (ô chuyển tiếp)
+            cluster_size: Cạnh của một cụm
+            budget: SearchBudget giới hạn lần tìm (mỗi nút trừu tượng là một lần mở rộng)
         
-        return False
+        Returns:
+            Tuple (path, stats); stats có thêm nodes_expanded (nút trừu tượng),
+            clusters_rebuilt và cluster_size
+        """
+        start_time = time.perf_counter_ns()
+        
+        start_pos, goal_pos = self._endpoints()
+        if not start_pos or not goal_pos:
+            return None, {}
+        
+        planner = self._hpa_star
+        if (planner is None or planner.grid is not self.grid or planner.cluster_size != cluster_size
+                or planner.allow_diagonal != self.allow_diagonal or planner.heuristic != self.heuristic):
+            if planner is not None:
+                planner.close()
+            planner = HPAStar(self.grid, self.allow_diagonal, cluster_size, self.heuristic)
+            self._hpa_star = planner
+        
+        path = planner.find_path(start_pos, goal_pos, callback, budget)
+        if path is None:
+            stats = {'algorithm': 'HPA*', 'time_taken': (time.perf_counter_ns() - start_time) / 1e6,
+                     'path_found': False}
+        else:
+            stats = self._build_stats('HPA*', path, start_time)
+        stats['nodes_expanded'] = planner.nodes_expanded
+        stats['clusters_rebuilt'] = planner.clusters_rebuilt
+        stats['cluster_size'] = cluster_size
+        if budget is not None:
+            budget.annotate(stats)
+        return path, stats
     
-    @staticmethod
-    def generate_random_map(min_size=10, max_size=30, wall_density=0.25, trap_density=0.15, road_density=0.1, max_attempts=10, energy_mode=True):
+    def jps(self, callback=None, budget=None):
         """
-        Tạo random map với đầy đủ cell types và đảm bảo có đường đi
+        Jump Point Search: A* chỉ mở rộng các "điểm nhảy" trên vùng chi phí đồng nhất
         
-        Thuật toán:
-        1. Tạo kích thước ngẫu nhiên (10-30)
-        2. Đặt Start và End ở 2 góc đối diện
-        3. Tạo một đường đi guaranteed (L-shaped) để đảm bảo có đáp án
-        4. Thêm walls, traps, roads ngẫu nhiên nhưng không chặn đường đi guaranteed
-        5. Kiểm tra lại bằng BFS để đảm bảo có đường đi
+        Từ mỗi nút, thay vì thêm mọi ô lân cận, JPS đi thẳng (hoặc chéo) theo hướng đang
+        xét cho đến khi gặp ô có forced neighbor, Goal hoặc ô không uniform (cạnh
+        TRAP/ROAD); chỉ ô dừng đó được thêm vào open list. Ô không uniform, Start và
+        các ô xung quanh weight khác 1 được mở rộng đầy đủ như A* thường nên kết quả
+        có cùng chi phí tối ưu với astar().
+        
+        Quy tắc cắt tỉa theo chế độ di chuyển của Grid: 8 hướng được đi chéo cả khi
+        hai ô kề bên là tường (giống get_neighbors), 4 hướng dùng biến thể JPS trực giao.
         
         Args:
-            min_size: Kích thước tối thiểu (mặc định 10)
-            max_size: Kích thước tối đa (mặc định 30)
-            wall_density: Mật độ walls (0.0-1.0, mặc định 0.25)
-            trap_density: Mật độ traps (0.0-1.0, mặc định 0.15)
-            road_density: Mật độ roads (0.0-1.0, mặc định 0.1)
-            max_attempts: Số lần thử tối đa nếu không tìm được đường đi
+            callback: Hàm callback được gọi mỗi khi xét một node (chỉ các điểm nhảy)
+            budget: SearchBudget giới hạn lần tìm (mỗi điểm nhảy là một lần mở rộng)
         
         Returns:
-            Grid object với map đã được tạo và đảm bảo có đường đi
+            Tuple (path, stats) - path đầy đủ từng ô, kể cả các ô giữa hai điểm nhảy
         """
-        import random
+        start_time = time.perf_counter_ns()
         
-        for attempt in range(max_attempts):
-            # Tạo kích thước ngẫu nhiên
-            size = random.randint(min_size, max_size)
-            grid = Grid(size, size)
-            
-            # Đặt Start và End ở 2 góc đối diện (tăng khoảng cách để test tốt hơn)
-            # Có thể chọn: (0,0) -> (size-1, size-1) hoặc (0, size-1) -> (size-1, 0)
-            corner_choice = random.random()
-            if corner_choice < 0.5:
-                start_pos = (0, 0)
-                end_pos = (size - 1, size - 1)
-            else:
-                start_pos = (0, size - 1)
-                end_pos = (size - 1, 0)
+        start_pos, goal_pos = self._endpoints()
+        if not start_pos or not goal_pos:
+            return None, {}
+        
+        grid = self.grid
+        cols = grid.cols
+        start = grid.index(start_pos[0], start_pos[1])
+        goal = grid.index(goal_pos[0], goal_pos[1])
+        goal_row, goal_col = goal_pos
+        weights = memoryview(grid.weights)
+        jump_map = grid.get_jump_point_map()
+        stride = jump_map.stride
+        walkable = jump_map.walkable_view
+        uniform = jump_map.uniform_view
+        goal_p = jump_map.padded_index(goal)
+        state = grid.search_state
+        generation = state.begin()
+        g_scores = state.g_view
+        parents = state.parent_view
+        seen = state.seen_view
+        closed = state.closed_view
+        
+        heuristic_name, heuristic, h_scale = self._select_heuristic()
+        
+        if self.allow_diagonal:
+            all_directions = [(dr, dc) for dr, dc, _ in DIRECTIONS_8]
+            jump = self._jump_8
+        else:
+            all_directions = [(dr, dc) for dr, dc, _ in DIRECTIONS_4]
+            jump = self._jump_4
+        
+        seen[start] = generation
+        g_scores[start] = 0.0
+        parents[start] = -1
+        open_set = self._get_open_list()
+        push = open_set.push
+        pop = open_set.pop
+        push(start, h_scale * heuristic(start_pos[0], start_pos[1], goal_row, goal_col))
+        
+        if callback:
+            callback(self._node(start), 'open')
+        
+        if budget is not None:
+            budget.begin()
+        search_start = time.perf_counter_ns()
+        while open_set:
+            if budget is not None and budget.spend():
+                break
+            current_f, current = pop()
+            closed[current] = generation
             
-            # Đảm bảo Start và End không trùng nhau
-            if start_pos == end_pos and size > 1:
-                end_pos = (size - 1, size - 1)
+            if callback:
+                callback(self._node(current), 'closed')
             
-            # Tạo đường đi cơ bản từ Start đến End (đảm bảo có đáp án)
-            # Sử dụng L-shaped path: đi xuống rồi sang phải, hoặc sang phải rồi đi xuống
-            guaranteed_path = []
+            if current == goal:
+                search_end = time.perf_counter_ns()
+                path = self._expand_jump_path(state.reconstruct(goal, cols))
+                stats = self._build_stats('JPS', path, start_time, search_start, search_end)
+                stats['heuristic'] = heuristic_name
+                stats['nodes_expanded'] = open_set.pops
+                stats['open_list'] = open_set.stats()
+                if budget is not None:
+                    budget.annotate(stats)
+                return path, stats
             
-            # Chọn một trong hai đường đi L-shaped
-            if random.random() < 0.5:
-                # Đi xuống trước, rồi sang phải
-                for row in range(start_pos[0], end_pos[0] + 1):
-                    guaranteed_path.append((row, start_pos[1]))
-                for col in range(start_pos[1] + 1, end_pos[1] + 1):
-                    guaranteed_path.append((end_pos[0], col))
+            row, col = divmod(current, cols)
+            current_p = (row + 1) * stride + col + 1
+            parent = parents[current]
+            if parent < 0 or not uniform[current_p]:
+                directions = all_directions
             else:
-                # Sang phải trước, rồi đi xuống
-                for col in range(start_pos[1], end_pos[1] + 1):
-                    guaranteed_path.append((start_pos[0], col))
-                for row in range(start_pos[0] + 1, end_pos[0] + 1):
-                    guaranteed_path.append((row, end_pos[1]))
-            
-            # Đặt Start và End
-            grid.set_cell_type(start_pos[0], start_pos[1], CELL_START)
-            grid.set_cell_type(end_pos[0], end_pos[1], CELL_END)
-            
-            # Đảm bảo đường đi guaranteed không bị chặn
-            protected_cells = set(guaranteed_path)
-            protected_cells.add(start_pos)
-            protected_cells.add(end_pos)
-            
-            # Tạo danh sách tất cả các cells (trừ protected cells)
-            all_cells = []
-            for row in range(size):
-                for col in range(size):
-                    pos = (row, col)
-                    if pos not in protected_cells:
-                        all_cells.append(pos)
-            
-            # Shuffle để random
-            random.shuffle(all_cells)
-            
-            # Tính số lượng cells cho mỗi loại
-            total_cells = len(all_cells)
-            num_walls = max(1, int(total_cells * wall_density))  # Đảm bảo có ít nhất 1 wall
-            
-            # Đặt walls
-            for i in range(min(num_walls, len(all_cells))):
-                row, col = all_cells[i]
-                grid.set_cell_type(row, col, CELL_WALL)
+                parent_row, parent_col = divmod(parent, cols)
+                dr = (row > parent_row) - (row < parent_row)
+                dc = (col > parent_col) - (col < parent_col)
+                directions = self._pruned_directions(walkable, current_p, stride, dr, dc)
             
-            # Chỉ tạo traps và roads nếu energy_mode = True
-            if energy_mode:
-                num_traps = max(1, int(total_cells * trap_density))  # Đảm bảo có ít nhất 1 trap
-                num_roads = max(1, int(total_cells * road_density))  # Đảm bảo có ít nhất 1 road
+            current_g = g_scores[current]
+            for dr, dc in directions:
+                jump_p, steps = jump(walkable, uniform, stride, current_p, dr, dc, goal_p)
+                if jump_p < 0:
+                    continue
+                jump_row, jump_col = divmod(jump_p, stride)
+                jump_row -= 1
+                jump_col -= 1
+                neighbor = jump_row * cols + jump_col
+                if closed[neighbor] == generation:
+                    continue
                 
-                # Đặt traps (sau walls) - đảm bảo có traps để test Energy vs Steps
-                trap_start = num_walls
-                for i in range(trap_start, min(trap_start + num_traps, len(all_cells))):
-                    row, col = all_cells[i]
-                    grid.set_cell_type(row, col, CELL_TRAP)
+                # Các ô trung gian đều uniform (weight = 1), chỉ ô đích có thể khác 1
+                move_cost = DIAGONAL_COST if dr and dc else 1.0
+                tentative_g = current_g + move_cost * (steps - 1) + move_cost * weights[neighbor]
                 
-                # Đặt roads (sau traps) - đảm bảo có roads để test Energy optimization
-                road_start = trap_start + num_traps
-                for i in range(road_start, min(road_start + num_roads, len(all_cells))):
-                    row, col = all_cells[i]
-                    grid.set_cell_type(row, col, CELL_ROAD)
-            
-            # Các cells còn lại là NORMAL (đã được set mặc định)
-            
-            # Kiểm tra lại bằng BFS để đảm bảo có đường đi
-            if grid.has_path():
-                return grid
-            
-            # Nếu không có đường đi, giảm wall_density và thử lại
-            wall_density *= 0.8
+                if seen[neighbor] != generation or tentative_g < g_scores[neighbor]:
+                    seen[neighbor] = generation
+                    g_scores[neighbor] = tentative_g
+                    parents[neighbor] = current
+                    f_score = tentative_g + h_scale * heuristic(jump_row, jump_col, goal_row, goal_col)
+                    push(neighbor, f_score)
+                    if callback:
+                        callback(self._node(neighbor), 'open')
         
-        # Nếu sau max_attempts vẫn không được, tạo map đơn giản nhưng vẫn có đủ cell types
-        size = random.randint(min_size, max_size)
-        grid = Grid(size, size)
-        grid.set_cell_type(0, 0, CELL_START)
-        grid.set_cell_type(size - 1, size - 1, CELL_END)
+        search_end = time.perf_counter_ns()
+        elapsed_time = (search_end - start_time) / 1e6
+        stats = {'algorithm': 'JPS', 'time_taken': elapsed_time, 'path_found': False,
+                 'heuristic': heuristic_name, 'nodes_expanded': open_set.pops,
+                 'open_list': open_set.stats()}
+        stats['phases_ns'] = self._phases_ns(start_time, search_start, search_end)
+        if budget is not None:
+            budget.annotate(stats)
+        return None, stats
+    
+    def _pruned_directions(self, walkable, p, stride, dr, dc):
+        """
+        Các hướng cần xét tại ô uniform p khi đến từ hướng (dr, dc): hướng tự nhiên
+        và hướng bị ép (forced) do tường bên cạnh
+        """
+        if self.allow_diagonal:
+            if dr and dc:
+                directions = [(dr, 0), (0, dc), (dr, dc)]
+                if not walkable[p - dc]:
+                    directions.append((dr, -dc))
+                if not walkable[p - dr * stride]:
+                    directions.append((-dr, dc))
+            elif dc:
+                directions = [(0, dc)]
+                if not walkable[p + stride]:
+                    directions.append((1, dc))
+                if not walkable[p - stride]:
+                    directions.append((-1, dc))
+            else:
+                directions = [(dr, 0)]
+                if not walkable[p + 1]:
+                    directions.append((dr, 1))
+                if not walkable[p - 1]:
+                    directions.append((dr, -1))
+            return directions
         
-        # Thêm ít nhất một vài cells của mỗi loại để test
-        if size > 2:
-            # Thêm 1 wall
-            grid.set_cell_type(size // 2, size // 2, CELL_WALL)
-            # Chỉ thêm trap và road nếu energy_mode = True
-            if energy_mode:
-                # Thêm 1 trap
-                if size > 3:
-                    grid.set_cell_type(size // 3, size // 3, CELL_TRAP)
-                # Thêm 1 road
-                if size > 4:
-                    grid.set_cell_type(size // 4, size // 4, CELL_ROAD)
+        if dc:
+            return [(-1, 0), (1, 0), (0, dc)]
+        return [(0, -1), (0, 1), (dr, 0)]
+    
+    @staticmethod
+    def _jump_straight_8(walkable, uniform, stride, p, delta, side, goal_p):
+        """
+        Nhảy thẳng từ p theo bước delta (8 hướng); side là bước vuông góc (1 ô)
         
-        return grid
+        Returns:
+            Tuple (điểm nhảy trên lưới có viền hoặc -1, số bước)
+        """
+        steps = 0
+        while True:
+            p += delta
+            steps += 1
+            if not walkable[p]:
+                return -1, 0
+            if p == goal_p or not uniform[p]:
+                return p, steps
+            if ((walkable[p + side + delta] and not walkable[p + side]) or
+                    (walkable[p - side + delta] and not walkable[p - side])):
+                return p, steps
+    
+    def _jump_8(self, walkable, uniform, stride, p, dr, dc, goal_p):
+        """
+        Nhảy từ p theo hướng (dr, dc) với 8 hướng di chuyển
+        
+        Returns:
+            Tuple (điểm nhảy trên lưới có viền hoặc -1, số bước)
+        """
+        jump_straight = self._jump_straight_8
+        if not dr:
+            return jump_straight(walkable, uniform, stride, p, dc, stride, goal_p)
+        if not dc:
+            return jump_straight(walkable, uniform, stride, p, dr * stride, 1, goal_p)
+        
+        vertical = dr * stride
+        delta = vertical + dc
+        steps = 0
+        while True:
+            p += delta
+            steps += 1
+            if not walkable[p]:
+                return -1, 0
+            if p == goal_p or not uniform[p]:
+                return p, steps
+            if ((walkable[p + vertical - dc] and not walkable[p - dc]) or
+                    (walkable[p - vertical + dc] and not walkable[p - vertical])):
+                return p, steps
+            # Ô chéo là điểm nhảy nếu đi thẳng ngang/dọc từ đó gặp điểm nhảy
+            if (jump_straight(walkable, uniform, stride, p, dc, stride, goal_p)[0] >= 0 or
+                    jump_straight(walkable, uniform, stride, p, vertical, 1, goal_p)[0] >= 0):
+                return p, steps
+    
+    @staticmethod
+    def _jump_horizontal_4(walkable, uniform, stride, p, dc, goal_p):
+        """
+        Nhảy ngang từ p theo bước dc (4 hướng)
+        
+        Returns:
+            Tuple (điểm nhảy trên lưới có viền hoặc -1, số bước)
+        """
+        steps = 0
+        while True:
+            p += dc
+            steps += 1
+            if not walkable[p]:
+                return -1, 0
+            if p == goal_p or not uniform[p]:
+                return p, steps
+            if ((walkable[p - stride] and not walkable[p - stride - dc]) or
+                    (walkable[p + stride] and not walkable[p + stride - dc])):
+                return p, steps
+    
+    def _jump_4(self, walkable, uniform, stride, p, dr, dc, goal_p):
+        """
+        Nhảy từ p theo hướng (dr, dc) với 4 hướng di chuyển
+        
+        Returns:
+            Tuple (điểm nhảy trên lưới có viền hoặc -1, số bước)
+        """
+        jump_horizontal = self._jump_horizontal_4
+        if dc:
+            return jump_horizontal(walkable, uniform, stride, p, dc, goal_p)
+        
+        vertical = dr * stride
+        steps = 0
+        while True:
+            p += vertical
+            steps += 1
+            if not walkable[p]:
+                return -1, 0
+            if p == goal_p or not uniform[p]:
+                return p, steps
+            if ((walkable[p - 1] and not walkable[p - 1 - vertical]) or
+                    (walkable[p + 1] and not walkable[p + 1 - vertical])):
+                return p, steps
+            # Khi đi dọc, ô là điểm nhảy nếu đi ngang từ đó gặp điểm nhảy
+            if (jump_horizontal(walkable, uniform, stride, p, 1, goal_p)[0] >= 0 or
+                    jump_horizontal(walkable, uniform, stride, p, -1, goal_p)[0] >= 0):
+                return p, steps
+    
+    def _expand_jump_path(self, jump_points):
+        """
+        Điền các ô trung gian giữa các điểm nhảy liên tiếp (luôn thẳng hoặc chéo 45°)
+        
+        Args:
+            jump_points: List các (row, col) điểm nhảy từ Start đến Goal
+        
+        Returns:
+            List đầy đủ các (row, col) từ Start đến Goal
+        """
+        path = [jump_points[0]]
+        for (row1, col1), (row2, col2) in zip(jump_points, jump_points[1:]):
+            dr = (row2 > row1) - (row2 < row1)
+            dc = (col2 > col1) - (col2 < col1)
+            row, col = row1, col1
+            while (row, col) != (row2, col2):
+                row += dr
+                col += dc
+                path.append((row, col))
+        return path
+    
+    def solve_many(self, pairs, algorithm='astar', workers=None, chunk_size=None, **options):
+        """
+        Giải nhiều truy vấn start → goal trên cùng Grid mà không sửa Grid.start/Grid.end
+        
+        Các truy vấn chạy tuần tự dùng chung bảng lân cận, SearchState và open list
+        (reset O(1) mỗi truy vấn). Với workers > 1, các truy vấn được chia thành từng
+        phần cho ProcessPoolExecutor; mỗi process nhận bản sao Grid (pickle, xem
+        Grid.__getstate__) một lần và giữ PathfindingAlgorithms riêng với cùng cấu hình.
+        Khi đó heuristic tự định nghĩa phải pickle được (hàm cấp module, không phải lambda).
+        
+        Args:
+            pairs: Danh sách các ((start_row, start_col), (goal_row, goal_col))
+            algorithm: Tên phương thức trong SOLVE_MANY_ALGORITHMS
+            workers: Số process; None hoặc 1 = chạy trong process hiện tại
+            chunk_size: Số truy vấn mỗi lần gửi cho một process (mặc định chia đều
+                        thành khoảng 4 phần mỗi process)
+            **options: Tham số thêm cho phương thức (ví dụ cluster_size cho hpa_star)
+        
+        Returns:
+            List các (path, stats) theo đúng thứ tự của pairs
+        """
+        if algorithm not in SOLVE_MANY_ALGORITHMS:
+            raise ValueError(f"Unknown algorithm '{algorithm}', expected one of {SOLVE_MANY_ALGORITHMS}")
+        queries = []
+        for start, goal in pairs:
+            start, goal = tuple(start), tuple(goal)
+            for row, col in (start, goal):
+                if not (0 <= row < self.grid.rows and 0 <= col < self.grid.cols):
+                    raise ValueError(f"Cell {(row, col)} is outside the {self.grid.rows}x{self.grid.cols} grid")
+            queries.append((start, goal))
+        
+        if not workers or workers <= 1 or len(queries) <= 1:
+            return self._solve_queries(queries, algorithm, options)
+        
+        chunk_size = chunk_size or max(1, -(-len(queries) // (workers * 4)))
+        chunks = [queries[i:i + chunk_size] for i in range(0, len(queries), chunk_size)]
+        settings = (self.allow_diagonal, self.open_list_name, self.heuristic, self.instrument)
+        results = []
+        with concurrent.futures.ProcessPoolExecutor(max_workers=workers, initializer=_init_solve_worker,
+                                                    initargs=(self.grid, settings)) as executor:
+            for chunk_results in executor.map(_solve_worker_chunk, chunks,
+                                              [algorithm] * len(chunks), [options] * len(chunks)):
+                results.extend(chunk_results)
+        return results
+    
+    def _solve_queries(self, queries, algorithm, options):
+        """Chạy tuần tự các truy vấn (start, goal) đã kiểm tra bằng phương thức algorithm"""
+        method = getattr(self, algorithm)
+        results = []
+        try:
+            for query in queries:
+                self._query = query
+                results.append(method(**options))
+        finally:
+            self._query = None
+        return results
+
+
+# Các phương thức của PathfindingAlgorithms dùng được với solve_many()
+SOLVE_MANY_ALGORITHMS = ('bfs', 'dfs', 'dijkstra', 'astar', 'jps', 'bidirectional_dijkstra',
+                         'bidirectional_astar', 'ara_star', 'dstar_lite', 'hpa_star')
+
+# PathfindingAlgorithms của process con trong solve_many(workers > 1)
+_worker_pathfinder = None
+
+
+def _init_solve_worker(grid, settings):
+    """Initializer của process con: dựng PathfindingAlgorithms trên bản sao Grid"""
+    global _worker_pathfinder
+    allow_diagonal, open_list, heuristic, instrument = settings
+    _worker_pathfinder = PathfindingAlgorithms(grid, allow_diagonal, open_list, heuristic, instrument)
+
+
+def _solve_worker_chunk(queries, algorithm, options):
+    """Giải một phần truy vấn trong process con"""
+    return _worker_pathfinder._solve_queries(queries, algorithm, options)
+
+
+# Các thuật toán so sánh mặc định (như README) và các thuật toán có bộ đếm instrument
+COMPARE_ALGORITHMS = ('bfs', 'dfs', 'dijkstra', 'astar')
+COUNTER_ALGORITHMS = ('bfs', 'dfs', 'dijkstra', 'astar')
+
+# Grid (chỉ đọc) của process con trong compare_algorithms(workers > 1)
+_worker_grid = None
+
+
+def _init_compare_worker(grid):
+    """Initializer của process con: giữ bản sao Grid dùng chung cho mọi tác vụ"""
+    global _worker_grid
+    _worker_grid = grid
+
+
+def _compare_worker(task):
+    """Chạy một tác vụ (thuật toán, chế độ di chuyển) của compare_algorithms trong process con"""
+    return _compare_one(_worker_grid, *task)
+
+
+def _compare_one(grid, algorithm, allow_diagonal, start, goal, repeat):
+    """
+    Chạy một thuật toán repeat lần trên grid (không đổi Start/End của grid)
+    
+    Returns:
+        Dict một dòng của bảng so sánh (time_ms là thời gian tốt nhất)
+    """
+    best = None
+    for _ in range(repeat):
+        # PathfindingAlgorithms mới mỗi lần: D* Lite/HPA* không dùng lại planner của lần trước
+        pathfinder = PathfindingAlgorithms(grid, allow_diagonal)
+        path, stats = pathfinder.solve_many([(start, goal)], algorithm)[0]
+        if best is None or stats.get('time_taken', 0.0) < best[1].get('time_taken', 0.0):
+            best = (path, stats)
+    path, stats = best
+    expanded = stats.get('nodes_expanded')
+    if expanded is None and algorithm in COUNTER_ALGORITHMS:
+        # Lần chạy riêng có bộ đếm để không làm sai thời gian đo ở trên
+        pathfinder.instrument = True
+        expanded = pathfinder.solve_many([(start, goal)], algorithm)[0][1]['counters']['nodes_expanded']
+    return {
+        'algorithm': stats.get('algorithm', algorithm),
+        'method': algorithm,
+        'allow_diagonal': allow_diagonal,
+        'path_found': path is not None,
+        'path_length': stats.get('path_length'),
+        'total_energy': stats.get('total_energy'),
+        'nodes_expanded': expanded,
+        'time_ms': stats.get('time_taken'),
+    }
+
+
+def compare_algorithms(grid, algorithms=COMPARE_ALGORITHMS, diagonal_modes=(False, True),
+                       start=None, goal=None, workers=None, repeat=1):
+    """
+    So sánh nhiều thuật toán (và cả 2 chế độ di chuyển) trên cùng một lưới
+    
+    Mỗi cặp (thuật toán, chế độ di chuyển) là một tác vụ độc lập: các thuật toán chỉ
+    đọc lưới (trạng thái tìm kiếm nằm trong SearchState), nên với workers > 1 các tác
+    vụ chạy song song trong process pool, mỗi process nhận một bản sao Grid (pickle)
+    và chỉ đọc nó.
+    
+    Args:
+        grid: Grid object
+        algorithms: Tên các phương thức trong SOLVE_MANY_ALGORITHMS
+        diagonal_modes: Các giá trị allow_diagonal cần chạy
+        start, goal: (row, col) (None = Start/End của lưới)
+        workers: Số process (None/1 = chạy tuần tự trong process hiện tại)
+        repeat: Số lần chạy mỗi tác vụ, lấy thời gian tốt nhất
+    
+    Returns:
+        List dict (algorithm, method, allow_diagonal, path_found, path_length,
+        total_energy, nodes_expanded, time_ms) theo thứ tự chế độ di chuyển rồi thuật toán
+    """
+    start = tuple(start or grid.start or ())
+    goal = tuple(goal or grid.end or ())
+    if not start or not goal:
+        raise ValueError("compare_algorithms needs a start and a goal")
+    for algorithm in algorithms:
+        if algorithm not in SOLVE_MANY_ALGORITHMS:
+            raise ValueError(f"Unknown algorithm '{algorithm}', expected one of {SOLVE_MANY_ALGORITHMS}")
+    tasks = [(algorithm, allow_diagonal, start, goal, repeat)
+             for allow_diagonal in diagonal_modes for algorithm in algorithms]
+    
+    if not workers or workers <= 1 or len(tasks) <= 1:
+        return [_compare_one(grid, *task) for task in tasks]
+    with concurrent.futures.ProcessPoolExecutor(max_workers=min(workers, len(tasks)),
+                                                initializer=_init_compare_worker,
+                                                initargs=(grid,)) as executor:
+        return list(executor.map(_compare_worker, tasks))
 
 
-class PathfindingAlgorithms:
+def format_comparison(rows):
+    """
+    Định dạng kết quả compare_algorithms() thành bảng văn bản
+    
+    Returns:
+        Chuỗi nhiều dòng
+    """
+    lines = [f"{'Thuật toán':<24} {'Hướng':>5} {'Số bước':>8} {'Năng lượng':>11} {'Mở rộng':>9} {'Thời gian (ms)':>15}",
+             "-" * 77]
+    for row in rows:
+        directions = '8' if row['allow_diagonal'] else '4'
+        if row['path_found']:
+            length = f"{row['path_length']}"
+            energy = f"{row['total_energy']:.2f}"
+        else:
+            length, energy = 'không có', '-'
+        expanded = row['nodes_expanded'] if row['nodes_expanded'] is not None else '-'
+        lines.append(f"{row['algorithm']:<24} {directions:>5} {length:>8} {energy:>11} {expanded:>9} "
+                     f"{row['time_ms']:>15.3f}")
+    return "\n".join(lines)
+
+
+class PathCache:
     """
-    Lớp chứa các thuật toán tìm đường: BFS, DFS, Dijkstra, A*
+    Lớp PathCache: Cache LRU (giới hạn số mục) cho kết quả tìm đường trên một Grid
+    
+    Khóa là (grid.revision, Start, End, thuật toán, allow_diagonal, energy_mode, options),
+    nên chạy lại cùng một truy vấn (bấm Find Path lần nữa, đổi thuật toán qua lại)
+    trả về ngay kết quả đã có.
+    
+    Mỗi mục lưu thêm vùng đã khám phá (các cell được sinh ra trong SearchState) của
+    BFS/DFS/Dijkstra/A*. Khi set_cell_type() đổi weight một cell, chỉ các mục có vùng
+    khám phá chứa cell đó hoặc một ô lân cận của nó bị bỏ; các mục còn lại được chuyển
+    sang revision mới. Thuật toán khác (JPS nhảy qua các ô không được đánh dấu, các
+    planner tăng dần...) không có vùng chính xác nên bị bỏ ở mọi lần sửa lưới. Đổi
+    weight nhỏ nhất trên lưới (hệ số scale của heuristic) cũng bỏ toàn bộ.
+    
+    Với store (ResultStore trong result_store.py), kết quả không có trong bộ nhớ được
+    tìm tiếp trên đĩa theo Grid.fingerprint, và kết quả mới được ghi xuống đĩa.
+    
+    Thuộc tính:
+        - maxsize: Số mục tối đa, mục dùng lâu nhất bị loại khi đầy
+        - store: Cache trên đĩa (None nếu không dùng)
+        - hits, misses, evictions, invalidations: Bộ đếm (xem counters())
     """
     
-    def __init__(self, grid, allow_diagonal=False):
+    # Các thuật toán chỉ đọc những cell được đánh dấu seen (và lân cận của chúng)
+    EXPLORED_ALGORITHMS = ('bfs', 'dfs', 'dijkstra', 'astar')
+    
+    def __init__(self, grid, maxsize=128, store=None):
         """
-        Khởi tạo với Grid
-        
         Args:
             grid: Grid object
-            allow_diagonal: True nếu cho phép đi chéo (8 hướng), False nếu chỉ 4 hướng
+            maxsize: Số kết quả tối đa được giữ
+            store: ResultStore để đọc/ghi kết quả trên đĩa (tùy chọn)
         """
+        if maxsize < 1:
+            raise ValueError("PathCache maxsize must be at least 1")
         self.grid = grid
-        self.allow_diagonal = allow_diagonal
+        self.maxsize = maxsize
+        self.store = store
+        self._entries = collections.OrderedDict()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.invalidations = 0
+        grid.add_change_listener(self._on_cell_changed)
     
-    def manhattan_distance(self, row1, col1, row2, col2):
+    def close(self):
+        """Hủy đăng ký khỏi Grid (cache không còn được cập nhật khi lưới đổi)"""
+        self.grid.remove_change_listener(self._on_cell_changed)
+    
+    def __len__(self):
+        return len(self._entries)
+    
+    @staticmethod
+    def query(pathfinder, algorithm, energy_mode=True, options=None):
         """
-        Tính khoảng cách Manhattan
-        
-        Công thức: |row1 - row2| + |col1 - col2|
-        Phù hợp với di chuyển 4 hướng (không chéo)
+        Mô tả truy vấn hiện tại của pathfinder (Start/End của Grid) - khóa cache không
+        kèm revision, dùng chung với ResultStore. Tham số budget không thuộc khóa: kết
+        quả tìm xong trong ngân sách là kết quả đầy đủ.
         """
-        return abs(row1 - row2) + abs(col1 - col2)
+        start, goal = pathfinder._endpoints()
+        heuristic = pathfinder.heuristic
+        if callable(heuristic):
+            heuristic = getattr(heuristic, '__name__', 'custom')
+        return (start, goal, algorithm, pathfinder.allow_diagonal, energy_mode, pathfinder.open_list_name,
+                heuristic, pathfinder.instrument,
+                tuple(sorted(item for item in (options or {}).items() if item[0] != 'budget')))
     
-    def euclidean_distance(self, row1, col1, row2, col2):
+    def key(self, pathfinder, algorithm, energy_mode=True, options=None):
+        """Khóa cache: (grid.revision,) + query()"""
+        return (self.grid.revision,) + self.query(pathfinder, algorithm, energy_mode, options)
+    
+    def solve(self, pathfinder, algorithm, callback=None, energy_mode=True, **options):
         """
-        Tính khoảng cách Euclidean
+        Trả kết quả đã cache, hoặc chạy getattr(pathfinder, algorithm)(callback, **options)
+        rồi lưu lại
         
-        Công thức: √((row1 - row2)² + (col1 - col2)²)
-        Phù hợp với di chuyển 8 hướng (có chéo)
+        Args:
+            pathfinder: PathfindingAlgorithms trên cùng Grid
+            algorithm: Tên phương thức ('bfs', 'astar', 'jps', ...)
+            callback: Chỉ được gọi khi phải tìm thật (cache miss)
+            energy_mode: Chế độ năng lượng của giao diện (một phần của khóa)
+            **options: Tham số thêm của thuật toán (open_list, cluster_size...)
+        
+        Returns:
+            Tuple (path, stats); stats của kết quả lấy từ cache có 'cached': True
         """
-        import math
-        return math.sqrt((row1 - row2) ** 2 + (col1 - col2) ** 2)
+        if pathfinder.grid is not self.grid:
+            raise ValueError("PathCache and pathfinder must share the same Grid")
+        key = self.key(pathfinder, algorithm, energy_mode, options)
+        cached = self.lookup(key)
+        if cached is not None:
+            return cached
+        
+        path, stats = getattr(pathfinder, algorithm)(callback, **options)
+        explored = None
+        if algorithm in self.EXPLORED_ALGORITHMS and stats:
+            state = self.grid.search_state
+            explored = state.seen == state.generation
+        self.put(key, path, stats, explored)
+        return (list(path) if path is not None else None), dict(stats)
     
-    def bfs(self, callback=None):
+    def lookup(self, key):
         """
-        Breadth-First Search: Tìm đường ngắn nhất về số bước, bỏ qua weights
-        
-        Args:
-            callback: Hàm callback được gọi mỗi khi xét một node (để animation)
-                      callback(node, state) với state = 'open' hoặc 'closed'
+        Kết quả đã lưu cho key: trong bộ nhớ, rồi tới store (tính là một lần miss nếu
+        không có trong bộ nhớ)
         
         Returns:
-            Tuple (path, stats) với path là list các (row, col) và stats là dict
+            Tuple (path, stats) với stats['cached'] = True, hoặc None
+        """
+        entry = self._entries.get(key)
+        if entry is not None:
+            self._entries.move_to_end(key)
+            self.hits += 1
+        else:
+            self.misses += 1
+            stored = self.store.load_result(self.grid, key[1:]) if self.store is not None else None
+            if stored is None:
+                return None
+            # Kết quả từ đĩa không có vùng khám phá: bị bỏ ở lần sửa lưới kế tiếp
+            entry = self._insert(key, stored[0], stored[1], None)
+        path, stats = entry[0], entry[1]
+        return (list(path) if path is not None else None), dict(stats, cached=True)
+    
+    def put(self, key, path, stats, explored=None):
         """
-        import collections
-        import time
+        Lưu kết quả vừa tìm (cả vào store nếu có)
         
-        start_time = time.time()
-        self.grid.reset_pathfinding_data()
+        Kết quả của revision cũ (lưới đã bị sửa trong lúc tìm, ví dụ khi tìm ở process
+        khác) và kết quả dừng do hết ngân sách (stats['budget_exhausted']) bị bỏ qua.
         
-        if not self.grid.start or not self.grid.end:
-            return None, {}
+        Args:
+            key: Khóa từ key() lúc bắt đầu tìm
+            path, stats: Kết quả của thuật toán
+            explored: Mảng bool (rows * cols) hoặc các chỉ số cell đã được sinh ra trong
+                      lần tìm; None = bỏ kết quả ở mọi lần sửa lưới
+        """
+        if key[0] != self.grid.revision or stats.get('budget_exhausted'):
+            return
+        region = None
+        if explored is not None:
+            explored = np.asarray(explored)
+            if explored.dtype != np.bool_:
+                mask = np.zeros(self.grid.size, dtype=bool)
+                mask[explored] = True
+                explored = mask
+            region = self._make_region(explored)
+        self._insert(key, path, stats, region)
+        if self.store is not None:
+            self.store.save_result(self.grid, key[1:], path, stats)
+    
+    def _insert(self, key, path, stats, region):
+        """Thêm một mục, loại mục dùng lâu nhất nếu đầy"""
+        entry = (path, stats, region, self.grid.min_traversable_weight())
+        self._entries[key] = entry
+        if len(self._entries) > self.maxsize:
+            self._entries.popitem(last=False)
+            self.evictions += 1
+        return entry
+    
+    def _make_region(self, seen):
+        """
+        Vùng khám phá từ mảng bool seen: mảng int32 chỉ số (đã sắp xếp) nếu nhỏ,
+        nếu không thì bitmap uint8 (np.packbits) - tối đa size / 8 byte
+        """
+        if np.count_nonzero(seen) * 32 < self.grid.size:
+            return np.flatnonzero(seen).astype(np.int32)
+        return np.packbits(seen)
+    
+    @staticmethod
+    def _region_contains(region, indices):
+        """True nếu vùng khám phá chứa ít nhất một chỉ số trong indices (mảng int64)"""
+        if region.dtype == np.uint8:
+            return bool((region[indices >> 3] >> (7 - (indices & 7)) & 1).any())
+        if len(region) == 0:
+            return False
+        positions = np.minimum(np.searchsorted(region, indices), len(region) - 1)
+        return bool((region[positions] == indices).any())
+    
+    def _on_cell_changed(self, index, old_weight, new_weight):
+        """Change listener: bỏ các mục bị ảnh hưởng, chuyển các mục còn lại sang revision mới"""
+        revision = self.grid.revision
+        if old_weight == new_weight:
+            affected = None  # Weight không đổi (ví dụ Start/End/NORMAL): không thuật toán nào thấy khác biệt
+        else:
+            rows, cols = self.grid.rows, self.grid.cols
+            row, col = divmod(index, cols)
+            affected = np.array([r * cols + c
+                                 for r in range(max(0, row - 1), min(rows, row + 2))
+                                 for c in range(max(0, col - 1), min(cols, col + 2))], dtype=np.int64)
+            weight_floor = self.grid.min_traversable_weight()
+        
+        entries = collections.OrderedDict()
+        for key, entry in self._entries.items():
+            if affected is not None:
+                region = entry[2]
+                if region is None or entry[3] != weight_floor or self._region_contains(region, affected):
+                    self.invalidations += 1
+                    continue
+            entries[(revision,) + key[1:]] = entry
+        self._entries = entries
+    
+    def clear(self):
+        """Bỏ mọi kết quả (bộ đếm giữ nguyên)"""
+        self._entries.clear()
+    
+    def counters(self):
+        """
+        Bộ đếm của cache
         
-        start_node = self.grid.get_node(self.grid.start[0], self.grid.start[1])
-        end_node = self.grid.get_node(self.grid.end[0], self.grid.end[1])
+        Returns:
+            Dict hits, misses, evictions, invalidations, size, maxsize, hit_rate
+        """
+        lookups = self.hits + self.misses
+        return {
+            'hits': self.hits,
+            'misses': self.misses,
+            'evictions': self.evictions,
+            'invalidations': self.invalidations,
+            'size': len(self._entries),
+            'maxsize': self.maxsize,
+            'hit_rate': self.hits / lookups if lookups else 0.0,
+        }
+
+
+class DStarLite:
+    """
+    Lớp DStarLite: Lập kế hoạch tăng dần (D* Lite, Koenig & Likhachev 2002)
+    
+    Tìm ngược từ End: g[s] và rhs[s] là ước lượng chi phí từ s đến End (rhs là giá
+    trị "nhìn trước" một bước: min qua các lân cận s' của c(s, s') + g[s']). Cell có
+    g != rhs là "không nhất quán" và nằm trong hàng đợi ưu tiên với khóa
+    (min(g, rhs) + h(Start, s) + km, min(g, rhs)).
+    
+    Trạng thái được giữ giữa các lần plan(). Planner đăng ký change listener với
+    Grid, nên khi set_cell_type() đổi một cell thì lần plan() sau chỉ tính lại rhs
+    của cell đó và các lân cận rồi lan truyền thay đổi, thay vì tìm lại từ đầu.
+    Start được phép di chuyển (robot đang đi giữa đường): km tăng thêm
+    h(Start cũ, Start mới) để các khóa cũ trong hàng đợi vẫn dùng được.
+    
+    Chi phí cạnh u → v = move_cost * weight[v] như các thuật toán khác. Khi End đổi
+    chỗ, hoặc xuất hiện loại cell có weight nhỏ hơn hệ số scale của heuristic (h mất
+    admissible), planner tự khởi tạo lại từ đầu.
+    
+    Thuộc tính:
+        - g, rhs: Mảng float64 (rows * cols)
+        - km: Độ lệch khóa tích lũy khi Start di chuyển
+        - replans: Số lần plan() đã chạy kể từ lần khởi tạo gần nhất
+        - nodes_expanded: Số cell được mở rộng trong lần plan() gần nhất
+        - cells_updated: Số cell bị sửa trên lưới được xử lý trong lần plan() gần nhất
+        - reinitialized: True nếu lần plan() gần nhất phải tìm lại từ đầu
+    """
+    
+    # Sai số tương đối khi so khóa với khóa của Start: các khóa bằng nhau về mặt toán học
+    # có thể lệch vài ulp do thứ tự cộng, vẫn phải được mở rộng
+    KEY_TOLERANCE = 1e-9
+    
+    def __init__(self, grid, allow_diagonal=False, heuristic='auto'):
+        """
+        Args:
+            grid: Grid object
+            allow_diagonal: True nếu cho phép đi chéo (8 hướng), False nếu chỉ 4 hướng
+            heuristic: Như PathfindingAlgorithms (xem select_heuristic)
+        """
+        self.grid = grid
+        self.allow_diagonal = allow_diagonal
+        self.heuristic = heuristic
+        self.g = np.full(grid.size, np.inf, dtype=np.float64)
+        self.rhs = np.full(grid.size, np.inf, dtype=np.float64)
+        self.g_view = memoryview(self.g)
+        self.rhs_view = memoryview(self.rhs)
+        self.km = 0.0
+        self.replans = 0
+        self.nodes_expanded = 0
+        self.cells_updated = 0
+        self.reinitialized = False
         
-        queue = collections.deque([start_node])
-        visited = set()
-        visited.add((start_node.row, start_node.col))
+        # Hàng đợi: heap các (k1, k2, index) xóa lười; _queue_keys giữ khóa hiện tại
+        self._heap = []
+        self._queue_keys = {}
+        self._goal = None
+        self._last_start = None
+        self._h_scale = None
+        self._changed = set()
+        grid.add_change_listener(self._on_cell_changed)
+    
+    def close(self):
+        """Hủy đăng ký khỏi Grid (planner không còn được cập nhật khi lưới đổi)"""
+        self.grid.remove_change_listener(self._on_cell_changed)
+    
+    def _on_cell_changed(self, index, old_weight, new_weight):
+        """Change listener: chỉ ghi nhận cell bị đổi, xử lý ở lần plan() sau"""
+        if old_weight != new_weight:
+            self._changed.add(index)
+    
+    def _initialize(self, start, goal):
+        """Xóa toàn bộ trạng thái và đưa End vào hàng đợi"""
+        self.heuristic_name, self._h, self._h_scale = select_heuristic(
+            self.heuristic, self.allow_diagonal, self.grid)
+        self.g.fill(np.inf)
+        self.rhs.fill(np.inf)
+        self.km = 0.0
+        self.replans = 0
+        self._heap = []
+        self._queue_keys = {}
+        self._changed.clear()
+        self._goal = goal
+        self._last_start = start
+        self.rhs_view[goal] = 0.0
+        self._push(goal, self._key(goal, start))
+    
+    def _heuristic(self, a, b):
+        """h giữa 2 cell (chỉ số phẳng), đã nhân hệ số scale"""
+        cols = self.grid.cols
+        row1, col1 = divmod(a, cols)
+        row2, col2 = divmod(b, cols)
+        return self._h_scale * self._h(row1, col1, row2, col2)
+    
+    def _key(self, index, start):
+        """Khóa ưu tiên (k1, k2) của cell"""
+        m = min(self.g_view[index], self.rhs_view[index])
+        return (m + self._heuristic(start, index) + self.km, m)
+    
+    def _push(self, index, key):
+        """Thêm hoặc cập nhật khóa của cell trong hàng đợi"""
+        self._queue_keys[index] = key
+        heapq.heappush(self._heap, (key[0], key[1], index))
+    
+    def _lookahead(self, index, masks, patterns, weights):
+        """rhs mới của cell: min qua các lân cận v của move_cost * weight[v] + g[v]"""
+        if self.grid.cell_types[index] == CELL_WALL:
+            return float('inf')
+        g = self.g_view
+        best = float('inf')
+        for delta, move_cost in patterns[masks[index]]:
+            neighbor = index + delta
+            cost = move_cost * weights[neighbor] + g[neighbor]
+            if cost < best:
+                best = cost
+        return best
+    
+    def _update_vertex(self, index, start, callback):
+        """Đưa cell vào/ra hàng đợi theo việc g có khác rhs hay không"""
+        if self.g_view[index] != self.rhs_view[index]:
+            self._push(index, self._key(index, start))
+            if callback:
+                callback(self.grid.get_node(*divmod(index, self.grid.cols)), 'open')
+        else:
+            self._queue_keys.pop(index, None)
+    
+    def _compute_shortest_path(self, start, callback, budget=None):
+        """
+        Xử lý hàng đợi đến khi Start nhất quán và mọi khóa còn lại lớn hơn hẳn khóa của
+        Start (khóa bằng nhau, sai khác trong KEY_TOLERANCE, vẫn được mở rộng), hoặc đến
+        khi hết budget; các cell chưa xử lý vẫn nằm trong hàng đợi
         
-        if callback:
-            callback(start_node, 'open')
+        Returns:
+            Số cell được mở rộng
+        """
+        grid = self.grid
+        cols = grid.cols
+        goal = self._goal
+        weights = memoryview(grid.weights)
+        table = grid.get_neighbor_table(self.allow_diagonal)
+        masks = table.masks_view
+        patterns = table.patterns
+        g = self.g_view
+        rhs = self.rhs_view
+        heap = self._heap
+        queue_keys = self._queue_keys
+        heappop = heapq.heappop
+        tolerance = self.KEY_TOLERANCE
+        expanded = 0
         
-        while queue:
-            current = queue.popleft()
+        while heap:
+            k1, k2, current = heap[0]
+            if queue_keys.get(current) != (k1, k2):
+                heappop(heap)  # Mục cũ (khóa đã đổi hoặc cell đã ra khỏi hàng đợi)
+                continue
             
-            if callback:
-                callback(current, 'closed')
+            start_k1 = min(g[start], rhs[start]) + self.km
+            if k1 > start_k1 + tolerance * max(1.0, start_k1) and rhs[start] == g[start]:
+                break
+            if budget is not None and budget.spend():
+                break
             
-            if current == end_node:
-                # Truy vết đường đi
-                path = []
-                node = current
-                while node:
-                    path.append((node.row, node.col))
-                    node = node.parent
-                path.reverse()
-                
-                elapsed_time = (time.time() - start_time) * 1000
-                total_steps = len(path) - 1
-                total_energy = sum(self.grid.get_node(r, c).weight for r, c in path)
-                
-                stats = {
-                    'algorithm': 'BFS',
-                    'path_length': total_steps,
-                    'total_energy': total_energy,
-                    'time_taken': elapsed_time
-                }
-                return path, stats
+            heappop(heap)
+            del queue_keys[current]
+            new_key = self._key(current, start)
+            if (k1, k2) < new_key:
+                # Khóa đã cũ do Start di chuyển (km tăng) → đưa lại với khóa mới
+                self._push(current, new_key)
+                continue
             
-            for neighbor, move_cost in self.grid.get_neighbors(current, allow_diagonal=self.allow_diagonal):
-                pos = (neighbor.row, neighbor.col)
-                if pos not in visited:
-                    visited.add(pos)
-                    neighbor.parent = current
-                    queue.append(neighbor)
-                    if callback:
-                        callback(neighbor, 'open')
+            expanded += 1
+            if callback:
+                callback(grid.get_node(*divmod(current, cols)), 'closed')
+            
+            if g[current] > rhs[current]:
+                # Quá nhất quán: chốt g và hạ rhs của các cell đi vào current
+                g[current] = rhs[current]
+                edge_weight = weights[current]
+                for delta, move_cost in patterns[masks[current]]:
+                    neighbor = current + delta
+                    if neighbor != goal:
+                        cost = move_cost * edge_weight + g[current]
+                        if cost < rhs[neighbor]:
+                            rhs[neighbor] = cost
+                            self._update_vertex(neighbor, start, callback)
+            else:
+                # Thiếu nhất quán: đặt g = inf và tính lại các cell từng dựa vào current
+                old_g = g[current]
+                g[current] = float('inf')
+                edge_weight = weights[current]
+                for delta, move_cost in patterns[masks[current]]:
+                    neighbor = current + delta
+                    if neighbor != goal and rhs[neighbor] == move_cost * edge_weight + old_g:
+                        rhs[neighbor] = self._lookahead(neighbor, masks, patterns, weights)
+                        self._update_vertex(neighbor, start, callback)
+                if current != goal:
+                    rhs[current] = self._lookahead(current, masks, patterns, weights)
+                self._update_vertex(current, start, callback)
         
-        elapsed_time = (time.time() - start_time) * 1000
-        return None, {'algorithm': 'BFS', 'time_taken': elapsed_time, 'path_found': False}
+        return expanded
     
-    def dfs(self, callback=None):
+    def plan(self, start=None, callback=None, goal=None, budget=None):
         """
-        Depth-First Search: Không đảm bảo đường ngắn nhất, bỏ qua weights
+        Tìm (hoặc sửa lại) đường đi tối ưu từ start đến goal
         
         Args:
-            callback: Hàm callback được gọi mỗi khi xét một node
+            start: (row, col) vị trí hiện tại của robot; None = Start của Grid
+            callback: Hàm callback(node, state) như các thuật toán khác
+            goal: (row, col) đích; None = End của Grid (đổi đích thì phải tìm lại từ đầu)
+            budget: SearchBudget giới hạn lần plan() này
         
         Returns:
-            Tuple (path, stats)
+            List các (row, col) từ start đến goal, hoặc None nếu không có đường đi
+            (hoặc hết ngân sách - xem budget.exhausted_by)
         """
-        import time
-        
-        start_time = time.time()
-        self.grid.reset_pathfinding_data()
-        
-        if not self.grid.start or not self.grid.end:
-            return None, {}
-        
-        start_node = self.grid.get_node(self.grid.start[0], self.grid.start[1])
-        end_node = self.grid.get_node(self.grid.end[0], self.grid.end[1])
-        
-        stack = [start_node]
-        visited = set()
-        visited.add((start_node.row, start_node.col))
-        
-        if callback:
-            callback(start_node, 'open')
+        grid = self.grid
+        if start is None:
+            start = grid.start
+        if goal is None:
+            goal = grid.end
+        start = grid.index(start[0], start[1])
+        goal = grid.index(goal[0], goal[1])
         
-        while stack:
-            current = stack.pop()
-            
-            if callback:
-                callback(current, 'closed')
-            
-            if current == end_node:
-                # Truy vết đường đi
-                path = []
-                node = current
-                while node:
-                    path.append((node.row, node.col))
-                    node = node.parent
-                path.reverse()
-                
-                elapsed_time = (time.time() - start_time) * 1000
-                total_steps = len(path) - 1
-                total_energy = sum(self.grid.get_node(r, c).weight for r, c in path)
-                
-                stats = {
-                    'algorithm': 'DFS',
-                    'path_length': total_steps,
-                    'total_energy': total_energy,
-                    'time_taken': elapsed_time
-                }
-                return path, stats
+        self.reinitialized = (goal != self._goal or self._h_scale is None
+                              or (not callable(self.heuristic)
+                                  and grid.min_traversable_weight() < self._h_scale))
+        if self.reinitialized:
+            self.cells_updated = len(self._changed)
+            self._initialize(start, goal)
+        else:
+            if start != self._last_start:
+                self.km += self._heuristic(self._last_start, start)
+                self._last_start = start
             
-            for neighbor, move_cost in self.grid.get_neighbors(current, allow_diagonal=self.allow_diagonal):
-                pos = (neighbor.row, neighbor.col)
-                if pos not in visited:
-                    visited.add(pos)
-                    neighbor.parent = current
-                    stack.append(neighbor)
-                    if callback:
-                        callback(neighbor, 'open')
+            # Tính lại rhs của các cell bị sửa và lân cận của chúng (cạnh đi vào/ra đã đổi)
+            weights = memoryview(grid.weights)
+            table = grid.get_neighbor_table(self.allow_diagonal)
+            masks = table.masks_view
+            patterns = table.patterns
+            affected = set()
+            for index in self._changed:
+                affected.add(index)
+                for delta, _ in patterns[masks[index]]:
+                    affected.add(index + delta)
+            rhs = self.rhs_view
+            for index in affected:
+                if index != goal:
+                    rhs[index] = self._lookahead(index, masks, patterns, weights)
+                    self._update_vertex(index, start, callback)
+            self.cells_updated = len(self._changed)
+            self._changed.clear()
         
-        elapsed_time = (time.time() - start_time) * 1000
-        return None, {'algorithm': 'DFS', 'time_taken': elapsed_time, 'path_found': False}
+        self.replans += 1
+        if budget is not None:
+            budget.begin()
+        self.nodes_expanded = self._compute_shortest_path(start, callback, budget)
+        if budget is not None and budget.exhausted_by is not None:
+            return None
+        path = self.extract_path(start)
+        if path is None and self.rhs_view[start] != float('inf'):
+            # Không lần được đường theo g dù Start tới được End: tìm lại từ đầu
+            self.reinitialized = True
+            self._initialize(start, goal)
+            self.nodes_expanded += self._compute_shortest_path(start, callback, budget)
+            if budget is not None and budget.exhausted_by is not None:
+                return None
+            path = self.extract_path(start)
+        return path
     
-    def dijkstra(self, callback=None):
+    def extract_path(self, start):
         """
-        Dijkstra: Tìm đường với chi phí thấp nhất (tôn trọng weights)
+        Đi theo lân cận có move_cost * weight + g nhỏ nhất từ start đến End
         
-        Args:
-            callback: Hàm callback được gọi mỗi khi xét một node
+        Chỉ bước sang các cell nhất quán (g == rhs): cell còn trong hàng đợi có g chưa
+        đúng và có thể kéo đường đi vào ngõ cụt hoặc vòng lặp.
         
         Returns:
-            Tuple (path, stats)
+            List các (row, col), hoặc None nếu start không đến được End (hoặc không
+            lần được đường qua các cell nhất quán)
+        """
+        grid = self.grid
+        cols = grid.cols
+        goal = self._goal
+        if self.rhs_view[start] == float('inf'):
+            return None
+        
+        weights = memoryview(grid.weights)
+        g = self.g_view
+        rhs = self.rhs_view
+        table = grid.get_neighbor_table(self.allow_diagonal)
+        masks = table.masks_view
+        patterns = table.patterns
+        path = [divmod(start, cols)]
+        current = start
+        while current != goal:
+            best = -1
+            best_cost = float('inf')
+            for delta, move_cost in patterns[masks[current]]:
+                neighbor = current + delta
+                if g[neighbor] != rhs[neighbor]:
+                    continue
+                cost = move_cost * weights[neighbor] + g[neighbor]
+                if cost < best_cost:
+                    best = neighbor
+                    best_cost = cost
+            if best < 0 or len(path) > grid.size:
+                return None
+            current = best
+            path.append(divmod(current, cols))
+        return path
+    
+    def path_cost(self, start=None):
+        """Chi phí tối ưu từ start (mặc định Start của Grid) đến End theo lần plan() gần nhất"""
+        if start is None:
+            start = self.grid.start
+        return self.rhs_view[self.grid.index(start[0], start[1])]
+
+
+class HPAStar:
+    """
+    Lớp HPAStar: Tìm đường phân cấp (HPA*, Botea, Müller & Schaeffer 2004)
+    
+    Lưới được chia thành các cụm (cluster) cluster_size x cluster_size. Trên mỗi
+    cạnh chung giữa 2 cụm, mỗi đoạn liên tục các cặp ô đi được (entrance) sinh ra 1
+    cặp ô chuyển tiếp (transition) ở giữa, hoặc 2 cặp ở hai đầu nếu đoạn dài từ
+    ENTRANCE_SPLIT ô. Ở chế độ 8 hướng còn thêm các cặp chỉ đi chéo được (hai ô
+    thẳng bên cạnh đều là vật cản), kể cả qua góc chung của 4 cụm.
+    
+    Đồ thị trừu tượng gồm các ô chuyển tiếp với:
+        - Cạnh ngoài: giữa 2 ô của một cặp (1 bước, chi phí = move_cost * weight ô đến)
+        - Cạnh trong: giữa các ô chuyển tiếp cùng cụm, chi phí là đường ngắn nhất
+          bên trong cụm (Dijkstra giới hạn trong cụm)
+    
+    Truy vấn: nối Start/End vào các ô chuyển tiếp trong cụm của chúng, chạy A* trên
+    đồ thị trừu tượng (nhỏ) rồi chỉ tìm lại chi tiết từng đoạn của đường trừu tượng
+    trong cụm tương ứng. Đường tìm được hợp lệ nhưng chỉ gần tối ưu (thường vài %).
+    
+    Cạnh trong của một cụm được tính khi cần (lần đầu A* trừu tượng chạm tới cụm) hoặc
+    tất cả một lần bằng build(). Planner đăng ký change listener với Grid: sửa một cell
+    chỉ dựng lại các cặp chuyển tiếp trên cạnh cụm chứa cell đó và đánh dấu các cụm
+    liên quan cần tính lại cạnh trong.
+    
+    Thuộc tính:
+        - cluster_size: Cạnh của một cụm (số ô)
+        - cluster_rows, cluster_cols: Số cụm theo mỗi chiều
+        - nodes_expanded: Số nút trừu tượng được mở rộng trong lần truy vấn gần nhất
+        - clusters_rebuilt: Số cụm phải tính lại cạnh trong trong lần truy vấn gần nhất
+    """
+    
+    # Entrance dài từ ngần này ô thì đặt 2 cặp chuyển tiếp ở hai đầu thay vì 1 ở giữa
+    ENTRANCE_SPLIT = 6
+    
+    def __init__(self, grid, allow_diagonal=False, cluster_size=16, heuristic='auto'):
+        """
+        Args:
+            grid: Grid object
+            allow_diagonal: True nếu cho phép đi chéo (8 hướng), False nếu chỉ 4 hướng
+            cluster_size: Cạnh của một cụm (>= 2)
+            heuristic: Heuristic cho A* trừu tượng (xem select_heuristic)
         """
-        import heapq
-        import time
+        if cluster_size < 2:
+            raise ValueError(f"cluster_size must be at least 2, got {cluster_size}")
+        self.grid = grid
+        self.allow_diagonal = allow_diagonal
+        self.cluster_size = cluster_size
+        self.heuristic = heuristic
+        self.cluster_rows = -(-grid.rows // cluster_size)
+        self.cluster_cols = -(-grid.cols // cluster_size)
+        self.nodes_expanded = 0
+        self.clusters_rebuilt = 0
         
-        start_time = time.time()
-        self.grid.reset_pathfinding_data()
+        # Chỉ số cụm của từng cell (kiểm tra "còn trong cụm" khi tìm cục bộ)
+        rows = np.arange(grid.rows, dtype=np.int32) // cluster_size
+        cols = np.arange(grid.cols, dtype=np.int32) // cluster_size
+        self.cluster_of = (rows[:, None] * self.cluster_cols + cols[None, :]).reshape(-1)
+        self.cluster_of_view = memoryview(self.cluster_of)
         
-        if not self.grid.start or not self.grid.end:
-            return None, {}
+        # border id → list các cặp (ô a, ô b, move_cost) trên cạnh/góc chung đó
+        self._borders = {}
+        # ô chuyển tiếp → list (ô bên kia, move_cost); cụm → tập ô chuyển tiếp
+        self._crossings = {}
+        self._transitions = [set() for _ in range(self.cluster_rows * self.cluster_cols)]
+        # cụm → {ô chuyển tiếp: list (ô chuyển tiếp khác, chi phí)}; None = cần tính lại
+        self._intra = [None] * (self.cluster_rows * self.cluster_cols)
+        self._changed = set()
+        
+        for border in self._all_borders():
+            self._rebuild_border(border)
+        grid.add_change_listener(self._on_cell_changed)
+    
+    def close(self):
+        """Hủy đăng ký khỏi Grid"""
+        self.grid.remove_change_listener(self._on_cell_changed)
+    
+    def _on_cell_changed(self, index, old_weight, new_weight):
+        """Change listener: ghi nhận cell bị đổi, xử lý ở lần truy vấn sau"""
+        self._changed.add(index)
+    
+    def _all_borders(self):
+        """Liệt kê id các cạnh chung ('h', 'v') và góc chung ('d', chỉ 8 hướng) giữa các cụm"""
+        for i in range(self.cluster_rows):
+            for j in range(self.cluster_cols):
+                if j + 1 < self.cluster_cols:
+                    yield ('h', i, j)
+                if i + 1 < self.cluster_rows:
+                    yield ('v', i, j)
+                if self.allow_diagonal and i + 1 < self.cluster_rows and j + 1 < self.cluster_cols:
+                    yield ('d', i, j)
+    
+    def _borders_of_cell(self, row, col):
+        """Các cạnh/góc chung mà cell (row, col) nằm trên"""
+        size = self.cluster_size
+        i, j = row // size, col // size
+        borders = []
+        if col % size == size - 1 and j + 1 < self.cluster_cols:
+            borders.append(('h', i, j))
+        if col % size == 0 and j > 0:
+            borders.append(('h', i, j - 1))
+        if row % size == size - 1 and i + 1 < self.cluster_rows:
+            borders.append(('v', i, j))
+        if row % size == 0 and i > 0:
+            borders.append(('v', i - 1, j))
+        if self.allow_diagonal and row % size in (0, size - 1) and col % size in (0, size - 1):
+            corner_i = i if row % size == size - 1 else i - 1
+            corner_j = j if col % size == size - 1 else j - 1
+            if 0 <= corner_i < self.cluster_rows - 1 and 0 <= corner_j < self.cluster_cols - 1:
+                borders.append(('d', corner_i, corner_j))
+        return borders
+    
+    def _border_pairs(self, border):
+        """Tính các cặp chuyển tiếp (ô a, ô b, move_cost) của một cạnh/góc chung"""
+        kind, i, j = border
+        grid = self.grid
+        size = self.cluster_size
+        cols = grid.cols
+        cell_types = memoryview(grid.cell_types)
         
-        start_node = self.grid.get_node(self.grid.start[0], self.grid.start[1])
-        end_node = self.grid.get_node(self.grid.end[0], self.grid.end[1])
+        def passable(row, col):
+            return cell_types[row * cols + col] != CELL_WALL
         
-        start_node.g_score = 0
-        open_set = [(0, start_node.row, start_node.col)]
-        visited = set()
+        if kind == 'd':
+            # Góc chung của 4 cụm: chỉ cần cặp chéo khi hai ô còn lại đều là vật cản
+            row, col = (i + 1) * size - 1, (j + 1) * size - 1
+            pairs = []
+            if (passable(row, col) and passable(row + 1, col + 1)
+                    and not passable(row, col + 1) and not passable(row + 1, col)):
+                pairs.append((row * cols + col, (row + 1) * cols + col + 1, DIAGONAL_COST))
+            if (passable(row, col + 1) and passable(row + 1, col)
+                    and not passable(row, col) and not passable(row + 1, col + 1)):
+                pairs.append((row * cols + col + 1, (row + 1) * cols + col, DIAGONAL_COST))
+            return pairs
         
-        if callback:
-            callback(start_node, 'open')
+        # Đưa cạnh về dạng (ô phía a, ô phía b) theo vị trí k dọc cạnh
+        if kind == 'h':
+            col_a = (j + 1) * size - 1
+            first, last = i * size, min((i + 1) * size, grid.rows)
+            cell_a = lambda k: k * cols + col_a
+            cell_b = lambda k: k * cols + col_a + 1
+        else:
+            row_a = (i + 1) * size - 1
+            first, last = j * size, min((j + 1) * size, cols)
+            cell_a = lambda k: row_a * cols + k
+            cell_b = lambda k: (row_a + 1) * cols + k
         
-        while open_set:
-            current_g, row, col = heapq.heappop(open_set)
-            current = self.grid.get_node(row, col)
-            
-            if (row, col) in visited:
+        open_a = [cell_types[cell_a(k)] != CELL_WALL for k in range(first, last)]
+        open_b = [cell_types[cell_b(k)] != CELL_WALL for k in range(first, last)]
+        length = last - first
+        pairs = []
+        k = 0
+        while k < length:
+            if not (open_a[k] and open_b[k]):
+                k += 1
                 continue
-            
-            visited.add((row, col))
-            
-            if callback:
-                callback(current, 'closed')
-            
-            if current == end_node:
-                # Truy vết đường đi
-                path = []
-                node = current
-                while node:
-                    path.append((node.row, node.col))
-                    node = node.parent
-                path.reverse()
-                
-                elapsed_time = (time.time() - start_time) * 1000
-                total_steps = len(path) - 1
-                total_energy = sum(self.grid.get_node(r, c).weight for r, c in path)
-                
-                stats = {
-                    'algorithm': 'Dijkstra',
-                    'path_length': total_steps,
-                    'total_energy': total_energy,
-                    'time_taken': elapsed_time
-                }
-                return path, stats
-            
-            for neighbor, move_cost in self.grid.get_neighbors(current, allow_diagonal=self.allow_diagonal):
-                pos = (neighbor.row, neighbor.col)
-                if pos in visited:
-                    continue
-                
-                # Tính chi phí từ current đến neighbor
-                # Chi phí = move_cost (1.0 hoặc √2) * weight của neighbor
-                tentative_g = current.g_score + move_cost * neighbor.weight
-                
-                if neighbor.g_score == 0 or tentative_g < neighbor.g_score:
-                    neighbor.g_score = tentative_g
-                    neighbor.parent = current
-                    heapq.heappush(open_set, (tentative_g, neighbor.row, neighbor.col))
-                    if callback:
-                        callback(neighbor, 'open')
+            run_start = k
+            while k < length and open_a[k] and open_b[k]:
+                k += 1
+            run_end = k - 1
+            if run_end - run_start + 1 >= self.ENTRANCE_SPLIT:
+                positions = (run_start, run_end)
+            else:
+                positions = ((run_start + run_end) // 2,)
+            for p in positions:
+                pairs.append((cell_a(first + p), cell_b(first + p), 1.0))
+        
+        if self.allow_diagonal:
+            # Cặp chỉ đi chéo được qua cạnh (không nằm trong entrance thẳng nào)
+            for k in range(length - 1):
+                if open_a[k] and open_b[k + 1] and not open_b[k] and not open_a[k + 1]:
+                    pairs.append((cell_a(first + k), cell_b(first + k + 1), DIAGONAL_COST))
+                if open_a[k + 1] and open_b[k] and not open_a[k] and not open_b[k + 1]:
+                    pairs.append((cell_a(first + k + 1), cell_b(first + k), DIAGONAL_COST))
+        return pairs
+    
+    def _rebuild_border(self, border):
+        """Dựng lại các cặp chuyển tiếp của một cạnh/góc chung và đánh dấu các cụm liên quan"""
+        cluster_of = self.cluster_of_view
+        for a, b, move_cost in self._borders.pop(border, ()):
+            for cell, other in ((a, b), (b, a)):
+                links = self._crossings[cell]
+                links.remove((other, move_cost))
+                if not links:
+                    del self._crossings[cell]
+                    self._transitions[cluster_of[cell]].discard(cell)
+                self._intra[cluster_of[cell]] = None
         
-        elapsed_time = (time.time() - start_time) * 1000
-        return None, {'algorithm': 'Dijkstra', 'time_taken': elapsed_time, 'path_found': False}
+        pairs = self._border_pairs(border)
+        if pairs:
+            self._borders[border] = pairs
+        for a, b, move_cost in pairs:
+            for cell, other in ((a, b), (b, a)):
+                self._crossings.setdefault(cell, []).append((other, move_cost))
+                self._transitions[cluster_of[cell]].add(cell)
+                self._intra[cluster_of[cell]] = None
     
-    def astar(self, callback=None):
+    def _apply_changes(self):
+        """Xử lý các cell bị sửa từ lần truy vấn trước: dựng lại cạnh cụm, đánh dấu cụm"""
+        if not self._changed:
+            return
+        cols = self.grid.cols
+        borders = set()
+        for index in self._changed:
+            row, col = divmod(index, cols)
+            borders.update(self._borders_of_cell(row, col))
+            self._intra[self.cluster_of_view[index]] = None
+            # Cạnh ngoài đi vào cell này (lưu ở cụm bên kia) có chi phí theo weight của nó
+            for other, _ in self._crossings.get(index, ()):
+                self._intra[self.cluster_of_view[other]] = None
+        for border in borders:
+            self._rebuild_border(border)
+        self._changed.clear()
+    
+    def _search_cluster(self, source, cluster, reverse=False, target=-1):
         """
-        A*: Sử dụng heuristic + cost, tối ưu cho Energy/Cost
+        Dijkstra giới hạn trong một cụm
         
         Args:
-            callback: Hàm callback được gọi mỗi khi xét một node
+            source: Chỉ số cell bắt đầu
+            cluster: Chỉ số cụm (không đi ra ngoài cụm này)
+            reverse: True để tính chi phí từ các cell ĐẾN source (cạnh đảo chiều)
+            target: Dừng sớm khi lấy ra cell này (-1 = duyệt hết cụm)
         
         Returns:
-            Tuple (path, stats)
+            Tuple (dist, parents) là dict cell → chi phí / cell cha
         """
-        import heapq
-        import time
+        grid = self.grid
+        weights = memoryview(grid.weights)
+        table = grid.get_neighbor_table(self.allow_diagonal)
+        masks = table.masks_view
+        patterns = table.patterns
+        cluster_of = self.cluster_of_view
+        heappush = heapq.heappush
+        heappop = heapq.heappop
         
-        start_time = time.time()
-        self.grid.reset_pathfinding_data()
-        
-        if not self.grid.start or not self.grid.end:
-            return None, {}
+        dist = {source: 0.0}
+        parents = {source: -1}
+        heap = [(0.0, source)]
+        while heap:
+            current_dist, current = heappop(heap)
+            if current_dist > dist[current]:
+                continue
+            if current == target:
+                break
+            current_weight = weights[current]
+            for delta, move_cost in patterns[masks[current]]:
+                neighbor = current + delta
+                if cluster_of[neighbor] != cluster:
+                    continue
+                step = move_cost * (current_weight if reverse else weights[neighbor])
+                new_dist = current_dist + step
+                if new_dist < dist.get(neighbor, float('inf')):
+                    dist[neighbor] = new_dist
+                    parents[neighbor] = current
+                    heappush(heap, (new_dist, neighbor))
+        return dist, parents
+    
+    def _cluster_edges(self, cluster):
+        """
+        Các cạnh đi ra từ ô chuyển tiếp của một cụm (tính lại nếu cụm đã bị đánh dấu)
         
-        start_node = self.grid.get_node(self.grid.start[0], self.grid.start[1])
-        end_node = self.grid.get_node(self.grid.end[0], self.grid.end[1])
+        Returns:
+            Dict ô chuyển tiếp → list (ô đích, chi phí) gồm cạnh trong và cạnh ngoài
+        """
+        edges = self._intra[cluster]
+        if edges is None:
+            weights = memoryview(self.grid.weights)
+            transitions = self._transitions[cluster]
+            edges = {}
+            for source in transitions:
+                dist, _ = self._search_cluster(source, cluster)
+                links = [(other, dist[other]) for other in transitions
+                         if other != source and other in dist]
+                for other, move_cost in self._crossings[source]:
+                    links.append((other, move_cost * weights[other]))
+                edges[source] = links
+            self._intra[cluster] = edges
+            self.clusters_rebuilt += 1
+        return edges
+    
+    def build(self):
+        """Tính trước cạnh trong của mọi cụm (thay vì tính dần khi truy vấn)"""
+        self._apply_changes()
+        for cluster in range(len(self._intra)):
+            self._cluster_edges(cluster)
+    
+    def abstract_graph_size(self):
+        """
+        Returns:
+            Tuple (số ô chuyển tiếp, số cạnh đã tính, số cụm)
+        """
+        edges = sum(len(links) for cluster_edges in self._intra if cluster_edges
+                    for links in cluster_edges.values())
+        return len(self._crossings), edges, len(self._intra)
+    
+    def find_path(self, start=None, goal=None, callback=None, budget=None):
+        """
+        Tìm đường từ start đến goal qua đồ thị trừu tượng rồi tìm chi tiết từng đoạn
         
-        start_node.g_score = 0
-        # Chọn heuristic dựa trên allow_diagonal
-        if self.allow_diagonal:
-            start_node.h_score = self.euclidean_distance(
-                start_node.row, start_node.col,
-                end_node.row, end_node.col
-            )
-        else:
-            start_node.h_score = self.manhattan_distance(
-                start_node.row, start_node.col,
-                end_node.row, end_node.col
-            )
-        start_node.f_score = start_node.g_score + start_node.h_score
+        Args:
+            start, goal: (row, col); None = Start/End của Grid
+            callback: Hàm callback(node, state) gọi cho các nút trừu tượng
+            budget: SearchBudget giới hạn số nút trừu tượng mở rộng / thời gian của lần tìm
         
-        open_set = [(start_node.f_score, start_node.row, start_node.col)]
-        visited = set()
+        Returns:
+            List các (row, col) từ start đến goal, hoặc None nếu không có đường đi
+            (hoặc hết ngân sách - xem budget.exhausted_by)
+        """
+        grid = self.grid
+        cols = grid.cols
+        start = grid.index(*(start or grid.start))
+        goal = grid.index(*(goal or grid.end))
+        self.nodes_expanded = 0
+        self.clusters_rebuilt = 0
+        if budget is not None:
+            budget.begin()
+        self._apply_changes()
+        if start == goal:
+            return [divmod(start, cols)]
         
-        if callback:
-            callback(start_node, 'open')
+        cluster_of = self.cluster_of_view
+        weights = memoryview(grid.weights)
+        start_cluster = cluster_of[start]
+        goal_cluster = cluster_of[goal]
+        from_start, _ = self._search_cluster(start, start_cluster)
+        to_goal, _ = self._search_cluster(goal, goal_cluster, reverse=True)
+        _, heuristic, h_scale = select_heuristic(self.heuristic, self.allow_diagonal, grid)
+        goal_row, goal_col = divmod(goal, cols)
         
+        g_scores = {start: 0.0}
+        parents = {start: -1}
+        closed = set()
+        open_set = [(0.0, 0.0, start)]
         while open_set:
-            current_f, row, col = heapq.heappop(open_set)
-            current = self.grid.get_node(row, col)
-            
-            if (row, col) in visited:
+            _, _, current = heapq.heappop(open_set)
+            if current in closed:
                 continue
-            
-            visited.add((row, col))
-            
+            # Một nút trừu tượng có thể phải tính cạnh của cả một cụm (_cluster_edges)
+            # nên đồng hồ được kiểm tra ở mọi lần mở rộng, không chỉ mỗi check_interval lần
+            if budget is not None and (budget.spend() or budget.check()):
+                return None
+            closed.add(current)
+            self.nodes_expanded += 1
             if callback:
-                callback(current, 'closed')
+                callback(grid.get_node(*divmod(current, cols)), 'closed')
+            if current == goal:
+                break
             
-            if current == end_node:
-                # Truy vết đường đi
-                path = []
-                node = current
-                while node:
-                    path.append((node.row, node.col))
-                    node = node.parent
-                path.reverse()
-                
-                elapsed_time = (time.time() - start_time) * 1000
-                total_steps = len(path) - 1
-                total_energy = sum(self.grid.get_node(r, c).weight for r, c in path)
-                
-                stats = {
-                    'algorithm': 'A*',
-                    'path_length': total_steps,
-                    'total_energy': total_energy,
-                    'time_taken': elapsed_time
-                }
-                return path, stats
+            current_g = g_scores[current]
+            current_cluster = cluster_of[current]
+            if current == start:
+                edges = [(other, from_start[other]) for other in self._transitions[start_cluster]
+                         if other in from_start and other != start]
+                if start_cluster == goal_cluster and goal in from_start:
+                    edges.append((goal, from_start[goal]))
+                for other, move_cost in self._crossings.get(start, ()):
+                    edges.append((other, move_cost * weights[other]))
+            elif current_cluster == goal_cluster and current in to_goal:
+                edges = self._cluster_edges(current_cluster)[current] + [(goal, to_goal[current])]
+            else:
+                edges = self._cluster_edges(current_cluster)[current]
             
-            for neighbor, move_cost in self.grid.get_neighbors(current, allow_diagonal=self.allow_diagonal):
-                pos = (neighbor.row, neighbor.col)
-                if pos in visited:
+            for other, cost in edges:
+                if other in closed:
                     continue
-                
-                # Tính chi phí từ current đến neighbor
-                # Chi phí = move_cost (1.0 hoặc √2) * weight của neighbor
-                tentative_g = current.g_score + move_cost * neighbor.weight
-                
-                if neighbor.g_score == 0 or tentative_g < neighbor.g_score:
-                    neighbor.g_score = tentative_g
-                    # Chọn heuristic dựa trên allow_diagonal
-                    if self.allow_diagonal:
-                        neighbor.h_score = self.euclidean_distance(
-                            neighbor.row, neighbor.col,
-                            end_node.row, end_node.col
-                        )
-                    else:
-                        neighbor.h_score = self.manhattan_distance(
-                            neighbor.row, neighbor.col,
-                            end_node.row, end_node.col
-                        )
-                    neighbor.f_score = neighbor.g_score + neighbor.h_score
-                    neighbor.parent = current
-                    heapq.heappush(open_set, (neighbor.f_score, neighbor.row, neighbor.col))
+                tentative_g = current_g + cost
+                if tentative_g < g_scores.get(other, float('inf')):
+                    g_scores[other] = tentative_g
+                    parents[other] = current
+                    row, col = divmod(other, cols)
+                    h = h_scale * heuristic(row, col, goal_row, goal_col)
+                    # Cùng f thì ưu tiên nút gần goal hơn (h nhỏ) để bớt mở rộng thừa
+                    heapq.heappush(open_set, (tentative_g + h, h, other))
                     if callback:
-                        callback(neighbor, 'open')
+                        callback(grid.get_node(row, col), 'open')
+        
+        if goal not in closed:
+            return None
         
-        elapsed_time = (time.time() - start_time) * 1000
-        return None, {'algorithm': 'A*', 'time_taken': elapsed_time, 'path_found': False}
+        abstract_path = []
+        node = goal
+        while node >= 0:
+            abstract_path.append(node)
+            node = parents[node]
+        abstract_path.reverse()
+        return self._refine(abstract_path)
+    
+    def _refine(self, abstract_path):
+        """Nối các nút trừu tượng bằng đường chi tiết trong cụm (cặp chuyển tiếp là 1 bước)"""
+        cols = self.grid.cols
+        cluster_of = self.cluster_of_view
+        path = [divmod(abstract_path[0], cols)]
+        for a, b in zip(abstract_path, abstract_path[1:]):
+            if cluster_of[a] != cluster_of[b]:
+                path.append(divmod(b, cols))
+                continue
+            _, parents = self._search_cluster(a, cluster_of[a], target=b)
+            segment = []
+            node = b
+            while node != a:
+                segment.append(divmod(node, cols))
+                node = parents[node]
+            segment.reverse()
+            path.extend(segment)
+        return path
+
+
+# Bản đồ phòng 20x20 - PHIÊN BẢN PHỨC TẠP
+# 0: Ô trống (đi được), 1: Vật cản
+# Bản đồ này có nhiều vật cản tạo ra đường đi quanh co, phức tạp
+DEMO_ROOM_MAP = [
+    [0, 1, 0, 0, 0, 1, 0, 0, 0, 1, 0, 0, 0, 1, 0, 0, 0, 1, 0, 0],
+    [0, 1, 0, 1, 0, 1, 0, 1, 0, 1, 0, 1, 0, 1, 0, 1, 0, 1, 0, 1],
+    [0, 0, 0, 1, 0, 0, 0, 1, 0, 0, 0, 1, 0, 0, 0, 1, 0, 0, 0, 1],
+    [1, 1, 1, 1, 0, 1, 1, 1, 0, 1, 1, 1, 0, 1, 1, 1, 0, 1, 1, 1],
+    [0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0],
+    [0, 1, 1, 1, 1, 1, 1, 1, 1, 1, 1, 1, 1, 1, 1, 1, 1, 1, 1, 0],
+    [0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0],
+    [1, 1, 1, 1, 0, 1, 1, 1, 0, 1, 1, 1, 0, 1, 1, 1, 0, 1, 1, 1],
+    [0, 0, 0, 1, 0, 0, 0, 1, 0, 0, 0, 1, 0, 0, 0, 1, 0, 0, 0, 1],
+    [0, 1, 0, 1, 0, 1, 0, 1, 0, 1, 0, 1, 0, 1, 0, 1, 0, 1, 0, 1],
+    [0, 1, 0, 0, 0, 1, 0, 0, 0, 1, 0, 0, 0, 1, 0, 0, 0, 1, 0, 0],
+    [0, 0, 0, 1, 0, 0, 0, 1, 0, 0, 0, 1, 0, 0, 0, 1, 0, 0, 0, 1],
+    [1, 1, 1, 1, 0, 1, 1, 1, 0, 1, 1, 1, 0, 1, 1, 1, 0, 1, 1, 1],
+    [0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0],
+    [0, 1, 1, 1, 1, 1, 1, 1, 1, 1, 1, 1, 1, 1, 1, 1, 1, 1, 1, 0],
+    [0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0],
+    [1, 1, 1, 1, 0, 1, 1, 1, 0, 1, 1, 1, 0, 1, 1, 1, 0, 1, 1, 1],
+    [0, 0, 0, 1, 0, 0, 0, 1, 0, 0, 0, 1, 0, 0, 0, 1, 0, 0, 0, 1],
+    [0, 1, 0, 1, 0, 1, 0, 1, 0, 1, 0, 1, 0, 1, 0, 1, 0, 1, 0, 0],
+    [0, 1, 0, 0, 0, 1, 0, 0, 0, 1, 0, 0, 0, 1, 0, 0, 0, 1, 0, 0]
+]
+
+# Điểm bắt đầu và đích của bản đồ demo
+DEMO_START = (0, 0)
+DEMO_GOAL = (18, 18)
 
 
 def print_map(room_map, path=None, start=None, goal=None):
@@ -1050,39 +4980,95 @@ def print_map(room_map, path=None, start=None, goal=None):
     print("="*50 + "\n")
 
 
+def print_search_counters(room_map, start, goal, allow_diagonal=False):
+    """
+    In bảng bộ đếm tìm kiếm (PathfindingAlgorithms(instrument=True)) của BFS, DFS,
+    Dijkstra và A* trên cùng một bản đồ
+    
+    Args:
+        room_map: Ma trận 2D (0 = trống, 1 = vật cản)
+        start: Tuple (row, col) điểm bắt đầu
+        goal: Tuple (row, col) điểm đích
+        allow_diagonal: True nếu cho phép đi chéo
+    """
+    grid = Grid.from_room_map(room_map)
+    grid.set_cell_type(start[0], start[1], CELL_START)
+    grid.set_cell_type(goal[0], goal[1], CELL_END)
+    pathfinder = PathfindingAlgorithms(grid, allow_diagonal, instrument=True)
+    columns = {name: getattr(pathfinder, method)()[1].get('counters', {})
+               for name, method in (('BFS', 'bfs'), ('DFS', 'dfs'), ('Dijkstra', 'dijkstra'), ('A*', 'astar'))}
+    
+    print(f"\n{'Bộ đếm':<16}" + "".join(f"{name:>10}" for name in columns))
+    print("-" * (16 + 10 * len(columns)))
+    for key, label in SEARCH_COUNTERS.items():
+        print(f"{label:<16}" + "".join(f"{counters.get(key, '-'):>10}" for counters in columns.values()))
+
+
+def load_grid_file(path):
+    """
+    Nạp lưới từ file bản đồ theo phần mở rộng: .rpmap (map_format), .py
+    (classroom_map trong assets/map) hoặc .map (MovingAI, chưa có Start/End)
+    
+    Returns:
+        Grid object
+    """
+    if path.endswith('.rpmap'):
+        import map_format
+        return map_format.load_map(path)
+    if path.endswith('.py'):
+        import map_format
+        return map_format.classroom_map_to_grid(map_format.read_classroom_map(path))
+    if path.endswith('.map'):
+        import movingai
+        return movingai.load_map(path)
+    raise ValueError(f"Unknown map format: {path} (expected .rpmap, .py or .map)")
+
+
+def run_comparison(argv=None):
+    """
+    CLI so sánh thuật toán: python robot_astar.py --compare [--map FILE] [--workers N] ...
+    
+    In bảng compare_algorithms() (số bước, năng lượng, số nút mở rộng, thời gian)
+    cho cả 4 hướng và 8 hướng.
+    """
+    parser = argparse.ArgumentParser(description="So sánh các thuật toán tìm đường trên cùng một bản đồ")
+    parser.add_argument('--compare', action='store_true')
+    parser.add_argument('--map', help='file .rpmap, .py (assets/map) hoặc .map (mặc định: bản đồ demo)')
+    parser.add_argument('--start', type=int, nargs=2, metavar=('ROW', 'COL'))
+    parser.add_argument('--goal', type=int, nargs=2, metavar=('ROW', 'COL'))
+    parser.add_argument('--algorithms', default=','.join(COMPARE_ALGORITHMS),
+                        help=f"danh sách cách nhau bởi dấu phẩy trong {', '.join(SOLVE_MANY_ALGORITHMS)}")
+    parser.add_argument('--workers', type=int, default=None, help='số process (mặc định: tuần tự)')
+    parser.add_argument('--repeat', type=int, default=1, help='số lần chạy mỗi thuật toán (lấy thời gian tốt nhất)')
+    args = parser.parse_args(argv)
+    
+    if args.map:
+        grid = load_grid_file(args.map)
+    else:
+        grid = Grid.from_room_map(DEMO_ROOM_MAP)
+        grid.set_cell_type(DEMO_START[0], DEMO_START[1], CELL_START)
+        grid.set_cell_type(DEMO_GOAL[0], DEMO_GOAL[1], CELL_END)
+    start = tuple(args.start) if args.start else grid.start
+    goal = tuple(args.goal) if args.goal else grid.end
+    rows = compare_algorithms(grid, args.algorithms.split(','), start=start, goal=goal,
+                              workers=args.workers, repeat=args.repeat)
+    print(f"\n{args.map or 'demo 20x20'}: {grid.rows}x{grid.cols}, Start {start}, End {goal}\n")
+    print(format_comparison(rows))
+
+
 def main():
     """
-    Hàm main: Chạy chương trình chính
+    Hàm main: Chạy chương trình chính (--compare: so sánh thuật toán, xem run_comparison)
     """
-    # Bản đồ phòng 20x20 - PHIÊN BẢN PHỨC TẠP
-    # 0: Ô trống (đi được), 1: Vật cản
-    # Bản đồ này có nhiều vật cản tạo ra đường đi quanh co, phức tạp
-    room_map = [
-        [0, 1, 0, 0, 0, 1, 0, 0, 0, 1, 0, 0, 0, 1, 0, 0, 0, 1, 0, 0],
-        [0, 1, 0, 1, 0, 1, 0, 1, 0, 1, 0, 1, 0, 1, 0, 1, 0, 1, 0, 1],
-        [0, 0, 0, 1, 0, 0, 0, 1, 0, 0, 0, 1, 0, 0, 0, 1, 0, 0, 0, 1],
-        [1, 1, 1, 1, 0, 1, 1, 1, 0, 1, 1, 1, 0, 1, 1, 1, 0, 1, 1, 1],
-        [0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0],
-        [0, 1, 1, 1, 1, 1, 1, 1, 1, 1, 1, 1, 1, 1, 1, 1, 1, 1, 1, 0],
-        [0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0],
-        [1, 1, 1, 1, 0, 1, 1, 1, 0, 1, 1, 1, 0, 1, 1, 1, 0, 1, 1, 1],
-        [0, 0, 0, 1, 0, 0, 0, 1, 0, 0, 0, 1, 0, 0, 0, 1, 0, 0, 0, 1],
-        [0, 1, 0, 1, 0, 1, 0, 1, 0, 1, 0, 1, 0, 1, 0, 1, 0, 1, 0, 1],
-        [0, 1, 0, 0, 0, 1, 0, 0, 0, 1, 0, 0, 0, 1, 0, 0, 0, 1, 0, 0],
-        [0, 0, 0, 1, 0, 0, 0, 1, 0, 0, 0, 1, 0, 0, 0, 1, 0, 0, 0, 1],
-        [1, 1, 1, 1, 0, 1, 1, 1, 0, 1, 1, 1, 0, 1, 1, 1, 0, 1, 1, 1],
-        [0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0],
-        [0, 1, 1, 1, 1, 1, 1, 1, 1, 1, 1, 1, 1, 1, 1, 1, 1, 1, 1, 0],
-        [0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0],
-        [1, 1, 1, 1, 0, 1, 1, 1, 0, 1, 1, 1, 0, 1, 1, 1, 0, 1, 1, 1],
-        [0, 0, 0, 1, 0, 0, 0, 1, 0, 0, 0, 1, 0, 0, 0, 1, 0, 0, 0, 1],
-        [0, 1, 0, 1, 0, 1, 0, 1, 0, 1, 0, 1, 0, 1, 0, 1, 0, 1, 0, 0],
-        [0, 1, 0, 0, 0, 1, 0, 0, 0, 1, 0, 0, 0, 1, 0, 0, 0, 1, 0, 0]
-    ]
+    if '--compare' in sys.argv[1:]:
+        run_comparison()
+        return
+    
+    room_map = DEMO_ROOM_MAP
     
     # Điểm bắt đầu và đích
-    start = (0, 0)
-    goal = (18, 18)
+    start = DEMO_START
+    goal = DEMO_GOAL
     
     # In bản đồ ban đầu
     print("\n" + "="*50)
@@ -1185,6 +5171,12 @@ def main():
     else:
         print("\n✗ Cả hai phiên bản đều không tìm thấy đường đi!")
         print("Không có đường đi từ Start đến Goal trong bản đồ này.")
+    
+    # ========== BỘ ĐẾM TÌM KIẾM ==========
+    print("\n" + "="*70)
+    print("BỘ ĐẾM TÌM KIẾM (4 HƯỚNG): VÌ SAO MỘT THUẬT TOÁN CHẬM HƠN")
+    print("="*70)
+    print_search_counters(room_map, start, goal)
 
 
 """
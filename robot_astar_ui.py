@@ -7,6 +7,7 @@ import sys
 import io
 import pygame
 import time
+from collections import deque
 
 # Thiết lập encoding UTF-8 cho console (hỗ trợ tiếng Việt)
 if sys.platform == 'win32':
@@ -16,6 +17,8 @@ if sys.platform == 'win32':
 import importlib.util
 spec = importlib.util.spec_from_file_location("robot_astar", "robot_astar.py")
 robot_astar_module = importlib.util.module_from_spec(spec)
+# Đăng ký module để các module khác (map_format) import lại đúng module này
+sys.modules["robot_astar"] = robot_astar_module
 spec.loader.exec_module(robot_astar_module)
 
 # Import các class và constants
@@ -28,6 +31,11 @@ CELL_START = robot_astar_module.CELL_START
 CELL_END = robot_astar_module.CELL_END
 CELL_TRAP = robot_astar_module.CELL_TRAP
 CELL_ROAD = robot_astar_module.CELL_ROAD
+SEARCH_COUNTERS = robot_astar_module.SEARCH_COUNTERS
+PathCache = robot_astar_module.PathCache
+
+# Tìm đường trong process riêng (import sau khi robot_astar đã được đăng ký ở trên)
+from search_worker import SearchProcess
 
 # Màu sắc - Cải thiện độ tương phản và dễ nhìn
 COLOR_WHITE = (255, 255, 255)
@@ -211,6 +219,9 @@ class PathfindingSimulation:
         self.MIN_WINDOW_WIDTH = 1000
         self.MIN_WINDOW_HEIGHT = 700
         self.GRID_SIZE = 20  # Default 20x20
+        # Giới hạn kích thước lưới của UI (Grid của thư viện không giới hạn)
+        self.MIN_GRID_SIZE = 10
+        self.MAX_GRID_SIZE = 30
         
         # Kích thước grid area (bên trái) - sẽ tính lại khi resize
         self.GRID_AREA_WIDTH = 800
@@ -247,7 +258,7 @@ class PathfindingSimulation:
         self.small_font = self.label_font
         
         # Tạo Grid
-        self.grid = Grid(self.GRID_SIZE, self.GRID_SIZE)
+        self.grid = self.create_grid(self.GRID_SIZE, self.GRID_SIZE)
         
         # Đặt Start và End mặc định
         self.grid.set_cell_type(0, 0, CELL_START)
@@ -258,6 +269,8 @@ class PathfindingSimulation:
         self.pathfinder = PathfindingAlgorithms(self.grid, allow_diagonal=self.allow_diagonal)
         self.path = None
         self.stats = {}
+        self.show_counters = False  # Phím I: hiện bộ đếm tìm kiếm (BFS/DFS/Dijkstra/A*)
+        self.path_cache = None  # Cache kết quả tìm đường (tạo lại khi đổi Grid)
         
         # Energy mode: True = có tính năng lượng (TRAP/ROAD), False = chỉ trắng đen (WALL/NORMAL)
         self.energy_mode = True  # Mặc định có energy
@@ -266,15 +279,18 @@ class PathfindingSimulation:
         self.drawing_mode = 'WALL'  # WALL, TRAP, ROAD, START, END, NORMAL
         self.is_drawing = False
         self.last_draw_pos = None
+        self.replan_pending = False  # Lưới bị vẽ khi robot đang đi, tìm lại ở bước robot kế tiếp
         
         # Animation
         self.animation_nodes = {'open': set(), 'closed': set()}
         self.is_animating = False
-        self.animation_queue = []  # Queue để lưu các animation steps
+        self.animation_queue = deque()  # Queue các bước animation ((row, col), state)
         self.animation_speed = 8  # Số frame giữa mỗi bước animation (chậm hơn để nhìn rõ)
         self.animation_frame_count = 0
         self.pathfinding_result = None  # Kết quả từ pathfinding
         self.pathfinding_running = False  # Flag để biết pathfinding đang chạy
+        self.search = None  # SearchProcess đang chạy (None nếu không có)
+        self.search_key = None  # Khóa PathCache của lần tìm đang chạy
         self.animation_paused = False  # Tạm dừng animation
         self.skip_animation = False  # Bỏ qua animation, hiển thị kết quả ngay
         
@@ -304,6 +320,12 @@ class PathfindingSimulation:
         # Clock
         self.clock = pygame.time.Clock()
     
+    def create_grid(self, rows, cols):
+        """Tạo Grid với kích thước giới hạn trong MIN_GRID_SIZE-MAX_GRID_SIZE để vẽ được"""
+        rows = max(self.MIN_GRID_SIZE, min(self.MAX_GRID_SIZE, rows))
+        cols = max(self.MIN_GRID_SIZE, min(self.MAX_GRID_SIZE, cols))
+        return Grid(rows, cols)
+    
     def create_buttons(self):
         """Tạo các buttons và dropdown với bố cục chuyên nghiệp, font size đều nhau"""
         x_start = self.GRID_AREA_WIDTH + 10
@@ -314,7 +336,7 @@ class PathfindingSimulation:
         section_spacing = 16  # Khoảng cách giữa các section rõ ràng hơn
         
         # ========== SECTION 1: Algorithm Selection ==========
-        algorithms = ['BFS', 'DFS', 'Dijkstra', 'A*']
+        algorithms = ['BFS', 'DFS', 'Dijkstra', 'A*', 'JPS', 'D* Lite', 'HPA*']
         default_index = 3  # A* mặc định
         # Tính toán width dropdown để chứa text dài nhất
         # "Dijkstra" là text dài nhất, cần khoảng 100px + 30px cho arrow và padding
@@ -548,6 +570,8 @@ class PathfindingSimulation:
                 self.grid.set_cell_type(row, col, CELL_NORMAL)
             self.last_draw_pos = (row, col)
             self.is_drawing = True
+        
+        self.replan_pending = True
     
     def handle_mouse_drag(self, pos, button):
         """Xử lý kéo chuột"""
@@ -589,6 +613,32 @@ class PathfindingSimulation:
                 self.grid.set_cell_type(row, col, CELL_NORMAL)
         
         self.last_draw_pos = (row, col)
+        self.replan_pending = True
+    
+    def replan_robot_path(self):
+        """
+        D* Lite: Khi robot đang đi mà lưới bị vẽ thêm, tìm lại đường từ ô hiện tại của robot
+        
+        Được gọi trước bước di chuyển kế tiếp của robot (không phải sau mỗi sự kiện kéo
+        chuột), nên nhiều ô vẽ liền nhau chỉ tốn một lần tìm lại. Planner chỉ sửa phần
+        bị ảnh hưởng nên chạy ngay trong vòng lặp chính. Stats lúc này tính cho đoạn
+        đường còn lại từ vị trí robot.
+        """
+        self.replan_pending = False
+        if not self.robot_animating or not self.robot_path:
+            return
+        if self.stats.get('algorithm') != 'D* Lite':
+            return
+        
+        index = min(self.robot_path_index, len(self.robot_path) - 1)
+        current_pos = self.robot_path[index]
+        path, stats = self.pathfinder.dstar_lite(start=current_pos)
+        self.stats = stats
+        if path:
+            self.robot_path = self.robot_path[:index] + path
+        else:
+            # Bị chặn hoàn toàn: robot dừng tại ô hiện tại
+            self.robot_path = self.robot_path[:index + 1]
     
     def find_path(self):
         """Tìm đường đi với thuật toán đã chọn - với animation step-by-step"""
@@ -597,13 +647,15 @@ class PathfindingSimulation:
         
         if self.pathfinding_running:
             return  # Đang chạy rồi, không chạy lại
+        self.cancel_search()
         
         # Cập nhật allow_diagonal từ dropdown
         movement_selected = self.movement_dropdown.get_selected()
         self.allow_diagonal = (movement_selected == '8 Directions')
         
-        # Cập nhật pathfinder với allow_diagonal mới
-        self.pathfinder = PathfindingAlgorithms(self.grid, allow_diagonal=self.allow_diagonal)
+        # Cập nhật pathfinder nếu allow_diagonal đổi
+        if self.pathfinder.allow_diagonal != self.allow_diagonal:
+            self.pathfinder = PathfindingAlgorithms(self.grid, allow_diagonal=self.allow_diagonal)
         
         # Reset animation
         self.animation_nodes = {'open': set(), 'closed': set()}
@@ -611,7 +663,7 @@ class PathfindingSimulation:
         self.stats = {}
         self.is_animating = True
         self.animation_frame_count = 0
-        self.animation_queue = []
+        self.animation_queue = deque()
         self.pathfinding_result = None
         self.pathfinding_running = True
         self.animation_paused = False
@@ -629,36 +681,69 @@ class PathfindingSimulation:
         # Lấy algorithm từ dropdown
         current_algorithm = self.algorithm_dropdown.get_selected()
         
-        # Callback để thêm animation steps vào queue
-        def animation_callback(node, state):
-            """Callback để thêm animation steps vào queue"""
-            self.animation_queue.append((node, state))
+        # Chỉ đếm khi đang hiện bộ đếm (tắt thì vòng lặp tìm kiếm không tốn thêm gì)
+        self.pathfinder.instrument = self.show_counters
+        
+        # Cùng truy vấn trên lưới chưa đổi (bấm lại Find Path, đổi thuật toán qua lại)
+        # lấy luôn từ cache: không có animation O/X, robot đi ngay
+        if self.path_cache is None or self.path_cache.grid is not self.grid:
+            self.path_cache = PathCache(self.grid)
+        methods = {'BFS': 'bfs', 'DFS': 'dfs', 'Dijkstra': 'dijkstra', 'A*': 'astar', 'JPS': 'jps',
+                   'D* Lite': 'dstar_lite', 'HPA*': 'hpa_star'}
+        options = {'cluster_size': 5} if current_algorithm == 'HPA*' else {}
+        if current_algorithm not in methods:
+            self.pathfinding_result = (None, {})
+            self.pathfinding_running = False
+            return
+        method = methods[current_algorithm]
         
-        # Chạy thuật toán trong thread riêng để không block UI
-        import threading
+        key = self.path_cache.key(self.pathfinder, method, self.energy_mode, options)
+        cached = self.path_cache.lookup(key)
+        if cached is not None:
+            self.pathfinding_result = cached
+            self.pathfinding_running = False
+            return
         
-        def run_algorithm():
-            """Chạy thuật toán trong thread riêng"""
-            try:
-                if current_algorithm == 'BFS':
-                    path, stats = self.pathfinder.bfs(animation_callback)
-                elif current_algorithm == 'DFS':
-                    path, stats = self.pathfinder.dfs(animation_callback)
-                elif current_algorithm == 'Dijkstra':
-                    path, stats = self.pathfinder.dijkstra(animation_callback)
-                elif current_algorithm == 'A*':
-                    path, stats = self.pathfinder.astar(animation_callback)
-                else:
-                    path, stats = None, {}
-                
-                # Lưu kết quả
-                self.pathfinding_result = (path, stats)
-            finally:
-                self.pathfinding_running = False
-        
-        # Bắt đầu thread
-        thread = threading.Thread(target=run_algorithm, daemon=True)
-        thread.start()
+        # Chạy thuật toán trong process riêng (trên bản sao lưới) để không block UI;
+        # sự kiện O/X được nhận theo lô ở poll_search() mỗi frame
+        self.search = SearchProcess(self.grid, method, self.allow_diagonal,
+                                    instrument=self.show_counters, **options)
+        self.search_key = key
+    
+    def poll_search(self):
+        """Nhận sự kiện và kết quả từ process tìm đường (gọi mỗi frame)"""
+        search = self.search
+        if search is None:
+            return
+        self.animation_queue.extend(search.poll())
+        if not search.done:
+            return
+        
+        self.search = None
+        self.pathfinding_running = False
+        if search.grid is not self.grid or search.error is not None:
+            # Lưới đã bị thay hoặc process lỗi: bỏ kết quả
+            if search.error is not None:
+                print(f"Search failed: {search.error}")
+            self.pathfinding_result = (None, {})
+            return
+        if search.revision != self.grid.revision:
+            # Lưới bị vẽ thêm trong lúc tìm: kết quả có thể đi qua tường mới, tìm lại
+            self.find_path()
+            return
+        path, stats = search.result
+        self.pathfinding_result = (path, stats)
+        explored = None
+        if search.algorithm in PathCache.EXPLORED_ALGORITHMS and stats:
+            explored = search.explored
+        self.path_cache.put(self.search_key, path, stats, explored)
+    
+    def cancel_search(self):
+        """Dừng process tìm đường đang chạy (nếu có)"""
+        if self.search is not None:
+            self.search.cancel()
+            self.search = None
+        self.search_key = None
     
     def clear_path(self):
         """Xóa đường đi và animation nhưng giữ lại walls và map"""
@@ -673,7 +758,8 @@ class PathfindingSimulation:
         self.robot_frame_count = 0
         self.robot_visited_path = []
         self.is_animating = False
-        self.animation_queue = []
+        self.cancel_search()
+        self.animation_queue = deque()
         self.pathfinding_result = None
         self.pathfinding_running = False
         self.animation_paused = False
@@ -686,7 +772,7 @@ class PathfindingSimulation:
     
     def reset_grid(self):
         """Reset grid về trạng thái ban đầu"""
-        self.grid = Grid(self.GRID_SIZE, self.GRID_SIZE)
+        self.grid = self.create_grid(self.GRID_SIZE, self.GRID_SIZE)
         self.grid.set_cell_type(0, 0, CELL_START)
         self.grid.set_cell_type(self.GRID_SIZE - 1, self.GRID_SIZE - 1, CELL_END)
         # Cập nhật allow_diagonal từ dropdown
@@ -727,6 +813,10 @@ class PathfindingSimulation:
         # Lấy kích thước từ dropdown
         size_str = self.random_map_size_dropdown.get_selected()
         
+        # Ưu tiên file nhị phân assets/map/<size>.rpmap (nạp bằng memmap, không chạy module)
+        if self._load_binary_map(size_str):
+            return
+        
         # Kiểm tra xem có numpy không trước khi thử import module
         has_numpy = False
         try:
@@ -769,7 +859,7 @@ class PathfindingSimulation:
                     map_data = classroom_map
                 
                 # Tạo Grid mới với kích thước từ map
-                new_grid = Grid(rows, cols)
+                new_grid = self.create_grid(rows, cols)
                 
                 # Convert map data sang Grid
                 # Mapping: 0 -> CELL_NORMAL, 1 -> CELL_WALL, 2 -> CELL_START, 3 -> CELL_END
@@ -797,7 +887,7 @@ class PathfindingSimulation:
                     pass
                 
                 # Cập nhật grid size
-                self.GRID_SIZE = rows
+                self.GRID_SIZE = new_grid.rows
                 
                 # Cập nhật grid
                 self.grid = new_grid
@@ -822,6 +912,35 @@ class PathfindingSimulation:
             # Không in error để tránh lỗi I/O, chỉ pass
             pass
     
+    def _load_binary_map(self, size_str):
+        """
+        Load map từ file .rpmap (tạo bằng python map_format.py)
+        
+        Returns:
+            True nếu load thành công, False nếu không có file hoặc map vượt giới hạn của UI
+        """
+        import os
+        
+        map_file = os.path.join('assets', 'map', f'{size_str}.rpmap')
+        if not os.path.exists(map_file):
+            return False
+        try:
+            import map_format
+            new_grid = map_format.load_map(map_file)
+        except Exception:
+            return False
+        if not (self.MIN_GRID_SIZE <= new_grid.rows <= self.MAX_GRID_SIZE
+                and self.MIN_GRID_SIZE <= new_grid.cols <= self.MAX_GRID_SIZE):
+            return False
+        
+        self.GRID_SIZE = new_grid.rows
+        self.grid = new_grid
+        movement_selected = self.movement_dropdown.get_selected()
+        self.allow_diagonal = (movement_selected == '8 Directions')
+        self.pathfinder = PathfindingAlgorithms(self.grid, allow_diagonal=self.allow_diagonal)
+        self.clear_path()
+        return True
+    
     def _load_map_from_file_direct(self, size_str):
         """Load map trực tiếp từ file Python (fallback method)"""
         import os
@@ -886,7 +1005,7 @@ class PathfindingSimulation:
         cols = len(map_data[0]) if rows > 0 else 0
         
         # Tạo Grid
-        new_grid = Grid(rows, cols)
+        new_grid = self.create_grid(rows, cols)
         
         for row in range(rows):
             for col in range(cols):
@@ -901,7 +1020,7 @@ class PathfindingSimulation:
                 elif cell_value == 3:
                     new_grid.set_cell_type(row, col, CELL_END)
         
-        self.GRID_SIZE = rows
+        self.GRID_SIZE = new_grid.rows
         self.grid = new_grid
         
         movement_selected = self.movement_dropdown.get_selected()
@@ -1327,6 +1446,8 @@ class PathfindingSimulation:
                     f"Energy Cost: {total_energy:.2f}" if isinstance(total_energy, (int, float)) else f"Energy Cost: {total_energy}",
                     f"Time Taken: {self.stats.get('time_taken', '-'):.2f} ms"
                 ]
+            if self.stats.get('cached'):
+                stats_lines[-1] += " (cached)"
         else:
             # Hiển thị algorithm đang được chọn
             stats_lines = [
@@ -1341,6 +1462,21 @@ class PathfindingSimulation:
             self.screen.blit(text, (x_start, y_pos))
             y_pos += 18
         
+        # Bộ đếm tìm kiếm (bật bằng phím I), 2 bộ đếm mỗi dòng
+        counters = self.stats.get('counters') if self.show_counters else None
+        if counters:
+            items = [f"{label}: {counters[key]}" for key, label in SEARCH_COUNTERS.items()]
+            for i in range(0, len(items), 2):
+                text = self.small_font.render("  ".join(items[i:i + 2]), True, COLOR_WHITE)
+                self.screen.blit(text, (x_start, y_pos))
+                y_pos += 15
+        if self.show_counters and self.path_cache is not None:
+            cache = self.path_cache.counters()
+            text = self.small_font.render(f"Cache: {cache['hits']} hits  {cache['misses']} misses  "
+                                          f"{cache['evictions']} evicted", True, COLOR_WHITE)
+            self.screen.blit(text, (x_start, y_pos))
+            y_pos += 15
+        
         # ========== SECTION 7: Color Legend (2 cột để tiết kiệm) ==========
         y_pos += 16
         legend_title = self.title_font.render("Legend:", True, COLOR_WHITE)
@@ -1405,7 +1541,7 @@ class PathfindingSimulation:
             "L-Click+Drag: Walls",
             "R-Click+Drag: Traps",
             "M-Click+Drag: Roads",
-            "Keys: W/T/R/S/E/N"
+            "Keys: W/T/R/S/E/N, I=Counters"
         ]
         for line in instructions:
             if y_pos < self.WINDOW_HEIGHT - 5:  # Chỉ vẽ nếu còn chỗ
@@ -1419,7 +1555,10 @@ class PathfindingSimulation:
             'BFS': 'BFS: Expand evenly (level by level).\nNodes may appear non-adjacent.\nAfter finding goal, backtrack\nfor shortest steps path.',
             'DFS': 'DFS: Go deep in one direction.\nNodes may appear far apart.\nAfter finding goal, backtrack\nfor path (may not be optimal).',
             'Dijkstra': 'Dijkstra: Prioritize low cost.\nNodes may jump by cost.\nAfter finding goal, backtrack\nfor lowest energy path.',
-            'A*': 'A*: Prioritize f=g+h score.\nNodes may jump by priority.\nAfter finding goal, backtrack\nfor optimal path (steps+energy).'
+            'A*': 'A*: Prioritize f=g+h score.\nNodes may jump by priority.\nAfter finding goal, backtrack\nfor optimal path (steps+energy).',
+            'JPS': 'JPS: A* that jumps in straight\nlines, only jump points shown.\nFull expansion near traps/roads.\nSame optimal cost as A*.',
+            'D* Lite': 'D* Lite: Search back from End.\nRepairs the route when you\nedit the map while the robot\nis moving (only affected part).',
+            'HPA*': 'HPA*: Split map into 5x5 clusters.\nA* over cluster entrances only,\nthen fill in each segment.\nNear-optimal, fast on big maps.'
         }
         return explanations.get(algo_name, 'Select algorithm to see explanation.')
     
@@ -1572,6 +1711,9 @@ class PathfindingSimulation:
                 self.drawing_mode = 'END'
             elif event.key == pygame.K_n:
                 self.drawing_mode = 'NORMAL'
+            elif event.key == pygame.K_i:
+                # Bật/tắt bộ đếm tìm kiếm, áp dụng từ lần Find Path sau
+                self.show_counters = not self.show_counters
     
     def handle_resize(self, new_width, new_height):
         """Xử lý khi window được resize"""
@@ -1597,12 +1739,12 @@ class PathfindingSimulation:
         """Bỏ qua animation, hiển thị kết quả ngay"""
         # Xử lý tất cả animation queue còn lại
         while self.animation_queue:
-            node, state = self.animation_queue.pop(0)
+            position, state = self.animation_queue.popleft()
             if state == 'open':
-                self.animation_nodes['open'].add((node.row, node.col))
+                self.animation_nodes['open'].add(position)
             elif state == 'closed':
-                self.animation_nodes['closed'].add((node.row, node.col))
-                self.animation_nodes['open'].discard((node.row, node.col))
+                self.animation_nodes['closed'].add(position)
+                self.animation_nodes['open'].discard(position)
         
         # Nếu pathfinding đã hoàn thành, hiển thị kết quả ngay
         if self.pathfinding_result is not None and not self.pathfinding_running:
@@ -1617,7 +1759,9 @@ class PathfindingSimulation:
             self.is_animating = False
             self.pathfinding_result = None
         elif self.robot_animating and self.robot_path:
-            # Robot đang di chuyển, cho robot đến đích ngay
+            # Robot đang di chuyển, cho robot đến đích ngay (theo đường đã tìm lại nếu lưới vừa bị vẽ)
+            if self.replan_pending:
+                self.replan_robot_path()
             self.robot_path_index = len(self.robot_path) - 1
             # Đánh dấu tất cả các ô trong path là đã đi qua
             self.robot_visited_path = list(self.robot_path)
@@ -1632,6 +1776,8 @@ class PathfindingSimulation:
     
     def update_animation(self):
         """Cập nhật animation từng bước"""
+        self.poll_search()
+        
         if self.skip_animation:
             self.skip_to_end()
             self.skip_animation = False
@@ -1646,12 +1792,12 @@ class PathfindingSimulation:
             if self.animation_frame_count >= self.animation_speed:
                 self.animation_frame_count = 0
                 # Xử lý một animation step mỗi lần để thấy rõ quá trình
-                node, state = self.animation_queue.pop(0)
+                position, state = self.animation_queue.popleft()
                 if state == 'open':
-                    self.animation_nodes['open'].add((node.row, node.col))
+                    self.animation_nodes['open'].add(position)
                 elif state == 'closed':
-                    self.animation_nodes['closed'].add((node.row, node.col))
-                    self.animation_nodes['open'].discard((node.row, node.col))
+                    self.animation_nodes['closed'].add(position)
+                    self.animation_nodes['open'].discard(position)
         
         # Kiểm tra xem pathfinding đã hoàn thành chưa
         if self.pathfinding_result is not None and not self.pathfinding_running:
@@ -1691,6 +1837,8 @@ class PathfindingSimulation:
             self.robot_frame_count += 1
             if self.robot_frame_count >= self.robot_speed:
                 self.robot_frame_count = 0
+                if self.replan_pending:
+                    self.replan_robot_path()
                 
                 # Thêm ô hiện tại vào danh sách đã đi qua (trước khi di chuyển)
                 if self.robot_path_index < len(self.robot_path):
@@ -1845,6 +1993,7 @@ class PathfindingSimulation:
             pygame.display.flip()
             self.clock.tick(60)
         
+        self.cancel_search()
         pygame.quit()
 
 
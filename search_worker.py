@@ -0,0 +1,141 @@
+# -*- coding: utf-8 -*-
+"""
+Mô tả: Chạy một lần tìm đường trong process riêng và gửi sự kiện animation theo lô
+
+Giao diện Pygame dùng SearchProcess thay cho threading.Thread: thuật toán chạy trên
+bản sao lưới (Grid.snapshot()) trong process con nên không tranh GIL với vòng lặp vẽ.
+Mỗi sự kiện callback(node, 'open'/'closed') được mã hóa thành một số int32
+(index << 1 | closed) và gửi qua Pipe theo lô BATCH_SIZE sự kiện; cuối cùng là
+(path, stats). cancel() dừng process ngay (Clear Path, Reset Grid, tìm lần mới),
+và kết quả của process đã hủy không bao giờ được đọc nữa.
+"""
+import multiprocessing
+import time
+from array import array
+
+from robot_astar import PathfindingAlgorithms
+
+# Số sự kiện mỗi lô gửi qua Pipe
+BATCH_SIZE = 512
+
+# Thời gian tối đa (giây) mà poll() dành để nhận và giải mã sự kiện mỗi lần gọi
+POLL_BUDGET = 0.004
+
+
+def _run_search(conn, grid, algorithm, allow_diagonal, instrument, options, batch_size):
+    """
+    Hàm chạy trong process con: tìm đường và gửi các thông điệp
+        - ('events', bytes): lô mã sự kiện int32
+        - ('done', path, stats) hoặc ('error', message)
+    """
+    pathfinder = PathfindingAlgorithms(grid, allow_diagonal, instrument=instrument)
+    cols = grid.cols
+    batch = array('i')
+    
+    def callback(node, state):
+        batch.append((node.row * cols + node.col) << 1 | (state == 'closed'))
+        if len(batch) >= batch_size:
+            conn.send(('events', batch.tobytes()))
+            del batch[:]
+    
+    try:
+        path, stats = getattr(pathfinder, algorithm)(callback, **options)
+        if batch:
+            conn.send(('events', batch.tobytes()))
+        conn.send(('done', path, stats))
+    except Exception as exc:
+        conn.send(('error', f"{type(exc).__name__}: {exc}"))
+    finally:
+        conn.close()
+
+
+class SearchProcess:
+    """
+    Lớp SearchProcess: Một lần tìm đường đang chạy trong process con
+    
+    Thuộc tính:
+        - grid: Grid gốc lúc bắt đầu (để bên gọi kiểm tra kết quả còn đúng lưới không)
+        - revision: grid.revision lúc bắt đầu
+        - algorithm: Tên phương thức của PathfindingAlgorithms
+        - done: True khi đã nhận kết quả, gặp lỗi hoặc bị hủy
+        - result: (path, stats) khi tìm xong
+        - error: Thông báo lỗi (None nếu không có)
+        - explored: array('i') chỉ số các cell đã được sinh ra (sự kiện 'open')
+    """
+    
+    def __init__(self, grid, algorithm, allow_diagonal=False, instrument=False, batch_size=BATCH_SIZE,
+                 **options):
+        """
+        Bắt đầu tìm ngay trong process con
+        
+        Args:
+            grid: Grid object (process con nhận grid.snapshot(), không thấy các lần sửa sau)
+            algorithm: Tên phương thức ('bfs', 'astar', 'hpa_star', ...)
+            allow_diagonal: True nếu cho phép đi chéo
+            instrument: True để stats có thêm bộ đếm (PathfindingAlgorithms.instrument)
+            batch_size: Số sự kiện mỗi lô
+            **options: Tham số thêm của thuật toán (cluster_size...)
+        """
+        self.grid = grid
+        self.revision = grid.revision
+        self.algorithm = algorithm
+        self.done = False
+        self.result = None
+        self.error = None
+        self.explored = array('i')
+        self._cols = grid.cols
+        self._conn, child_conn = multiprocessing.Pipe(duplex=False)
+        self._process = multiprocessing.Process(
+            target=_run_search, daemon=True,
+            args=(child_conn, grid.snapshot(), algorithm, allow_diagonal, instrument, options, batch_size))
+        self._process.start()
+        child_conn.close()
+    
+    def poll(self, budget=POLL_BUDGET):
+        """
+        Nhận các lô sự kiện đang chờ mà không chặn (tối đa budget giây)
+        
+        Returns:
+            List các ((row, col), 'open'/'closed') theo đúng thứ tự thuật toán gọi callback
+        """
+        events = []
+        deadline = time.perf_counter() + budget
+        while not self.done and self._conn.poll():
+            try:
+                message = self._conn.recv()
+            except (EOFError, OSError):
+                self._finish(error="Search process exited without a result")
+                break
+            if message[0] == 'events':
+                codes = array('i')
+                codes.frombytes(message[1])
+                cols = self._cols
+                for code in codes:
+                    index = code >> 1
+                    if code & 1:
+                        events.append((divmod(index, cols), 'closed'))
+                    else:
+                        events.append((divmod(index, cols), 'open'))
+                        self.explored.append(index)
+            elif message[0] == 'done':
+                self.result = (message[1], message[2])
+                self._finish()
+            else:
+                self._finish(error=message[1])
+            if time.perf_counter() > deadline:
+                break
+        return events
+    
+    def cancel(self):
+        """Dừng process con (nếu còn chạy); kết quả của nó sẽ không được đọc nữa"""
+        if self._process.is_alive():
+            self._process.terminate()
+        self._finish()
+    
+    def _finish(self, error=None):
+        """Đánh dấu kết thúc, đóng Pipe và dọn process con"""
+        self.done = True
+        if error is not None:
+            self.error = error
+        self._conn.close()
+        self._process.join(timeout=1.0)
@@ -0,0 +1,71 @@
+"""DistanceField: trường còn trong cache sau khi sửa lưới phải khớp với Dijkstra tìm lại"""
+import random
+
+import numpy as np
+import pytest
+
+from robot_astar import (CELL_END, CELL_NORMAL, CELL_ROAD, CELL_START, CELL_TRAP, CELL_WALL,
+                         Grid, PathfindingAlgorithms)
+
+
+def assert_field_matches(grid, goal, allow_diagonal, start):
+    field = grid.distance_field(goal, allow_diagonal)
+    saved = grid.start, grid.end
+    grid.start, grid.end = start, goal
+    reference = PathfindingAlgorithms(grid, allow_diagonal=allow_diagonal)
+    expected, _ = reference.dijkstra()
+    grid.start, grid.end = saved
+    if expected is None:
+        assert field.path_from(start) is None
+        return
+    assert field.cost_to_go(start) == pytest.approx(reference._path_cost(expected), abs=1e-4)
+    path = field.path_from(start)
+    assert path[0] == start and path[-1] == goal
+    assert reference._path_cost(path) == pytest.approx(field.cost_to_go(start), abs=1e-4)
+
+
+@pytest.mark.parametrize('seed', range(20))
+@pytest.mark.parametrize('allow_diagonal', [False, True])
+def test_cached_field_after_edits(seed, allow_diagonal):
+    rng = random.Random(seed)
+    rows, cols = rng.randint(2, 20), rng.randint(2, 20)
+    grid = Grid(rows, cols, compact=True)
+    for index in range(grid.size):
+        cell_type = rng.choices([CELL_NORMAL, CELL_WALL, CELL_TRAP, CELL_ROAD], [6, 3, 1, 1])[0]
+        if cell_type != CELL_NORMAL:
+            grid.set_cell_type(index // cols, index % cols, cell_type)
+    goal = (rng.randrange(rows), rng.randrange(cols))
+    grid.set_cell_type(goal[0], goal[1], CELL_NORMAL)
+    goal_index = grid.index(*goal)
+    for _ in range(6):
+        for _ in range(3):
+            start = (rng.randrange(rows), rng.randrange(cols))
+            if grid.cell_types[grid.index(*start)] != CELL_WALL:
+                assert_field_matches(grid, goal, allow_diagonal, start)
+        row, col = rng.randrange(rows), rng.randrange(cols)
+        if (row, col) != goal:
+            grid.set_cell_type(row, col, rng.choice([CELL_NORMAL, CELL_WALL, CELL_TRAP, CELL_ROAD]))
+        if rng.random() < 0.3:
+            indices = [index for index in rng.sample(range(grid.size), min(3, grid.size)) if index != goal_index]
+            grid.set_cell_types(indices, rng.choice([CELL_NORMAL, CELL_WALL, CELL_TRAP]))
+
+
+@pytest.mark.parametrize('seed', range(10))
+@pytest.mark.parametrize('allow_diagonal', [False, True])
+def test_cached_field_on_weight_layer_grid(seed, allow_diagonal):
+    # Đổi cell weight 2.0/3.0 của lớp weight sang NORMAL phải bỏ trường đã cache
+    rng = np.random.default_rng(seed)
+    size = 15
+    cell_types = np.where(rng.random((size, size)) < 0.15, CELL_WALL, CELL_NORMAL).astype(np.uint8)
+    cell_types[0, 0], cell_types[-1, -1] = CELL_START, CELL_END
+    weights = np.where(cell_types == CELL_WALL, np.inf,
+                       rng.choice([1.0, 2.0, 3.0], (size, size))).astype(np.float32)
+    grid = Grid.from_arrays(cell_types, weights, (0, 0), (size - 1, size - 1))
+    goal = grid.end
+    for step in range(8):
+        assert_field_matches(grid, goal, allow_diagonal, grid.start)
+        if step % 2:
+            row, col = divmod(int(rng.integers(1, grid.size - 1)), size)
+            grid.set_cell_type(row, col, CELL_NORMAL)
+        else:
+            grid.set_cell_types(rng.integers(1, grid.size - 1, 4), CELL_NORMAL)
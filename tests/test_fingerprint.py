@@ -0,0 +1,61 @@
+"""Grid.fingerprint và type_counts cập nhật tăng dần phải khớp với lưới dựng lại từ đầu"""
+import numpy as np
+import pytest
+
+from robot_astar import (CELL_END, CELL_NORMAL, CELL_ROAD, CELL_START, CELL_TRAP, CELL_WALL,
+                         CELL_WEIGHTS, Grid)
+
+CELL_TYPES = (CELL_NORMAL, CELL_WALL, CELL_TRAP, CELL_ROAD)
+
+
+def random_write(grid, rng):
+    """Một lần ghi ngẫu nhiên bằng set_cell_type() hoặc set_cell_types() (có chỉ số lặp lại)"""
+    cell_type = CELL_TYPES[rng.integers(len(CELL_TYPES))]
+    if rng.random() < 0.5:
+        indices = rng.integers(1, grid.size - 1, size=int(rng.integers(1, 64)))
+        # Lặp lại một nửa số chỉ số: khóa Zobrist XOR hai lần sẽ tự triệt tiêu
+        grid.set_cell_types(np.concatenate([indices, indices[:len(indices) // 2]]), cell_type)
+    else:
+        row, col = divmod(int(rng.integers(1, grid.size - 1)), grid.cols)
+        grid.set_cell_type(row, col, cell_type)
+
+
+@pytest.mark.parametrize('seed', range(5))
+def test_incremental_fingerprint_matches_rebuilt_grid(seed):
+    rng = np.random.default_rng(seed)
+    size = 48
+    grid = Grid(size, size)
+    grid.set_cell_type(0, 0, CELL_START)
+    grid.set_cell_type(size - 1, size - 1, CELL_END)
+    for _ in range(100):
+        random_write(grid, rng)
+        fresh = Grid.from_arrays(np.array(grid.cell_types).reshape(size, size), start=grid.start, end=grid.end)
+        assert grid.fingerprint == fresh.fingerprint
+        assert list(grid.type_counts) == np.bincount(grid.cell_types, minlength=len(CELL_WEIGHTS)).tolist()
+
+
+@pytest.mark.parametrize('seed', range(5))
+def test_incremental_fingerprint_on_weight_layer_grid(seed):
+    rng = np.random.default_rng(seed)
+    size = 24
+    cell_types = np.full((size, size), CELL_NORMAL, dtype=np.uint8)
+    cell_types[0, 0], cell_types[-1, -1] = CELL_START, CELL_END
+    weights = rng.choice([1.0, 2.0, 3.0], (size, size)).astype(np.float32)
+    grid = Grid.from_arrays(cell_types, weights, (0, 0), (size - 1, size - 1))
+    grid.fingerprint  # Quét toàn bộ một lần, sau đó chỉ cập nhật tăng dần
+    for _ in range(60):
+        random_write(grid, rng)
+        fresh = Grid.from_arrays(np.array(grid.cell_types).reshape(size, size),
+                                 np.array(grid.weights).reshape(size, size), grid.start, grid.end)
+        assert grid.fingerprint == fresh.fingerprint
+
+
+def test_fingerprint_depends_on_size_and_weights():
+    grid = Grid(6, 8)
+    other = Grid(8, 6)
+    assert grid.fingerprint != other.fingerprint
+    before = grid.fingerprint
+    grid.set_cell_type(2, 3, CELL_TRAP)
+    assert grid.fingerprint != before
+    grid.set_cell_type(2, 3, CELL_NORMAL)
+    assert grid.fingerprint == before
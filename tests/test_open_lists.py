@@ -0,0 +1,45 @@
+"""Các open list trong OPEN_LISTS phải cho cùng chi phí đường đi với Dijkstra mặc định (heapq)"""
+import random
+
+import pytest
+
+from robot_astar import OPEN_LISTS, Grid, PathfindingAlgorithms
+
+ALGORITHMS = ['dijkstra', 'astar', 'jps', 'bidirectional_dijkstra', 'bidirectional_astar']
+
+
+def rejects_bucket(algorithm, allow_diagonal):
+    """Khóa không phải bội số 0.5: 8 hướng (√2) và thế vị trung bình của bidirectional A*"""
+    return allow_diagonal or algorithm == 'bidirectional_astar'
+
+
+@pytest.mark.parametrize('seed', range(40))
+@pytest.mark.parametrize('allow_diagonal', [False, True])
+def test_open_lists_match_reference_cost(seed, allow_diagonal):
+    random.seed(seed)
+    grid = Grid.generate_random_map(wall_density=random.choice([0.1, 0.25]), energy_mode=random.random() < 0.7)
+    reference = PathfindingAlgorithms(grid, allow_diagonal)
+    expected, _ = reference.dijkstra()
+    for open_list in sorted(OPEN_LISTS):
+        pathfinder = PathfindingAlgorithms(grid, allow_diagonal, open_list=open_list)
+        for algorithm in ALGORITHMS:
+            if open_list == 'bucket' and rejects_bucket(algorithm, allow_diagonal):
+                with pytest.raises(ValueError):
+                    getattr(pathfinder, algorithm)()
+                continue
+            path, _ = getattr(pathfinder, algorithm)()
+            assert (path is None) == (expected is None)
+            if path is not None:
+                assert reference._path_cost(path) == pytest.approx(reference._path_cost(expected), abs=1e-6)
+
+
+def test_ara_star_rejects_bucket():
+    random.seed(0)
+    grid = Grid.generate_random_map()
+    with pytest.raises(ValueError):
+        PathfindingAlgorithms(grid, open_list='bucket').ara_star()
+
+
+def test_unknown_open_list():
+    with pytest.raises(ValueError):
+        PathfindingAlgorithms(Grid(5, 5), open_list='fibonacci')
@@ -0,0 +1,60 @@
+"""PathCache: kết quả lấy từ cache phải trùng với tìm lại từ đầu sau khi sửa lưới"""
+import random
+
+import numpy as np
+import pytest
+
+from robot_astar import (CELL_END, CELL_NORMAL, CELL_ROAD, CELL_START, CELL_TRAP, CELL_WALL,
+                         Grid, PathCache, PathfindingAlgorithms)
+
+ALGORITHMS = ['bfs', 'dfs', 'dijkstra', 'astar', 'jps', 'bidirectional_astar']
+
+
+def assert_same(cache, grid, algorithm, allow_diagonal):
+    pathfinder = PathfindingAlgorithms(grid, allow_diagonal=allow_diagonal)
+    cached_path, cached_stats = cache.solve(pathfinder, algorithm)
+    path, stats = getattr(pathfinder, algorithm)()
+    assert cached_path == path
+    assert cached_stats.get('total_energy') == stats.get('total_energy')
+
+
+@pytest.mark.parametrize('seed', range(20))
+def test_cache_matches_fresh_search_after_edits(seed):
+    rng = random.Random(seed)
+    rows, cols = rng.randint(2, 16), rng.randint(2, 16)
+    grid = Grid(rows, cols, compact=True)
+    for index in range(grid.size):
+        cell_type = rng.choices([CELL_NORMAL, CELL_WALL, CELL_TRAP, CELL_ROAD], [6, 3, 1, 1])[0]
+        if cell_type != CELL_NORMAL:
+            grid.set_cell_type(index // cols, index % cols, cell_type)
+    grid.start, grid.end = (0, 0), (rows - 1, cols - 1)
+    cache = PathCache(grid, maxsize=rng.choice([2, 8, 64]))
+    for _ in range(40):
+        assert_same(cache, grid, rng.choice(ALGORITHMS), rng.random() < 0.5)
+        row, col = rng.randrange(rows), rng.randrange(cols)
+        if (row, col) not in (grid.start, grid.end) and rng.random() < 0.3:
+            grid.set_cell_type(row, col, rng.choice([CELL_NORMAL, CELL_WALL, CELL_TRAP, CELL_ROAD]))
+        if rng.random() < 0.05:
+            indices = [index for index in rng.sample(range(grid.size), 2)
+                       if divmod(index, cols) not in (grid.start, grid.end)]
+            grid.set_cell_types(indices, rng.choice([CELL_NORMAL, CELL_WALL]))
+
+
+@pytest.mark.parametrize('seed', range(10))
+def test_cache_invalidated_on_weight_layer_grid(seed):
+    # Weight riêng từng cell: đổi cell weight 2.0/3.0 sang NORMAL phải bỏ các mục liên quan
+    rng = np.random.default_rng(seed)
+    size = 12
+    cell_types = np.where(rng.random((size, size)) < 0.2, CELL_WALL, CELL_NORMAL).astype(np.uint8)
+    cell_types[0, 0], cell_types[-1, -1] = CELL_START, CELL_END
+    weights = np.where(cell_types == CELL_WALL, np.inf,
+                       rng.choice([1.0, 2.0, 3.0], (size, size))).astype(np.float32)
+    grid = Grid.from_arrays(cell_types, weights, (0, 0), (size - 1, size - 1))
+    cache = PathCache(grid)
+    for step in range(30):
+        assert_same(cache, grid, ALGORITHMS[step % len(ALGORITHMS)], bool(step % 2))
+        if step % 3:
+            row, col = divmod(int(rng.integers(1, grid.size - 1)), size)
+            grid.set_cell_type(row, col, CELL_NORMAL)
+        else:
+            grid.set_cell_types(rng.integers(1, grid.size - 1, 3), CELL_NORMAL)